@@ -1,7 +1,7 @@
 # -*- mode: python ; coding: utf-8 -*-
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('config', 'config'), ('models', 'models'), ('assets', 'assets')]
+datas = [('config', 'config'), ('models', 'models'), ('assets', 'assets'), ('plugins', 'plugins')]
 binaries = []
 hiddenimports = []
 tmp_ret = collect_all('vosk')
@@ -0,0 +1,189 @@
+import argparse
+import signal
+import socket
+import sys
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional
+
+from PySide6.QtCore import QCoreApplication, QObject, QSocketNotifier, Slot
+
+from app.core.actions import ActionResult
+from app.core.batch import run_batch_cli
+from app.core.config import ConfigStore
+from app.core.languages import Hypothesis, Utterance
+from app.core.plugins import build_plugins
+from app.core.routines import routine_commands
+from app.core.timer_manager import TimerItem
+from app.core.tts import PRIORITY_ALERT, PRIORITY_INFO
+from app.core.tts_cache import PHRASE_NOT_RECOGNIZED, PHRASE_TIME_UP
+from app.core.utils import resident_memory_bytes
+
+if TYPE_CHECKING:
+    from app.core.runtime import Runtime
+
+
+def log(text: str) -> None:
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {text}", flush=True)
+
+
+class HeadlessController(QObject):
+    def __init__(self, runtime: "Runtime", show_partials: bool = False) -> None:
+        super().__init__()
+        self._runtime = runtime
+        self._show_partials = show_partials
+        listener = runtime.listener
+        listener.status_changed.connect(self._on_status)
+        listener.partial_text.connect(self._on_partial)
+        listener.utterance_ready.connect(self._on_utterance)
+        listener.error.connect(self._on_error)
+        listener.wake_detected.connect(self._on_wake)
+        runtime.timer_manager.timer_finished.connect(self._on_timer_finished)
+        runtime.routines.step_finished.connect(self._on_routine_step)
+        runtime.routines.routine_finished.connect(self._on_routine_finished)
+
+    @Slot(str)
+    def _on_status(self, status: str) -> None:
+        log(f"status: {status}")
+
+    @Slot(str)
+    def _on_partial(self, text: str) -> None:
+        if self._show_partials:
+            log(f"... {text}")
+
+    @Slot()
+    def _on_wake(self) -> None:
+        self._runtime.tts.interrupt()
+        log("\u0410\u043a\u0442\u0438\u0432\u0430\u0446\u0438\u044f: \u0424\u0430\u0437\u0438")
+
+    @Slot(object)
+    def _on_utterance(self, utterance: Utterance) -> None:
+        result = self._on_command(utterance.text, utterance.language, utterance.alternatives)
+        if result is None or not result.routed:
+            self._runtime.listener.dump_utterance(utterance, "unrecognized")
+        elif not result.ok:
+            self._runtime.listener.dump_utterance(utterance, "failed", result.log)
+
+    def _on_command(self, text: str, language: str = "", alternatives: Optional[List[Hypothesis]] = None) -> Optional[ActionResult]:
+        if not text:
+            log(PHRASE_NOT_RECOGNIZED)
+            self._runtime.tts.speak(PHRASE_NOT_RECOGNIZED, PRIORITY_INFO, max_age=5.0)
+            return None
+        log(f"\u0420\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u043e: {text}")
+        result = self._runtime.processor.handle(text, self._runtime.matcher_for(language), alternatives)
+        self._handle_result(result)
+        return result
+
+    def _handle_result(self, result: ActionResult) -> None:
+        log(result.log)
+        if result.tts:
+            self._runtime.tts.speak(result.tts)
+        elif not result.ok:
+            self._runtime.tts.speak(result.log)
+
+    @Slot(str)
+    def _on_error(self, error: str) -> None:
+        log(f"\u041e\u0448\u0438\u0431\u043a\u0430 STT: {error}")
+
+    @Slot(str, object)
+    def _on_routine_step(self, routine_id: str, result: ActionResult) -> None:
+        self._handle_result(result)
+
+    @Slot(str, object)
+    def _on_routine_finished(self, routine_id: str, result: ActionResult) -> None:
+        state = "\u0432\u044b\u043f\u043e\u043b\u043d\u0435\u043d" if result.ok else "\u043f\u0440\u0435\u0440\u0432\u0430\u043d"
+        log(f"\u0421\u0446\u0435\u043d\u0430\u0440\u0438\u0439 {routine_id} {state}")
+
+    @Slot(object)
+    def _on_timer_finished(self, timer: TimerItem) -> None:
+        label = timer.name or "\u0442\u0430\u0439\u043c\u0435\u0440"
+        log(f"\u0422\u0430\u0439\u043c\u0435\u0440 {label} \u0437\u0430\u043a\u043e\u043d\u0447\u0438\u043b\u0441\u044f")
+        self._runtime.tts.speak(PHRASE_TIME_UP, PRIORITY_ALERT)
+
+
+class SignalWakeup(QObject):
+    def __init__(self, app: QCoreApplication) -> None:
+        super().__init__(app)
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+        self._previous = signal.set_wakeup_fd(self._writer.fileno())
+        self._notifier = QSocketNotifier(self._reader.fileno(), QSocketNotifier.Type.Read, self)
+        self._notifier.activated.connect(self._drain)
+        signal.signal(signal.SIGINT, lambda *_: app.quit())
+
+    @Slot()
+    def _drain(self) -> None:
+        try:
+            while self._reader.recv(64):
+                pass
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        self._notifier.setEnabled(False)
+        signal.set_wakeup_fd(self._previous)
+        self._reader.close()
+        self._writer.close()
+
+
+def run_batch_file(args: argparse.Namespace) -> int:
+    config = ConfigStore()
+    wake_word = config.get_setting("stt", "wake_word", default="")
+    commands = config.commands + build_plugins(config).commands() + routine_commands(config.routines)
+    output = open(sys.stdout.fileno(), "w", encoding="utf-8", closefd=False)
+    try:
+        if args.batch == "-":
+            source = open(sys.stdin.fileno(), "r", encoding="utf-8", closefd=False)
+            return run_batch_cli(source, output, commands, wake_word, args.workers, args.processes, args.dispatch)
+        with open(args.batch, "r", encoding="utf-8-sig") as source:
+            return run_batch_cli(source, output, commands, wake_word, args.workers, args.processes, args.dispatch)
+    finally:
+        output.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Fazi assistant without the GUI")
+    parser.add_argument("--direct", action="store_true", help="accept commands without the wake word")
+    parser.add_argument("--no-tts", action="store_true", help="log replies without speaking them")
+    parser.add_argument("--partials", action="store_true", help="log partial recognition results")
+    parser.add_argument("--startup-probe", action="store_true", help="print startup time and resident memory, then exit")
+    parser.add_argument("--batch", metavar="PATH", help="match utterances from a file ('-' for stdin) and print JSON lines")
+    parser.add_argument("--workers", type=int, default=1, help="batch worker count")
+    parser.add_argument("--processes", action="store_true", help="use worker processes instead of threads for --batch")
+    parser.add_argument("--dispatch", action="store_true", help="also pass batch matches to a dry-run dispatcher")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        return run_batch_file(args)
+
+    from app.core.runtime import build_runtime
+
+    started = time.perf_counter()
+    app = QCoreApplication(sys.argv[:1])
+    config = ConfigStore()
+    runtime = build_runtime(config)
+    if args.no_tts:
+        runtime.tts.update(enabled=False)
+    controller = HeadlessController(runtime, show_partials=args.partials)
+
+    if args.startup_probe:
+        app.processEvents()
+        print(f"startup_sec={time.perf_counter() - started:.3f} rss_bytes={resident_memory_bytes()}", flush=True)
+        runtime.shutdown()
+        return 0
+
+    wakeup = SignalWakeup(app)
+
+    app.aboutToQuit.connect(runtime.shutdown)
+    runtime.listener.set_direct_mode(args.direct)
+    runtime.listener.start()
+    log("\u0424\u0430\u0437\u0438 \u0437\u0430\u043f\u0443\u0449\u0435\u043d \u0431\u0435\u0437 \u0438\u043d\u0442\u0435\u0440\u0444\u0435\u0439\u0441\u0430. Ctrl+C \u0434\u043b\u044f \u0432\u044b\u0445\u043e\u0434\u0430.")
+    code = app.exec()
+    wakeup.close()
+    controller.deleteLater()
+    return code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,16 +1,41 @@
-import ctypes
-import os
 import random
-import subprocess
-import time
-import webbrowser
 from datetime import datetime
-from pathlib import Path
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
 from urllib.parse import quote_plus
 
 from app.core.math_eval import MathEvaluator
+from app.core.metrics import METRICS
+from app.core.notes import NotesStore
+from app.core.system import (
+    VK_A,
+    VK_BRIGHTNESS_DOWN,
+    VK_BRIGHTNESS_UP,
+    VK_C,
+    VK_CONTROL,
+    VK_D,
+    VK_ESCAPE,
+    VK_F4,
+    VK_LWIN,
+    VK_MEDIA_NEXT_TRACK,
+    VK_MEDIA_PLAY_PAUSE,
+    VK_MEDIA_PREV_TRACK,
+    VK_MENU,
+    VK_RETURN,
+    VK_S,
+    VK_SHIFT,
+    VK_SNAPSHOT,
+    VK_TAB,
+    VK_V,
+    VK_VOLUME_DOWN,
+    VK_VOLUME_MUTE,
+    VK_VOLUME_UP,
+    VK_X,
+    VK_Z,
+    SystemBackend,
+    SystemUnavailable,
+    default_system_backend,
+)
 from app.core.timer_manager import TimerManager, parse_timer_request
 from app.core.utils import app_root, expand_path, normalize_text
 
@@ -20,109 +45,145 @@ class ActionResult:
     ok: bool
     log: str
     tts: str | None = None
+    steps: list["ActionResult"] = field(default_factory=list)
+    routed: bool = True
 
 
-KEYEVENTF_KEYUP = 0x0002
-KEYEVENTF_UNICODE = 0x0004
-
-VK_CONTROL = 0x11
-VK_SHIFT = 0x10
-VK_MENU = 0x12
-VK_RETURN = 0x0D
-VK_ESCAPE = 0x1B
-VK_TAB = 0x09
-VK_SNAPSHOT = 0x2C
-VK_F4 = 0x73
-VK_LWIN = 0x5B
-VK_D = 0x44
-VK_A = 0x41
-VK_C = 0x43
-VK_V = 0x56
-VK_X = 0x58
-VK_S = 0x53
-VK_Z = 0x5A
-
-VK_VOLUME_MUTE = 0xAD
-VK_VOLUME_DOWN = 0xAE
-VK_VOLUME_UP = 0xAF
-VK_MEDIA_NEXT_TRACK = 0xB0
-VK_MEDIA_PREV_TRACK = 0xB1
-VK_MEDIA_PLAY_PAUSE = 0xB3
-VK_BRIGHTNESS_DOWN = 0xD8
-VK_BRIGHTNESS_UP = 0xD9
-
-USER32 = ctypes.WinDLL("user32", use_last_error=True)
-USER32.SendInput.argtypes = (ctypes.c_uint, ctypes.c_void_p, ctypes.c_int)
-USER32.SendInput.restype = ctypes.c_uint
-
-
-class KEYBDINPUT(ctypes.Structure):
-    _fields_ = [
-        ("wVk", ctypes.c_ushort),
-        ("wScan", ctypes.c_ushort),
-        ("dwFlags", ctypes.c_ulong),
-        ("time", ctypes.c_ulong),
-        ("dwExtraInfo", ctypes.c_void_p),
-    ]
-
-
-class _INPUT_UNION(ctypes.Union):
-    _fields_ = [("ki", KEYBDINPUT)]
-
-
-class INPUT(ctypes.Structure):
-    _anonymous_ = ("_input",)
-    _fields_ = [("type", ctypes.c_ulong), ("_input", _INPUT_UNION)]
-
-
-def _send_vk(vk: int) -> None:
-    USER32.keybd_event(vk, 0, 0, 0)
-    USER32.keybd_event(vk, 0, KEYEVENTF_KEYUP, 0)
-
-
-def _send_hotkey(*vks: int) -> None:
-    for vk in vks:
-        USER32.keybd_event(vk, 0, 0, 0)
-    for vk in reversed(vks):
-        USER32.keybd_event(vk, 0, KEYEVENTF_KEYUP, 0)
-
-
-def _send_text(text: str) -> None:
-    if not text:
-        return
-    for char in text:
-        code = ord(char)
-        inputs = (INPUT * 2)(
-            INPUT(type=1, ki=KEYBDINPUT(0, code, KEYEVENTF_UNICODE, 0, None)),
-            INPUT(type=1, ki=KEYBDINPUT(0, code, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP, 0, None)),
-        )
-        USER32.SendInput(2, ctypes.byref(inputs[0]), ctypes.sizeof(INPUT))
+HOTKEY_VK_MAP = {
+    "ctrl": VK_CONTROL,
+    "shift": VK_SHIFT,
+    "alt": VK_MENU,
+    "win": VK_LWIN,
+    "a": VK_A,
+    "c": VK_C,
+    "d": VK_D,
+    "v": VK_V,
+    "x": VK_X,
+    "s": VK_S,
+    "z": VK_Z,
+    "enter": VK_RETURN,
+    "esc": VK_ESCAPE,
+    "tab": VK_TAB,
+}
+
+
+def parse_hotkey(keys: list[str]) -> list[int]:
+    return [HOTKEY_VK_MAP[key] for key in keys if key in HOTKEY_VK_MAP]
+
+
+Handler = Callable[[Dict[str, Any], Dict[str, str], str], ActionResult]
+
+
+@dataclass
+class PreparedAction:
+    action_type: str
+    handler: Handler
+    action: Dict[str, Any]
+    span: str
 
 
-def _ensure_notes_path() -> Path:
-    notes_path = app_root() / "config" / "notes.txt"
-    notes_path.parent.mkdir(parents=True, exist_ok=True)
-    return notes_path
+def default_notes_store() -> NotesStore:
+    config_dir = app_root() / "config"
+    return NotesStore(config_dir / "notes.db", legacy_path=config_dir / "notes.txt")
 
 
 class ActionDispatcher:
-    def __init__(self, targets: Dict[str, str], allowlist: list[Dict[str, Any]], timer_manager: TimerManager) -> None:
+    def __init__(
+        self,
+        targets: Dict[str, str],
+        allowlist: list[Dict[str, Any]],
+        timer_manager: TimerManager,
+        notes: Optional[NotesStore] = None,
+        math: Optional[MathEvaluator] = None,
+        system: Optional[SystemBackend] = None,
+        plugins=None,
+    ) -> None:
         self._targets = targets
         self._allowlist = allowlist
+        self._targets_index = {normalize_text(name): url for name, url in targets.items()}
+        self._allow_index: Dict[str, Dict[str, Any]] = {}
+        for item in allowlist:
+            self._allow_index.setdefault(normalize_text(item.get("name", "")), item)
+        self._handlers: Dict[str, Handler] = {
+            name[len("_handle_") :]: getattr(self, name) for name in dir(self) if name.startswith("_handle_")
+        }
+        if plugins is not None:
+            for action_type in plugins.action_types():
+                if action_type in self._handlers:
+                    print(f"[plugins] action '{action_type}' is built in, plugin handler ignored")
+                    continue
+                self._handlers[action_type] = plugins.handler(action_type, self)
         self._timer_manager = timer_manager
-        self._math = MathEvaluator()
-
-    def dispatch(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        action_type = action.get("type", "")
-        handler = getattr(self, f"_handle_{action_type}", None)
-        if not handler:
-            return ActionResult(False, self._text("\u041a\u043e\u043c\u0430\u043d\u0434\u0430 \u043d\u0435 \u0440\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u0430"))
-        return handler(action, params, raw_text)
+        self._math = math or MathEvaluator()
+        self._notes = notes
+        self._system = system or default_system_backend()
+        self._routines = None
+
+    @property
+    def system(self) -> SystemBackend:
+        return self._system
+
+    def set_routines(self, routines) -> None:
+        self._routines = routines
+
+    def handler(self, action_type: str) -> Optional[Handler]:
+        return self._handlers.get(action_type)
+
+    def prepare(self, action: Dict[str, Any]) -> PreparedAction:
+        action_type = str(action.get("type", ""))
+        handler = self._handlers.get(action_type)
+        if handler is None:
+            raise ValueError(f"unknown action type '{action_type}'")
+        prepared = dict(action)
+        if action_type == "hotkey":
+            keys = [str(key).lower() for key in action.get("keys", [])]
+            unknown = [key for key in keys if key not in HOTKEY_VK_MAP]
+            if unknown or not keys:
+                raise ValueError(f"unknown keys {unknown or keys}")
+            prepared["vks"] = parse_hotkey(keys)
+        elif action_type == "open_url":
+            if not action.get("url"):
+                raise ValueError("open_url without url")
+        elif action_type == "run_allowlist" and not action.get("param"):
+            item = self.find_allow_item(str(action.get("name", "")))
+            if item is None:
+                raise ValueError(f"'{action.get('name', '')}' is not in the allowlist")
+            prepared["allow_item"] = item
+        return PreparedAction(action_type, handler, prepared, f"action.{action_type}")
+
+    def resolve_site(self, site: str) -> Optional[str]:
+        url = self._targets_index.get(normalize_text(site)) or site
+        if not url.startswith("http"):
+            if "." not in url:
+                return None
+            url = f"https://{url}"
+        return url
+
+    def dispatch(
+        self,
+        action: Dict[str, Any],
+        params: Dict[str, str],
+        raw_text: str,
+        prepared: Optional[PreparedAction] = None,
+    ) -> ActionResult:
+        if prepared is None:
+            action_type = action.get("type", "")
+            handler = self._handlers.get(action_type)
+            if not handler:
+                return ActionResult(False, self._text("\u041a\u043e\u043c\u0430\u043d\u0434\u0430 \u043d\u0435 \u0440\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u0430"))
+            prepared = PreparedAction(action_type, handler, action, f"action.{action_type}")
+        METRICS.observe_since("latency.wake_to_dispatch", "wake")
+        with METRICS.span("action.dispatch"), METRICS.span(prepared.span):
+            try:
+                return prepared.handler(prepared.action, params, raw_text)
+            except SystemUnavailable as exc:
+                text = "\u041d\u0435\u0434\u043e\u0441\u0442\u0443\u043f\u043d\u043e \u043d\u0430 \u044d\u0442\u043e\u0439 \u0441\u0438\u0441\u0442\u0435\u043c\u0435"
+                return ActionResult(False, f"{text}: {exc}", text)
 
     def _handle_open_browser(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        ok = webbrowser.open("about:blank")
+        ok = self._system.open_url("about:blank")
         if not ok:
-            webbrowser.open("https://www.google.com")
+            self._system.open_url("https://www.google.com")
         tts = self._format_tts(action, params)
         return ActionResult(True, self._text("\u041e\u0442\u043a\u0440\u044b\u0432\u0430\u044e \u0431\u0440\u0430\u0443\u0437\u0435\u0440"), tts)
 
@@ -130,7 +191,7 @@ class ActionDispatcher:
         url = action.get("url")
         if not url:
             return ActionResult(False, self._text("\u041d\u0435\u0442 URL \u0434\u043b\u044f \u043e\u0442\u043a\u0440\u044b\u0442\u0438\u044f"))
-        webbrowser.open(url)
+        self._system.open_url(url)
         tts = self._format_tts(action, params)
         log = tts or self._text("\u041e\u0442\u043a\u0440\u044b\u0432\u0430\u044e \u0441\u0430\u0439\u0442")
         return ActionResult(True, log, tts)
@@ -139,15 +200,10 @@ class ActionDispatcher:
         site = params.get(action.get("param", ""), "").strip()
         if not site:
             return ActionResult(False, self._text("\u041d\u0435 \u0443\u043a\u0430\u0437\u0430\u043d \u0441\u0430\u0439\u0442"))
-        targets_norm = {normalize_text(k): v for k, v in self._targets.items()}
-        url = targets_norm.get(normalize_text(site))
+        url = self.resolve_site(site)
         if not url:
-            url = site
-        if not url.startswith("http"):
-            if "." not in url:
-                return ActionResult(False, self._text("\u0421\u0430\u0439\u0442 \u043d\u0435 \u043d\u0430\u0439\u0434\u0435\u043d"))
-            url = f"https://{url}"
-        webbrowser.open(url)
+            return ActionResult(False, self._text("\u0421\u0430\u0439\u0442 \u043d\u0435 \u043d\u0430\u0439\u0434\u0435\u043d"))
+        self._system.open_url(url)
         tts = self._format_tts(action, {"site": site})
         return ActionResult(True, self._text(f"\u041e\u0442\u043a\u0440\u044b\u0432\u0430\u044e {site}"), tts)
 
@@ -156,7 +212,7 @@ class ActionDispatcher:
         if not query:
             return ActionResult(False, self._text("\u041d\u0435\u0442 \u0437\u0430\u043f\u0440\u043e\u0441\u0430 \u0434\u043b\u044f \u043f\u043e\u0438\u0441\u043a\u0430"))
         url = f"https://www.google.com/search?q={quote_plus(query)}"
-        webbrowser.open(url)
+        self._system.open_url(url)
         tts = self._format_tts(action, {"query": query})
         return ActionResult(True, self._text(f"\u041f\u043e\u0438\u0441\u043a: {query}"), tts)
 
@@ -166,18 +222,18 @@ class ActionDispatcher:
             name = str(action.get("name", "")).strip()
         if not name:
             return ActionResult(False, self._text("\u041d\u0435 \u0443\u043a\u0430\u0437\u0430\u043d\u043e \u0447\u0442\u043e \u043e\u0442\u043a\u0440\u044b\u0442\u044c"))
-        item = self._find_allow_item(name)
+        item = action.get("allow_item") or self.find_allow_item(name)
         if not item:
             return ActionResult(False, self._text("\u041d\u0435\u0442 \u0432 allowlist"))
         path = expand_path(item.get("path", ""))
-        if not path or not os.path.exists(path):
+        if not path or not self._system.path_exists(path):
             return ActionResult(False, self._text("\u041f\u0443\u0442\u044c \u043d\u0435 \u043d\u0430\u0439\u0434\u0435\u043d"))
         item_type = item.get("type", "file")
         executable = bool(item.get("executable", False))
         if item_type == "app" or path.lower().endswith(".exe"):
             if not executable:
                 return ActionResult(False, self._text("\u0417\u0430\u043f\u0443\u0441\u043a \u0437\u0430\u043f\u0440\u0435\u0449\u0435\u043d"))
-        os.startfile(path)
+        self._system.open_path(path)
         return ActionResult(True, self._text(f"\u041e\u0442\u043a\u0440\u044b\u0432\u0430\u044e {name}"), None)
 
     def _handle_say(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
@@ -230,60 +286,59 @@ class ActionDispatcher:
         return ActionResult(True, text, text)
 
     def _handle_volume_up(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_vk(VK_VOLUME_UP)
+        self._system.press_key(VK_VOLUME_UP)
         return ActionResult(True, "\u0423\u0432\u0435\u043b\u0438\u0447\u0438\u0432\u0430\u044e \u0433\u0440\u043e\u043c\u043a\u043e\u0441\u0442\u044c", "\u0423\u0432\u0435\u043b\u0438\u0447\u0438\u0432\u0430\u044e \u0433\u0440\u043e\u043c\u043a\u043e\u0441\u0442\u044c")
 
     def _handle_volume_down(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_vk(VK_VOLUME_DOWN)
+        self._system.press_key(VK_VOLUME_DOWN)
         return ActionResult(True, "\u0423\u043c\u0435\u043d\u044c\u0448\u0430\u044e \u0433\u0440\u043e\u043c\u043a\u043e\u0441\u0442\u044c", "\u0423\u043c\u0435\u043d\u044c\u0448\u0430\u044e \u0433\u0440\u043e\u043c\u043a\u043e\u0441\u0442\u044c")
 
     def _handle_volume_max(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        for _ in range(20):
-            _send_vk(VK_VOLUME_UP)
+        self._system.press_key(VK_VOLUME_UP, 20)
         return ActionResult(True, "\u0413\u0440\u043e\u043c\u043a\u043e\u0441\u0442\u044c \u043d\u0430 \u043c\u0430\u043a\u0441\u0438\u043c\u0443\u043c", "\u0413\u0440\u043e\u043c\u043a\u043e\u0441\u0442\u044c \u043d\u0430 \u043c\u0430\u043a\u0441\u0438\u043c\u0443\u043c")
 
     def _handle_volume_mute(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_vk(VK_VOLUME_MUTE)
+        self._system.press_key(VK_VOLUME_MUTE)
         return ActionResult(True, "\u0412\u044b\u043a\u043b\u044e\u0447\u0430\u044e \u0437\u0432\u0443\u043a", "\u0412\u044b\u043a\u043b\u044e\u0447\u0430\u044e \u0437\u0432\u0443\u043a")
 
     def _handle_volume_unmute(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_vk(VK_VOLUME_UP)
+        self._system.press_key(VK_VOLUME_UP)
         return ActionResult(True, "\u0412\u043a\u043b\u044e\u0447\u0430\u044e \u0437\u0432\u0443\u043a", "\u0412\u043a\u043b\u044e\u0447\u0430\u044e \u0437\u0432\u0443\u043a")
 
     def _handle_brightness_up(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_vk(VK_BRIGHTNESS_UP)
+        self._system.press_key(VK_BRIGHTNESS_UP)
         return ActionResult(True, "\u042f\u0440\u0447\u0435", "\u042f\u0440\u0447\u0435")
 
     def _handle_brightness_down(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_vk(VK_BRIGHTNESS_DOWN)
+        self._system.press_key(VK_BRIGHTNESS_DOWN)
         return ActionResult(True, "\u0422\u0435\u043c\u043d\u0435\u0435", "\u0422\u0435\u043c\u043d\u0435\u0435")
 
     def _handle_media_play_pause(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_vk(VK_MEDIA_PLAY_PAUSE)
+        self._system.press_key(VK_MEDIA_PLAY_PAUSE)
         return ActionResult(True, "\u041f\u0435\u0440\u0435\u043a\u043b\u044e\u0447\u0430\u044e \u0432\u043e\u0441\u043f\u0440\u043e\u0438\u0437\u0432\u0435\u0434\u0435\u043d\u0438\u0435", "\u041f\u0435\u0440\u0435\u043a\u043b\u044e\u0447\u0430\u044e \u0432\u043e\u0441\u043f\u0440\u043e\u0438\u0437\u0432\u0435\u0434\u0435\u043d\u0438\u0435")
 
     def _handle_media_next(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_vk(VK_MEDIA_NEXT_TRACK)
+        self._system.press_key(VK_MEDIA_NEXT_TRACK)
         return ActionResult(True, "\u0421\u043b\u0435\u0434\u0443\u044e\u0449\u0438\u0439 \u0442\u0440\u0435\u043a", "\u0421\u043b\u0435\u0434\u0443\u044e\u0449\u0438\u0439 \u0442\u0440\u0435\u043a")
 
     def _handle_media_prev(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_vk(VK_MEDIA_PREV_TRACK)
+        self._system.press_key(VK_MEDIA_PREV_TRACK)
         return ActionResult(True, "\u041f\u0440\u0435\u0434\u044b\u0434\u0443\u0449\u0438\u0439 \u0442\u0440\u0435\u043a", "\u041f\u0440\u0435\u0434\u044b\u0434\u0443\u0449\u0438\u0439 \u0442\u0440\u0435\u043a")
 
     def _handle_show_desktop(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_hotkey(VK_LWIN, VK_D)
+        self._system.hotkey(VK_LWIN, VK_D)
         return ActionResult(True, "\u041f\u043e\u043a\u0430\u0437\u044b\u0432\u0430\u044e \u0440\u0430\u0431\u043e\u0447\u0438\u0439 \u0441\u0442\u043e\u043b", "\u041f\u043e\u043a\u0430\u0437\u044b\u0432\u0430\u044e \u0440\u0430\u0431\u043e\u0447\u0438\u0439 \u0441\u0442\u043e\u043b")
 
     def _handle_close_window(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_hotkey(VK_MENU, VK_F4)
+        self._system.hotkey(VK_MENU, VK_F4)
         return ActionResult(True, "\u0417\u0430\u043a\u0440\u044b\u0432\u0430\u044e \u043e\u043a\u043d\u043e", "\u0417\u0430\u043a\u0440\u044b\u0432\u0430\u044e \u043e\u043a\u043d\u043e")
 
     def _handle_switch_window(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_hotkey(VK_MENU, VK_TAB)
+        self._system.hotkey(VK_MENU, VK_TAB)
         return ActionResult(True, "\u041f\u0435\u0440\u0435\u043a\u043b\u044e\u0447\u0430\u044e \u043e\u043a\u043d\u043e", "\u041f\u0435\u0440\u0435\u043a\u043b\u044e\u0447\u0430\u044e \u043e\u043a\u043d\u043e")
 
     def _handle_screenshot(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        _send_hotkey(VK_LWIN, VK_SNAPSHOT)
+        self._system.hotkey(VK_LWIN, VK_SNAPSHOT)
         return ActionResult(True, "\u0421\u043a\u0440\u0438\u043d\u0448\u043e\u0442 \u0441\u0434\u0435\u043b\u0430\u043d", "\u0421\u043a\u0440\u0438\u043d\u0448\u043e\u0442 \u0441\u0434\u0435\u043b\u0430\u043d")
 
     def _handle_type_text(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
@@ -291,92 +346,70 @@ class ActionDispatcher:
         if not text:
             return ActionResult(False, "\u041d\u0435 \u0443\u043a\u0430\u0437\u0430\u043d \u0442\u0435\u043a\u0441\u0442")
         delay_ms = int(action.get("delay_ms", 120))
-        time.sleep(max(0, delay_ms) / 1000.0)
-        _send_text(text)
+        self._system.delay(max(0, delay_ms) / 1000.0)
+        self._system.type_text(text)
         return ActionResult(True, "\u041d\u0430\u0431\u0438\u0440\u0430\u044e \u0442\u0435\u043a\u0441\u0442", "\u041d\u0430\u0431\u0438\u0440\u0430\u044e \u0442\u0435\u043a\u0441\u0442")
 
     def _handle_hotkey(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        keys = action.get("keys", [])
-        vk_map = {
-            "ctrl": VK_CONTROL,
-            "shift": VK_SHIFT,
-            "alt": VK_MENU,
-            "win": VK_LWIN,
-            "a": VK_A,
-            "c": VK_C,
-            "v": VK_V,
-            "x": VK_X,
-            "s": VK_S,
-            "z": VK_Z,
-            "enter": VK_RETURN,
-            "esc": VK_ESCAPE,
-            "tab": VK_TAB,
-        }
-        vks = [vk_map[k] for k in keys if k in vk_map]
+        vks = action.get("vks") or parse_hotkey(action.get("keys", []))
         if not vks:
             return ActionResult(False, "\u041d\u0435\u0442 \u043a\u043b\u0430\u0432\u0438\u0448")
-        _send_hotkey(*vks)
+        self._system.hotkey(*vks)
         return ActionResult(True, "\u0412\u044b\u043f\u043e\u043b\u043d\u0435\u043d\u043e", "\u0412\u044b\u043f\u043e\u043b\u043d\u0435\u043d\u043e")
 
     def _handle_note_add(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
         text = params.get(action.get("param", ""), "").strip()
         if not text:
             return ActionResult(False, "\u041d\u0435 \u0443\u043a\u0430\u0437\u0430\u043d \u0442\u0435\u043a\u0441\u0442 \u0437\u0430\u043c\u0435\u0442\u043a\u0438")
-        notes_path = _ensure_notes_path()
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        with notes_path.open("a", encoding="utf-8") as handle:
-            handle.write(f"[{timestamp}] {text}\n")
+        tag = params.get(action.get("tag_param", ""), "").strip()
+        self._notes_store().add(text, [tag] if tag else None)
         return ActionResult(True, "\u0417\u0430\u043c\u0435\u0442\u043a\u0430 \u0441\u043e\u0445\u0440\u0430\u043d\u0435\u043d\u0430", "\u0417\u0430\u043c\u0435\u0442\u043a\u0430 \u0441\u043e\u0445\u0440\u0430\u043d\u0435\u043d\u0430")
 
     def _handle_note_list(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        notes_path = _ensure_notes_path()
-        if not notes_path.exists():
+        limit = int(action.get("limit", 5))
+        tag = params.get(action.get("param", ""), "").strip()
+        notes = self._notes_store().by_tag(tag, limit) if tag else self._notes_store().tail(limit)
+        if not notes:
             return ActionResult(True, "\u041d\u0435\u0442 \u0437\u0430\u043c\u0435\u0442\u043e\u043a", "\u041d\u0435\u0442 \u0437\u0430\u043c\u0435\u0442\u043e\u043a")
-        lines = [line.strip() for line in notes_path.read_text(encoding="utf-8").splitlines() if line.strip()]
-        if not lines:
-            return ActionResult(True, "\u041d\u0435\u0442 \u0437\u0430\u043c\u0435\u0442\u043e\u043a", "\u041d\u0435\u0442 \u0437\u0430\u043c\u0435\u0442\u043e\u043a")
-        latest = lines[-5:]
-        text = "\u0412\u043e\u0442 \u0432\u0430\u0448\u0438 \u0437\u0430\u043c\u0435\u0442\u043a\u0438: " + "; ".join(latest)
+        text = "\u0412\u043e\u0442 \u0432\u0430\u0448\u0438 \u0437\u0430\u043c\u0435\u0442\u043a\u0438: " + "; ".join(note.display() for note in notes)
+        return ActionResult(True, text, text)
+
+    def _handle_note_search(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
+        query = params.get(action.get("param", ""), "").strip()
+        if not query:
+            return ActionResult(False, "\u041d\u0435\u0442 \u0437\u0430\u043f\u0440\u043e\u0441\u0430 \u0434\u043b\u044f \u043f\u043e\u0438\u0441\u043a\u0430")
+        notes = self._notes_store().search(query, int(action.get("limit", 3)))
+        if not notes:
+            text = f"\u0417\u0430\u043c\u0435\u0442\u043e\u043a \u043f\u0440\u043e {query} \u043d\u0435\u0442"
+            return ActionResult(True, text, text)
+        text = "\u041d\u0430\u0448\u0435\u043b: " + "; ".join(note.display() for note in notes)
         return ActionResult(True, text, text)
 
     def _handle_system_shutdown(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        subprocess.Popen(["shutdown", "/s", "/t", "0"], shell=False)
+        self._system.shutdown()
         text = "\u0412\u044b\u043a\u043b\u044e\u0447\u0430\u044e \u043a\u043e\u043c\u043f\u044c\u044e\u0442\u0435\u0440"
         return ActionResult(True, text, text)
 
     def _handle_system_restart(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        subprocess.Popen(["shutdown", "/r", "/t", "0"], shell=False)
+        self._system.restart()
         text = "\u041f\u0435\u0440\u0435\u0437\u0430\u0433\u0440\u0443\u0436\u0430\u044e \u043a\u043e\u043c\u043f\u044c\u044e\u0442\u0435\u0440"
         return ActionResult(True, text, text)
 
     def _handle_system_sleep(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        subprocess.Popen(["rundll32.exe", "powrprof.dll,SetSuspendState", "0,1,0"], shell=False)
+        self._system.suspend()
         text = "\u041f\u0435\u0440\u0435\u0432\u043e\u0436\u0443 \u0432 \u0441\u043f\u044f\u0449\u0438\u0439 \u0440\u0435\u0436\u0438\u043c"
         return ActionResult(True, text, text)
 
     def _handle_system_lock(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        USER32.LockWorkStation()
+        self._system.lock()
         text = "\u0411\u043b\u043e\u043a\u0438\u0440\u0443\u044e \u043a\u043e\u043c\u043f\u044c\u044e\u0442\u0435\u0440"
         return ActionResult(True, text, text)
 
     def _handle_battery_status(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
-        class SYSTEM_POWER_STATUS(ctypes.Structure):
-            _fields_ = [
-                ("ACLineStatus", ctypes.c_byte),
-                ("BatteryFlag", ctypes.c_byte),
-                ("BatteryLifePercent", ctypes.c_byte),
-                ("SystemStatusFlag", ctypes.c_byte),
-                ("BatteryLifeTime", ctypes.c_ulong),
-                ("BatteryFullLifeTime", ctypes.c_ulong),
-            ]
-
-        status = SYSTEM_POWER_STATUS()
-        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
-        ok = kernel32.GetSystemPowerStatus(ctypes.byref(status))
-        if not ok:
+        percent = self._system.battery_percent()
+        if percent is None:
             text = "\u041d\u0435 \u0443\u0434\u0430\u043b\u043e\u0441\u044c \u043f\u043e\u043b\u0443\u0447\u0438\u0442\u044c \u0434\u0430\u043d\u043d\u044b\u0435 \u043e \u0431\u0430\u0442\u0430\u0440\u0435\u0435"
             return ActionResult(False, text, text)
-        percent = int(status.BatteryLifePercent)
         if percent < 0 or percent > 100:
             text = "\u041d\u0435\u0438\u0437\u0432\u0435\u0441\u0442\u043d\u044b\u0439 \u0443\u0440\u043e\u0432\u0435\u043d\u044c \u0437\u0430\u0440\u044f\u0434\u0430"
             return ActionResult(True, text, text)
@@ -388,7 +421,7 @@ class ActionDispatcher:
         if not topic:
             return ActionResult(False, "\u041d\u0435\u0442 \u0442\u0435\u043c\u044b \u0434\u043b\u044f \u043f\u043e\u0438\u0441\u043a\u0430")
         url = f"https://ru.wikipedia.org/wiki/Special:Search?search={quote_plus(topic)}"
-        webbrowser.open(url)
+        self._system.open_url(url)
         tts = f"\u0418\u0449\u0443 \u0432 Wikipedia: {topic}"
         return ActionResult(True, tts, tts)
 
@@ -397,7 +430,7 @@ class ActionDispatcher:
         if not text:
             return ActionResult(False, "\u041d\u0435\u0442 \u0442\u0435\u043a\u0441\u0442\u0430 \u0434\u043b\u044f \u043f\u0435\u0440\u0435\u0432\u043e\u0434\u0430")
         url = f"https://translate.google.com/?sl=auto&tl=ru&text={quote_plus(text)}&op=translate"
-        webbrowser.open(url)
+        self._system.open_url(url)
         tts = f"\u041f\u0435\u0440\u0435\u0432\u043e\u0436\u0443: {text}"
         return ActionResult(True, tts, tts)
 
@@ -408,7 +441,7 @@ class ActionDispatcher:
         else:
             query = "\u043f\u043e\u0433\u043e\u0434\u0430"
         url = f"https://www.google.com/search?q={quote_plus(query)}"
-        webbrowser.open(url)
+        self._system.open_url(url)
         tts = (
             f"\u041f\u043e\u043a\u0430\u0437\u044b\u0432\u0430\u044e \u043f\u043e\u0433\u043e\u0434\u0443 {place}"
             if place
@@ -451,12 +484,25 @@ class ActionDispatcher:
     def _handle_math_eval(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
         expr = params.get(action.get("param", ""), raw_text)
         result = self._math.evaluate(expr)
-        if not result.ok or result.value is None:
+        formatted = self._math.format_value(result.value, result.precision) if result.ok else ""
+        if not formatted:
             return ActionResult(False, self._text("\u041d\u0435 \u0441\u043c\u043e\u0433 \u043f\u043e\u0441\u0447\u0438\u0442\u0430\u0442\u044c"))
-        formatted = self._math.format_value(result.value)
         log = f"\u041e\u0442\u0432\u0435\u0442: {formatted}"
         return ActionResult(True, log, log)
 
+    def _handle_routine(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
+        name = str(action.get("routine", "")).strip()
+        if not self._routines or not name:
+            return ActionResult(False, "\u0421\u0446\u0435\u043d\u0430\u0440\u0438\u0438 \u043d\u0435\u0434\u043e\u0441\u0442\u0443\u043f\u043d\u044b")
+        return self._routines.start(name)
+
+    def _handle_routine_cancel(self, action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
+        if not self._routines or not self._routines.cancel():
+            text = "\u041d\u0435\u0442 \u0430\u043a\u0442\u0438\u0432\u043d\u044b\u0445 \u0441\u0446\u0435\u043d\u0430\u0440\u0438\u0435\u0432"
+            return ActionResult(False, text, text)
+        text = "\u0421\u0446\u0435\u043d\u0430\u0440\u0438\u0439 \u043e\u0441\u0442\u0430\u043d\u043e\u0432\u043b\u0435\u043d"
+        return ActionResult(True, text, text)
+
     def _format_tts(self, action: Dict[str, Any], params: Dict[str, str]) -> str | None:
         template = action.get("tts")
         if not template:
@@ -466,12 +512,13 @@ class ActionDispatcher:
         except Exception:
             return template
 
-    def _find_allow_item(self, name: str) -> Optional[Dict[str, Any]]:
-        wanted = normalize_text(name)
-        for item in self._allowlist:
-            if normalize_text(item.get("name", "")) == wanted:
-                return item
-        return None
+    def _notes_store(self) -> NotesStore:
+        if self._notes is None:
+            self._notes = default_notes_store()
+        return self._notes
+
+    def find_allow_item(self, name: str) -> Optional[Dict[str, Any]]:
+        return self._allow_index.get(normalize_text(name))
 
     @staticmethod
     def _format_duration(seconds: int) -> str:
@@ -0,0 +1,76 @@
+from collections import deque
+from operator import mul
+from typing import Any, Deque, Optional
+
+try:
+    from vosk import _c as _VOSK_C
+    from vosk import _ffi as _VOSK_FFI
+except ImportError:
+    _VOSK_C = None
+    _VOSK_FFI = None
+
+
+class AudioSlab:
+    __slots__ = ("buffer", "view", "length", "captured")
+
+    def __init__(self, size: int) -> None:
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.length = 0
+        self.captured = 0.0
+
+    def write(self, source: Any, captured: float) -> None:
+        size = len(source)
+        if size > len(self.buffer):
+            source = memoryview(source)[: len(self.buffer)]
+            size = len(self.buffer)
+        self.view[:size] = source
+        self.length = size
+        self.captured = captured
+
+    def data(self) -> memoryview:
+        if self.length == len(self.buffer):
+            return self.view
+        return self.view[: self.length]
+
+
+class BufferPool:
+    def __init__(self, block_bytes: int, count: int = 32) -> None:
+        self.block_bytes = block_bytes
+        self.capacity = max(1, count)
+        self._free: Deque[AudioSlab] = deque(AudioSlab(block_bytes) for _ in range(self.capacity))
+        self.dropped = 0
+
+    def available(self) -> int:
+        return len(self._free)
+
+    def fill(self, source: Any, captured: float) -> Optional[AudioSlab]:
+        try:
+            slab = self._free.popleft()
+        except IndexError:
+            self.dropped += 1
+            return None
+        slab.write(source, captured)
+        return slab
+
+    def release(self, slab: AudioSlab) -> None:
+        slab.length = 0
+        self._free.append(slab)
+
+
+def rms(data: Any) -> float:
+    size = len(data) - len(data) % 2
+    if size <= 0:
+        return 0.0
+    samples = memoryview(data)[:size].cast("h")
+    return (sum(map(mul, samples, samples)) / len(samples)) ** 0.5
+
+
+def accept_waveform(recognizer: Any, data: Any) -> bool:
+    handle = getattr(recognizer, "_handle", None)
+    if handle is None or _VOSK_C is None or isinstance(data, bytes):
+        return bool(recognizer.AcceptWaveform(data))
+    result = _VOSK_C.vosk_recognizer_accept_waveform(handle, _VOSK_FFI.from_buffer(data), len(data))
+    if result < 0:
+        raise RuntimeError("Failed to process waveform")
+    return bool(result)
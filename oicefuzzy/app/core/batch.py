@@ -0,0 +1,171 @@
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from app.core.actions import ActionDispatcher, ActionResult, PreparedAction
+from app.core.commands import CommandMatcher, CommandProcessor
+from app.core.system import RecordingSystemBackend
+
+
+@dataclass
+class BatchItem:
+    line: int
+    text: str
+    expected: Optional[str] = None
+
+
+@dataclass
+class BatchResult:
+    line: int
+    text: str
+    command: Optional[str]
+    params: Dict[str, str] = field(default_factory=dict)
+    ms: float = 0.0
+    expected: Optional[str] = None
+    log: Optional[str] = None
+
+    @property
+    def mismatch(self) -> bool:
+        return self.expected is not None and self.expected != (self.command or "")
+
+
+class DryRunDispatcher(ActionDispatcher):
+    def __init__(self) -> None:
+        super().__init__({}, [], None, system=RecordingSystemBackend())
+        self._lock = threading.Lock()
+        self.calls: List[Tuple[str, Dict[str, str], str]] = []
+
+    def dispatch(
+        self,
+        action: Dict[str, Any],
+        params: Dict[str, str],
+        raw_text: str,
+        prepared: Optional[PreparedAction] = None,
+    ) -> ActionResult:
+        action_type = action.get("type", "")
+        with self._lock:
+            self.calls.append((action_type, dict(params), raw_text))
+        return ActionResult(True, f"dry-run: {action_type}")
+
+
+def read_items(lines: Iterable[str]) -> Iterator[BatchItem]:
+    for number, raw in enumerate(lines, start=1):
+        line = raw.rstrip("\r\n")
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        text, _, expected = line.partition("\t")
+        yield BatchItem(number, text.strip(), expected.strip() if expected else None)
+
+
+class BatchRunner:
+    def __init__(self, commands: List[Dict[str, Any]], wake_word: str = "", dispatch: bool = False) -> None:
+        self._matcher = CommandMatcher(commands)
+        self._dispatcher = DryRunDispatcher()
+        self._processor = CommandProcessor(self._dispatcher, wake_word)
+        self._dispatch = dispatch
+
+    @property
+    def dispatcher(self) -> DryRunDispatcher:
+        return self._dispatcher
+
+    def run_one(self, item: BatchItem) -> BatchResult:
+        started = time.perf_counter()
+        routes = self._processor.resolve_chain(item.text, self._matcher)
+        log = None
+        if self._dispatch and routes:
+            log = self._processor.run_chain(routes).log
+        elapsed = (time.perf_counter() - started) * 1000.0
+        if not routes:
+            return BatchResult(item.line, item.text, None, {}, elapsed, item.expected, log)
+        params: Dict[str, str] = {}
+        for route in routes:
+            params.update(route.params)
+        command = "+".join(route.command_id for route in routes)
+        return BatchResult(item.line, item.text, command, params, elapsed, item.expected, log)
+
+    def run_chunk(self, items: List[BatchItem]) -> List[BatchResult]:
+        return [self.run_one(item) for item in items]
+
+
+_WORKER: Optional[BatchRunner] = None
+
+
+def _init_worker(commands: List[Dict[str, Any]], wake_word: str, dispatch: bool) -> None:
+    global _WORKER
+    _WORKER = BatchRunner(commands, wake_word, dispatch)
+
+
+def _run_worker_chunk(items: List[BatchItem]) -> List[BatchResult]:
+    return _WORKER.run_chunk(items)
+
+
+def _chunks(items: List[BatchItem], size: int) -> List[List[BatchItem]]:
+    return [items[index : index + size] for index in range(0, len(items), size)]
+
+
+def run_batch(
+    items: Iterable[BatchItem],
+    commands: List[Dict[str, Any]],
+    wake_word: str = "",
+    workers: int = 1,
+    processes: bool = False,
+    dispatch: bool = False,
+    chunk_size: int = 256,
+) -> Iterator[BatchResult]:
+    items = list(items)
+    workers = max(1, int(workers))
+    chunks = _chunks(items, max(1, int(chunk_size)))
+    if workers == 1 or len(chunks) <= 1:
+        runner = BatchRunner(commands, wake_word, dispatch)
+        for chunk in chunks:
+            yield from runner.run_chunk(chunk)
+        return
+    if processes:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(commands, wake_word, dispatch)) as pool:
+            for results in pool.map(_run_worker_chunk, chunks):
+                yield from results
+        return
+    runner = BatchRunner(commands, wake_word, dispatch)
+    with ThreadPoolExecutor(workers) as pool:
+        for results in pool.map(runner.run_chunk, chunks):
+            yield from results
+
+
+def run_batch_cli(
+    source: TextIO,
+    output: TextIO,
+    commands: List[Dict[str, Any]],
+    wake_word: str = "",
+    workers: int = 1,
+    processes: bool = False,
+    dispatch: bool = False,
+) -> int:
+    started = time.perf_counter()
+    total = 0
+    unmatched = 0
+    mismatches = 0
+    for result in run_batch(read_items(source), commands, wake_word, workers, processes, dispatch):
+        total += 1
+        if result.command is None:
+            unmatched += 1
+        if result.mismatch:
+            mismatches += 1
+        record = asdict(result)
+        record["ms"] = round(result.ms, 3)
+        if record["expected"] is None:
+            del record["expected"]
+        if record["log"] is None:
+            del record["log"]
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed else 0.0
+    print(
+        f"batch: {total} utterances, {unmatched} unmatched, {mismatches} mismatches, "
+        f"{elapsed:.2f}s ({rate:,.0f}/s, workers={workers}, {'processes' if processes else 'threads'})",
+        file=sys.stderr,
+    )
+    return 1 if mismatches else 0
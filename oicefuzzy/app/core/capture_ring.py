@@ -0,0 +1,160 @@
+import json
+import mmap
+import tempfile
+import threading
+import time
+import wave
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.languages import Utterance
+from app.core.metrics import METRICS
+
+_BIAS = 0x84
+_CLIP = 32635
+
+
+def _encode_sample(sample: int) -> int:
+    sign = 0x80 if sample < 0 else 0
+    magnitude = min(-sample if sign else sample, _CLIP) + _BIAS
+    exponent = max(0, min(7, (magnitude >> 7).bit_length() - 1))
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return ~(sign | (exponent << 4) | mantissa) & 0xFF
+
+
+def _decode_sample(value: int) -> int:
+    value = ~value & 0xFF
+    magnitude = ((((value & 0x0F) << 3) + _BIAS) << ((value >> 4) & 0x07)) - _BIAS
+    return -magnitude if value & 0x80 else magnitude
+
+
+@lru_cache(maxsize=None)
+def _tables() -> Tuple[bytes, array]:
+    encode = bytes(_encode_sample(sample - 65536 if sample > 32767 else sample) for sample in range(65536))
+    return encode, array("h", (_decode_sample(value) for value in range(256)))
+
+
+def mulaw_encode(data: bytes | memoryview) -> bytes:
+    return bytes(map(_tables()[0].__getitem__, memoryview(data).cast("B").cast("H")))
+
+
+def mulaw_decode(data: bytes) -> array:
+    return array("h", map(_tables()[1].__getitem__, data))
+
+
+class CaptureRing:
+    def __init__(self, seconds: float = 30.0, sample_rate: int = 16000) -> None:
+        self.sample_rate = sample_rate
+        self.capacity = max(1, int(seconds * sample_rate))
+        self._file = tempfile.TemporaryFile()
+        self._file.truncate(self.capacity)
+        self._map = mmap.mmap(self._file.fileno(), self.capacity)
+        self._written = 0
+        self._lock = threading.Lock()
+
+    @property
+    def position(self) -> int:
+        return self._written
+
+    def write(self, data: bytes | memoryview) -> int:
+        encoded = mulaw_encode(data)
+        count = len(encoded)
+        if count > self.capacity:
+            encoded = encoded[-self.capacity :]
+        with self._lock:
+            offset = (self._written + count - len(encoded)) % self.capacity
+            first = min(len(encoded), self.capacity - offset)
+            self._map[offset : offset + first] = encoded[:first]
+            if first < len(encoded):
+                self._map[: len(encoded) - first] = encoded[first:]
+            self._written += count
+            return self._written
+
+    def read(self, start: int, end: Optional[int] = None) -> bytes:
+        with self._lock:
+            end = self._written if end is None else min(end, self._written)
+            start = max(start, self._written - self.capacity, 0)
+            if start >= end:
+                return b""
+            offset = start % self.capacity
+            count = end - start
+            if offset + count <= self.capacity:
+                return self._map[offset : offset + count]
+            return self._map[offset:] + self._map[: offset + count - self.capacity]
+
+    def close(self) -> None:
+        with self._lock:
+            self._map.close()
+            self._file.close()
+
+
+class CaptureRecorder:
+    def __init__(self, ring: CaptureRing, directory: Path, keep: int = 50, pre_roll_sec: float = 1.5) -> None:
+        self.ring = ring
+        self.directory = directory
+        self.keep = max(1, int(keep))
+        self._pre_roll = int(pre_roll_sec * ring.sample_rate)
+        self._seq = 0
+
+    def record(self, data: bytes | memoryview) -> None:
+        with METRICS.span("capture.write"):
+            self.ring.write(data)
+
+    def mark(self) -> int:
+        return max(0, self.ring.position - self._pre_roll)
+
+    def dump(self, utterance: Utterance, reason: str, detail: str = "") -> Optional[threading.Thread]:
+        if utterance.audio is None:
+            return None
+        start, end = utterance.audio
+        encoded = self.ring.read(start, end)
+        if not encoded:
+            return None
+        self._seq += 1
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{self._seq:03d}-{reason}"
+        sidecar = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "reason": reason,
+            "detail": detail,
+            "language": utterance.language,
+            "final": utterance.text,
+            "partials": list(utterance.partials),
+            "confidence": utterance.confidence,
+            "alternatives": [{"text": item.text, "confidence": item.confidence} for item in utterance.alternatives],
+            "candidates": dict(utterance.candidates),
+            "sample_rate": self.ring.sample_rate,
+            "duration_sec": round(len(encoded) / self.ring.sample_rate, 3),
+            "truncated": start < end - len(encoded),
+        }
+        thread = threading.Thread(target=self._write, args=(name, encoded, sidecar), daemon=True)
+        thread.start()
+        return thread
+
+    def _write(self, name: str, encoded: bytes, sidecar: Dict[str, Any]) -> None:
+        try:
+            with METRICS.span("capture.dump"):
+                self.directory.mkdir(parents=True, exist_ok=True)
+                with wave.open(str(self.directory / f"{name}.wav"), "wb") as handle:
+                    handle.setnchannels(1)
+                    handle.setsampwidth(2)
+                    handle.setframerate(self.ring.sample_rate)
+                    handle.writeframes(mulaw_decode(encoded).tobytes())
+                (self.directory / f"{name}.json").write_text(
+                    json.dumps(sidecar, ensure_ascii=False, indent=2), encoding="utf-8"
+                )
+                self._prune()
+        except OSError as exc:
+            print(f"[capture] dump failed: {exc}")
+            return
+        print(f"[capture] saved {name}.wav")
+
+    def _prune(self) -> None:
+        recordings = sorted(self.directory.glob("*.wav"))
+        for path in recordings[: max(0, len(recordings) - self.keep)]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".json").unlink(missing_ok=True)
+
+    def close(self) -> None:
+        self.ring.close()
@@ -1,8 +1,11 @@
 import re
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from app.core.actions import ActionDispatcher, ActionResult
+from app.core.actions import ActionDispatcher, ActionResult, PreparedAction
+from app.core.languages import Hypothesis
+from app.core.math_eval import looks_like_math
+from app.core.metrics import METRICS
 from app.core.utils import normalize_text
 
 
@@ -11,32 +14,71 @@ class MatchResult:
     command_id: str
     action: Dict[str, Any]
     params: Dict[str, str]
+    span: Tuple[int, int] = (0, 0)
+    exact: bool = False
+    prepared: Optional[PreparedAction] = None
 
 
 class CommandMatcher:
-    def __init__(self, commands: List[Dict[str, Any]]) -> None:
+    def __init__(self, commands: List[Dict[str, Any]], dispatcher: Optional[ActionDispatcher] = None) -> None:
         self._compiled = []
+        self.problems: List[str] = []
         for command in commands:
             command_id = command.get("id", "")
             action = command.get("action", {})
+            prepared = None
+            if dispatcher is not None:
+                try:
+                    prepared = dispatcher.prepare(action)
+                except (TypeError, ValueError) as exc:
+                    self.problems.append(f"{command_id}: {exc}")
+                    continue
             for pattern in command.get("patterns", []):
                 regex, loose = self._compile_pattern(pattern)
-                self._compiled.append((command_id, regex, loose, action))
+                self._compiled.append((command_id, regex, loose, action, prepared))
+        for problem in self.problems:
+            print(f"[commands] {problem}")
 
     def match(self, text: str) -> Optional[MatchResult]:
+        with METRICS.span("command.match"):
+            return self._match(text)
+
+    def match_nbest(self, hypotheses: List[Hypothesis]) -> Optional[Tuple[int, MatchResult]]:
+        with METRICS.span("command.match_nbest"):
+            best: Optional[Tuple[int, MatchResult]] = None
+            best_score = 0.0
+            for index, hypothesis in enumerate(hypotheses):
+                match = self._match(hypothesis.text)
+                if match is None:
+                    continue
+                score = hypothesis.confidence * self._quality(match, len(normalize_text(hypothesis.text)))
+                if best is None or score > best_score:
+                    best, best_score = (index, match), score
+            if best is not None and best[0] > 0:
+                METRICS.count("command.nbest_rescued")
+            return best
+
+    @staticmethod
+    def _quality(match: MatchResult, length: int) -> float:
+        if match.exact:
+            return 1.0
+        start, end = match.span
+        return 0.5 * (end - start) / max(1, length)
+
+    def _match(self, text: str) -> Optional[MatchResult]:
         normalized = normalize_text(text)
-        for command_id, regex, loose, action in self._compiled:
+        for command_id, regex, loose, action, prepared in self._compiled:
             match = regex.match(normalized)
             if match:
                 params = {k: v.strip() for k, v in match.groupdict().items() if v}
-                return MatchResult(command_id, action, params)
-        for command_id, regex, loose, action in self._compiled:
+                return MatchResult(command_id, action, params, match.span(), match.span() == (0, len(normalized)), prepared)
+        for command_id, regex, loose, action, prepared in self._compiled:
             if not loose:
                 continue
             match = loose.search(normalized)
             if match:
                 params = {k: v.strip() for k, v in match.groupdict().items() if v}
-                return MatchResult(command_id, action, params)
+                return MatchResult(command_id, action, params, match.span(), False, prepared)
         return None
 
     def _compile_pattern(self, pattern: str) -> tuple[re.Pattern, re.Pattern | None]:
@@ -57,29 +99,182 @@ class CommandMatcher:
         return exact, loose
 
 
+@dataclass
+class CommandRoute:
+    command_id: str
+    action: Dict[str, Any]
+    params: Dict[str, str]
+    text: str
+    prepared: Optional[PreparedAction] = None
+
+
+TIMER_FALLBACK = "timer_fallback"
+MATH_FALLBACK = "math_fallback"
+UNRESOLVED = "unresolved"
+DEFAULT_CHAIN_WORDS = "\u0438 \u043f\u043e\u0442\u043e\u043c|\u0430 \u043f\u043e\u0442\u043e\u043c|\u043f\u043e\u0442\u043e\u043c|\u0437\u0430\u0442\u0435\u043c|\u0438"
+
+
 class CommandProcessor:
-    def __init__(self, dispatcher: ActionDispatcher, wake_word: str) -> None:
+    def __init__(
+        self,
+        dispatcher: ActionDispatcher,
+        wake_word: str,
+        chaining: bool = True,
+        chain_words: str = DEFAULT_CHAIN_WORDS,
+    ) -> None:
         self._dispatcher = dispatcher
         self._wake_words = self._split_wake_words(wake_word)
+        self._chaining = chaining
+        self._chain_split = self._compile_chain_words(chain_words)
 
-    def handle(self, text: str, matcher: CommandMatcher) -> ActionResult:
-        if not text:
-            return ActionResult(False, "\u041a\u043e\u043c\u0430\u043d\u0434\u0430 \u043d\u0435 \u0440\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u0430")
+    def strip_wake_word(self, text: str) -> str:
         cleaned = normalize_text(text)
         for word in self._wake_words:
             if cleaned.startswith(word):
-                cleaned = cleaned[len(word) :].strip()
-                break
+                return cleaned[len(word) :].strip()
+        return cleaned
+
+    def resolve(self, text: str, matcher: CommandMatcher) -> Optional[CommandRoute]:
+        if not text:
+            return None
+        cleaned = self.strip_wake_word(text)
         if not cleaned:
-            return ActionResult(False, "\u041a\u043e\u043c\u0430\u043d\u0434\u0430 \u043d\u0435 \u0440\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u0430")
+            return None
+        return self._resolve_cleaned(cleaned, matcher)
+
+    def resolve_chain(
+        self, text: str, matcher: CommandMatcher, alternatives: Optional[List[Hypothesis]] = None
+    ) -> List[CommandRoute]:
+        if alternatives and len(alternatives) > 1:
+            return self._resolve_nbest(alternatives, matcher)
+        if not text:
+            return []
+        cleaned = self.strip_wake_word(text)
+        if not cleaned:
+            return []
+        return self._routes_for(cleaned, matcher.match(cleaned), matcher)
+
+    def _resolve_nbest(self, alternatives: List[Hypothesis], matcher: CommandMatcher) -> List[CommandRoute]:
+        hypotheses = [Hypothesis(self.strip_wake_word(item.text), item.confidence) for item in alternatives]
+        hypotheses = [hypothesis for hypothesis in hypotheses if hypothesis.text]
+        if not hypotheses:
+            return []
+        best = matcher.match_nbest(hypotheses)
+        if best is None:
+            route = self._fallback(hypotheses[0].text)
+            return [route] if route else []
+        index, match = best
+        return self._routes_for(hypotheses[index].text, match, matcher)
+
+    def _routes_for(self, cleaned: str, match: Optional[MatchResult], matcher: CommandMatcher) -> List[CommandRoute]:
+        exact = match is not None and match.exact
+        if exact and not self._swallows_chain(match):
+            return [CommandRoute(match.command_id, match.action, match.params, cleaned, match.prepared)]
+        if self._chaining and self._chain_split:
+            routes = self._split_chain(cleaned, matcher)
+            if len(routes) > 1 and not (exact and routes[0].command_id == UNRESOLVED):
+                METRICS.count("command.chained")
+                return routes
+        if match:
+            return [CommandRoute(match.command_id, match.action, match.params, cleaned, match.prepared)]
+        route = self._fallback(cleaned)
+        return [route] if route else []
+
+    def handle(
+        self, text: str, matcher: CommandMatcher, alternatives: Optional[List[Hypothesis]] = None
+    ) -> ActionResult:
+        routes = self.resolve_chain(text, matcher, alternatives)
+        if not routes:
+            return ActionResult(False, "\u041a\u043e\u043c\u0430\u043d\u0434\u0430 \u043d\u0435 \u0440\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u0430", routed=False)
+        if len(routes) == 1:
+            route = routes[0]
+            return self._dispatcher.dispatch(route.action, route.params, text, route.prepared)
+        return self.run_chain(routes)
+
+    def run_chain(self, routes: List[CommandRoute]) -> ActionResult:
+        steps: List[ActionResult] = []
+        for route in routes:
+            if route.command_id == UNRESOLVED:
+                steps.append(ActionResult(False, f"\u041d\u0435 \u0440\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u043e: {route.text}", routed=False))
+                continue
+            result = self._dispatcher.dispatch(route.action, route.params, route.text, route.prepared)
+            steps.append(result)
+            if not result.ok:
+                break
+        replies = []
+        for step in steps:
+            reply = step.tts or ("" if step.ok else step.log)
+            if reply and reply not in replies:
+                replies.append(reply)
+        ok = len(steps) == len(routes) and all(step.ok for step in steps)
+        log = "; ".join(step.log for step in steps if step.log)
+        if not ok:
+            log += f" (\u0432\u044b\u043f\u043e\u043b\u043d\u0435\u043d\u043e \u0448\u0430\u0433\u043e\u0432: {sum(step.ok for step in steps)} \u0438\u0437 {len(routes)})"
+        return ActionResult(ok, log, ". ".join(replies) or None, steps, all(step.routed for step in steps))
+
+    def _resolve_cleaned(self, cleaned: str, matcher: CommandMatcher) -> Optional[CommandRoute]:
         match = matcher.match(cleaned)
         if match:
-            return self._dispatcher.dispatch(match.action, match.params, text)
+            return CommandRoute(match.command_id, match.action, match.params, cleaned, match.prepared)
+        return self._fallback(cleaned)
+
+    def _fallback(self, cleaned: str) -> Optional[CommandRoute]:
         if "\u0442\u0430\u0439\u043c\u0435\u0440" in cleaned:
-            return self._dispatcher.dispatch({"type": "timer_set"}, {"payload": cleaned}, text)
-        if re.search(r"\d", cleaned):
-            return self._dispatcher.dispatch({"type": "math_eval"}, {"expr": cleaned}, text)
-        return ActionResult(False, "\u041a\u043e\u043c\u0430\u043d\u0434\u0430 \u043d\u0435 \u0440\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u0430")
+            return CommandRoute(TIMER_FALLBACK, {"type": "timer_set"}, {"payload": cleaned}, cleaned)
+        if looks_like_math(cleaned):
+            return CommandRoute(MATH_FALLBACK, {"type": "math_eval"}, {"expr": cleaned}, cleaned)
+        return None
+
+    def _split_chain(self, cleaned: str, matcher: CommandMatcher) -> List[CommandRoute]:
+        pieces = [piece.strip() for piece in self._chain_split.split(cleaned)]
+        if len(pieces) < 3:
+            return []
+        segments: List[str] = []
+        for index in range(0, len(pieces), 2):
+            piece = pieces[index]
+            if not segments or (piece and matcher.match(piece) is not None):
+                if piece:
+                    segments.append(piece)
+                continue
+            elided = self._elide(segments[-1], piece, matcher) if piece else None
+            if elided:
+                segments.append(elided)
+            else:
+                segments[-1] = f"{segments[-1]} {pieces[index - 1]} {piece}".strip()
+        if len(segments) < 2:
+            return []
+        routes = []
+        for segment in segments:
+            route = self._resolve_cleaned(segment, matcher)
+            routes.append(route or CommandRoute(UNRESOLVED, {"type": UNRESOLVED}, {}, segment))
+        return routes
+
+    def _swallows_chain(self, match: MatchResult) -> bool:
+        if not self._chaining or self._chain_split is None:
+            return False
+        return any(self._chain_split.search(value) for value in match.params.values())
+
+    @staticmethod
+    def _elide(previous: str, piece: str, matcher: CommandMatcher) -> Optional[str]:
+        match = matcher.match(previous)
+        if match is None or not match.exact or match.params:
+            return None
+        words = previous.split()
+        for cut in range(len(words) - 1, 0, -1):
+            candidate = " ".join(words[:cut] + [piece])
+            elided = matcher.match(candidate)
+            if elided and elided.exact and not elided.params:
+                return candidate
+        return None
+
+    @staticmethod
+    def _compile_chain_words(chain_words: str) -> Optional[re.Pattern]:
+        words = {normalize_text(part) for part in re.split(r"[|,;]+", chain_words or "")}
+        words = sorted((word for word in words if word), key=len, reverse=True)
+        if not words:
+            return None
+        alternation = "|".join(re.escape(word).replace("\\ ", r"\s+") for word in words)
+        return re.compile(rf"(?:^|\s+)({alternation})(?=\s|$)", re.IGNORECASE)
 
     @staticmethod
     def _split_wake_words(wake_word: str) -> list[str]:
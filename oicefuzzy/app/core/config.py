@@ -15,10 +15,12 @@ class ConfigStore:
         self.commands_path = self.config_dir / "commands.yaml"
         self.targets_path = self.config_dir / "targets.yaml"
         self.allowlist_path = self.config_dir / "allowlist.yaml"
+        self.routines_path = self.config_dir / "routines.yaml"
         self._settings: Dict[str, Any] = {}
         self._commands: List[Dict[str, Any]] = []
         self._targets: Dict[str, str] = {}
         self._allowlist: List[Dict[str, Any]] = []
+        self._routines: List[Dict[str, Any]] = []
         self.reload_all()
 
     def reload_all(self) -> None:
@@ -26,6 +28,7 @@ class ConfigStore:
         self._commands = (self._load_yaml(self.commands_path) or {}).get("commands", [])
         self._targets = (self._load_yaml(self.targets_path) or {}).get("aliases", {})
         self._allowlist = (self._load_yaml(self.allowlist_path) or {}).get("items", [])
+        self._routines = (self._load_yaml(self.routines_path) or {}).get("routines", [])
 
     def _load_yaml(self, path: Path) -> Dict[str, Any] | None:
         if not path.exists():
@@ -55,6 +58,10 @@ class ConfigStore:
     def allowlist(self) -> List[Dict[str, Any]]:
         return self._allowlist
 
+    @property
+    def routines(self) -> List[Dict[str, Any]]:
+        return self._routines
+
     def get_setting(self, *keys: str, default: Any = None) -> Any:
         current: Any = self._settings
         for key in keys:
@@ -86,6 +93,7 @@ class ConfigStore:
                 "commands": self._commands,
                 "targets": self._targets,
                 "allowlist": self._allowlist,
+                "routines": self._routines,
             },
             ensure_ascii=True,
             indent=2,
@@ -0,0 +1,156 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+import sounddevice as sd
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from app.core.metrics import METRICS
+
+
+@dataclass(frozen=True)
+class InputDevice:
+    index: int
+    name: str
+    hostapi: int = 0
+    channels: int = 1
+
+
+PORTAUDIO_LOCK = threading.RLock()
+
+DeviceQuery = Callable[[bool], Tuple[List[InputDevice], Optional[int]]]
+
+
+def query_input_devices(rescan: bool = False) -> Tuple[List[InputDevice], Optional[int]]:
+    with PORTAUDIO_LOCK:
+        if rescan and hasattr(sd, "_terminate") and hasattr(sd, "_initialize"):
+            sd._terminate()
+            sd._initialize()
+        found = sd.query_devices()
+    devices = []
+    for idx, device in enumerate(found):
+        if device.get("max_input_channels", 0) > 0:
+            devices.append(
+                InputDevice(idx, device.get("name", ""), int(device.get("hostapi", 0)), int(device["max_input_channels"]))
+            )
+    try:
+        default = sd.default.device[0]
+    except Exception:
+        default = None
+    return devices, default if isinstance(default, int) and default >= 0 else None
+
+
+def _media_devices() -> Any:
+    try:
+        from PySide6.QtMultimedia import QMediaDevices
+    except ImportError:
+        return None
+    return QMediaDevices()
+
+
+class DeviceManager(QObject):
+    devices_changed = Signal(object)
+    default_changed = Signal(object)
+
+    def __init__(self, query: Optional[DeviceQuery] = None, poll_sec: float = 0.0, watch: bool = True) -> None:
+        super().__init__()
+        self._query = query or query_input_devices
+        self._lock = threading.Lock()
+        self._devices: List[InputDevice] = []
+        self._default: Optional[int] = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._rescan_pending = False
+        self._listener: Any = None
+        self._watcher = _media_devices() if watch else None
+        if self._watcher is not None:
+            self._watcher.audioInputsChanged.connect(self._on_hotplug)
+        self._poll = QTimer(self)
+        self._poll.timeout.connect(self._on_poll)
+        if poll_sec > 0 and self._watcher is None:
+            self._poll.start(int(poll_sec * 1000))
+
+    def devices(self) -> List[InputDevice]:
+        with self._lock:
+            return list(self._devices)
+
+    def default_index(self) -> Optional[int]:
+        return self._default
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def name_of(self, index: Optional[int]) -> Optional[str]:
+        if index is None:
+            return None
+        return next((device.name for device in self.devices() if device.index == index), None)
+
+    def index_of(self, name: Optional[str]) -> Optional[int]:
+        if not name:
+            return None
+        return next((device.index for device in self.devices() if device.name == name), None)
+
+    def refresh(self, rescan: bool = False) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._rescan_pending = self._rescan_pending or rescan
+                return
+            self._thread = threading.Thread(target=self._refresh_loop, args=(rescan,), daemon=True)
+            self._thread.start()
+
+    def follow(self, listener: Any) -> None:
+        self._listener = listener
+        listener.device_lost.connect(self._on_hotplug)
+
+    def _refresh_loop(self, rescan: bool) -> None:
+        while True:
+            self._enumerate(rescan)
+            with self._lock:
+                rescan = self._rescan_pending
+                self._rescan_pending = False
+                if not rescan:
+                    self._thread = None
+                    return
+
+    def _enumerate(self, rescan: bool) -> None:
+        try:
+            with METRICS.span("audio.device_query"):
+                devices, default = self._query(rescan)
+        except Exception as exc:
+            print(f"[devices] enumeration failed: {exc}")
+            self._ready.set()
+            return
+        with self._lock:
+            changed = devices != self._devices
+            default_changed = default != self._default
+            self._devices = list(devices)
+            self._default = default
+        self._ready.set()
+        if changed:
+            self.devices_changed.emit(list(devices))
+        if default_changed:
+            self.default_changed.emit(default)
+
+    def _on_hotplug(self, *args) -> None:
+        METRICS.count("audio.hotplug")
+        listener = self._listener
+        if listener is None or not listener.is_capturing():
+            self.refresh(rescan=True)
+            return
+        name = self.name_of(listener.device_index)
+
+        def resolve() -> Optional[int]:
+            self._enumerate(True)
+            index = self.index_of(name)
+            if name and index is None:
+                print(f"[devices] {name} is gone, using the default input")
+            return index
+
+        listener.reopen_stream(resolve)
+
+    def _on_poll(self) -> None:
+        listener = self._listener
+        self.refresh(rescan=listener is None or not listener.is_capturing())
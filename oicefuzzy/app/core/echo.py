@@ -0,0 +1,122 @@
+import sys
+import threading
+import time
+import wave
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Deque, List, Optional
+
+ECHO_MODES = ("off", "gate", "attenuate")
+
+
+@dataclass
+class SpeakingInterval:
+    start: float
+    end: float | None
+    text: str
+    reference: Optional[Path] = None
+
+    def covers(self, at: float, tail: float, span: float = 0.0) -> bool:
+        if at < self.start:
+            return False
+        return self.end is None or at - span <= self.end + tail
+
+
+def clip_duration(path: Path) -> float:
+    try:
+        with wave.open(str(path), "rb") as handle:
+            rate = handle.getframerate()
+            return handle.getnframes() / rate if rate else 0.0
+    except (OSError, EOFError, wave.Error):
+        return 0.0
+
+
+def attenuate(data: bytes, factor: float) -> bytes:
+    samples = array("h", data[: len(data) - len(data) % 2])
+    if sys.byteorder != "little":
+        samples.byteswap()
+    scaled = array("h", [int(sample * factor) for sample in samples])
+    if sys.byteorder != "little":
+        scaled.byteswap()
+    return scaled.tobytes()
+
+
+def attenuate_into(data: bytearray | memoryview, factor: float) -> None:
+    samples = memoryview(data)[: len(data) - len(data) % 2].cast("h")
+    for index, sample in enumerate(samples):
+        samples[index] = int(sample * factor)
+
+
+class EchoGate:
+    def __init__(
+        self,
+        mode: str = "attenuate",
+        tail_ms: int = 300,
+        attenuation: float = 0.2,
+        sample_rate: int = 16000,
+        history: int = 32,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._intervals: Deque[SpeakingInterval] = deque(maxlen=max(1, history))
+        self._mode = "gate"
+        self.mode = mode
+        self._tail = max(0, int(tail_ms)) / 1000.0
+        self._attenuation = max(0.0, min(1.0, float(attenuation)))
+        self._sample_rate = max(1, int(sample_rate))
+        self.frames_total = 0
+        self.frames_gated = 0
+        self.frames_attenuated = 0
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @mode.setter
+    def mode(self, value: str) -> None:
+        value = (value or "off").strip().lower()
+        self._mode = value if value in ECHO_MODES else "off"
+
+    def begin(self, text: str, reference: Optional[Path] = None, at: float | None = None) -> None:
+        start = time.monotonic() if at is None else at
+        end = None
+        if reference is not None:
+            duration = clip_duration(reference)
+            end = start + duration if duration > 0 else None
+        with self._lock:
+            self._intervals.append(SpeakingInterval(start, end, text, reference))
+
+    def end(self, at: float | None = None) -> None:
+        stamp = time.monotonic() if at is None else at
+        with self._lock:
+            if self._intervals:
+                current = self._intervals[-1]
+                current.end = stamp if current.end is None else min(current.end, stamp)
+
+    def speaking(self, at: float | None = None, span: float = 0.0) -> bool:
+        stamp = time.monotonic() if at is None else at
+        with self._lock:
+            for interval in reversed(self._intervals):
+                if interval.covers(stamp, self._tail, span):
+                    return True
+                if interval.end is not None and interval.end + self._tail < stamp - span:
+                    return False
+        return False
+
+    def process(self, data: bytes | memoryview, at: float) -> bytes | memoryview | None:
+        self.frames_total += 1
+        if self._mode == "off" or not self.speaking(at, len(data) / 2 / self._sample_rate):
+            return data
+        if self._mode == "gate":
+            self.frames_gated += 1
+            return None
+        self.frames_attenuated += 1
+        if isinstance(data, (bytearray, memoryview)) and not getattr(data, "readonly", False):
+            attenuate_into(data, self._attenuation)
+            return data
+        return attenuate(data, self._attenuation)
+
+    def intervals(self) -> List[SpeakingInterval]:
+        with self._lock:
+            return list(self._intervals)
@@ -0,0 +1,145 @@
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from app.core.metrics import METRICS
+from app.core.utils import normalize_text
+
+
+@dataclass
+class LanguageRoute:
+    code: str
+    model_path: str
+    wake_words: List[str] = field(default_factory=list)
+    commands_path: str = ""
+
+
+@dataclass
+class Hypothesis:
+    text: str
+    confidence: float = 1.0
+
+
+@dataclass
+class Utterance:
+    text: str
+    language: str
+    confidence: float = 1.0
+    candidates: Dict[str, str] = field(default_factory=dict)
+    alternatives: List[Hypothesis] = field(default_factory=list)
+    partials: List[str] = field(default_factory=list)
+    audio: Optional[Tuple[int, int]] = None
+
+
+def split_wake_words(wake_word: str) -> List[str]:
+    if not wake_word:
+        return []
+    return [word for word in (normalize_text(part) for part in re.split(r"[|,;]+", wake_word)) if word]
+
+
+def mean_confidence(result: Dict[str, Any]) -> Optional[float]:
+    words = result.get("result") or []
+    if not words:
+        return None
+    return sum(float(word.get("conf", 0.0)) for word in words) / len(words)
+
+
+def result_text(result: Dict[str, Any]) -> str:
+    alternatives = result.get("alternatives")
+    if alternatives:
+        return alternatives[0].get("text", "")
+    return result.get("text", "")
+
+
+def result_hypotheses(result: Dict[str, Any], temperature: float = 10.0) -> List[Hypothesis]:
+    alternatives = result.get("alternatives")
+    if not alternatives:
+        text = result.get("text", "")
+        if not text:
+            return []
+        confidence = mean_confidence(result)
+        return [Hypothesis(text, 1.0 if confidence is None else confidence)]
+    scores = [float(alternative.get("confidence", 0.0)) for alternative in alternatives]
+    top = max(scores)
+    weights = [math.exp((score - top) / temperature) for score in scores]
+    total = sum(weights)
+    hypotheses: Dict[str, Hypothesis] = {}
+    for alternative, weight in zip(alternatives, weights):
+        text = alternative.get("text", "")
+        if text and text not in hypotheses:
+            hypotheses[text] = Hypothesis(text, weight / total)
+    return list(hypotheses.values())
+
+
+def combine_hypotheses(segments: List[List[Hypothesis]], limit: int) -> List[Hypothesis]:
+    segments = [segment for segment in segments if segment]
+    if not segments:
+        return []
+    top = [segment[0] for segment in segments]
+    variants = [top]
+    for index, segment in enumerate(segments):
+        for alternative in segment[1:]:
+            variants.append(top[:index] + [alternative] + top[index + 1 :])
+    combined: Dict[str, Hypothesis] = {}
+    for variant in variants:
+        text = " ".join(hypothesis.text for hypothesis in variant)
+        if text not in combined:
+            combined[text] = Hypothesis(text, math.prod(hypothesis.confidence for hypothesis in variant))
+    ranked = sorted(combined.values(), key=lambda hypothesis: hypothesis.confidence, reverse=True)
+    return ranked[: max(1, limit)]
+
+
+def load_commands(path: str) -> List[Dict[str, Any]]:
+    source = Path(path)
+    if not path or not source.exists():
+        return []
+    with source.open("r", encoding="utf-8") as handle:
+        return (yaml.safe_load(handle) or {}).get("commands", [])
+
+
+class ModelPool:
+    def __init__(self, loader: Optional[Callable[[str], Any]] = None) -> None:
+        self._loader = loader
+        self._models: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def loaded(self, path: str) -> bool:
+        return path in self._models
+
+    def get(self, path: str, label: str = "") -> Any:
+        model = self._models.get(path)
+        if model is not None:
+            return model
+        with self._lock:
+            lock = self._locks.setdefault(path, threading.Lock())
+        with lock:
+            model = self._models.get(path)
+            if model is None:
+                with METRICS.span(f"stt.model_load.{label}" if label else "stt.model_load"):
+                    model = self._load(path)
+                self._models[path] = model
+        return model
+
+    def preload(self, path: str, label: str = "") -> threading.Thread:
+        def run() -> None:
+            try:
+                self.get(path, label)
+            except Exception as exc:
+                print(f"[stt] model preload failed for {path}: {exc}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def _load(self, path: str) -> Any:
+        if self._loader is not None:
+            return self._loader(path)
+        from vosk import Model
+
+        return Model(path)
@@ -1,169 +1,464 @@
+import contextlib
 import math
 import re
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List, Tuple
+from decimal import Context, Decimal, localcontext
+from fractions import Fraction
+from typing import Any, ContextManager, Dict, List, Tuple
+
+from app.core.numerals import replace_number_words
 
 
 @dataclass
 class MathResult:
     ok: bool
-    value: float | None = None
+    value: Any = None
     error: str | None = None
+    precision: int | None = None
+    mode: str = "float"
+
+
+class MathError(ValueError):
+    def __init__(self, code: str) -> None:
+        super().__init__(code)
+        self.code = code
+
+
+_MAX_SPOKEN_DENOMINATOR = 1000
+
+
+class ArithmeticBackend:
+    name = "float"
+
+    def number(self, literal: str) -> Any:
+        return float(literal)
+
+    def sqrt(self, value: Any) -> Any:
+        return math.sqrt(value)
+
+    def power(self, base: Any, exponent: Any) -> Any:
+        return math.pow(base, exponent)
+
+    def is_finite(self, value: Any) -> bool:
+        return not (math.isnan(value) or math.isinf(value))
+
+    def context(self) -> ContextManager:
+        return contextlib.nullcontext()
+
+    def format(self, value: Any, digits: int) -> str:
+        if abs(value - round(value)) < 1e-9:
+            return str(int(round(value)))
+        if digits == 0:
+            return str(int(round(value)))
+        return f"{value:.{digits}f}".rstrip("0").rstrip(".")
+
+
+class DecimalBackend(ArithmeticBackend):
+    name = "decimal"
+
+    def __init__(self, precision: int = 34) -> None:
+        self._context = Context(prec=precision)
+
+    def number(self, literal: str) -> Any:
+        return Decimal(literal)
+
+    def sqrt(self, value: Any) -> Any:
+        return value.sqrt()
+
+    def power(self, base: Any, exponent: Any) -> Any:
+        if exponent == exponent.to_integral_value():
+            if not exponent and not base:
+                return Decimal(1)
+            return base ** int(exponent)
+        return base ** exponent
+
+    def is_finite(self, value: Any) -> bool:
+        return value.is_finite()
+
+    def context(self) -> ContextManager:
+        return localcontext(self._context)
+
+    def format(self, value: Any, digits: int) -> str:
+        exponent = value.adjusted()
+        if exponent >= self._context.prec:
+            mantissa = value.scaleb(-exponent, context=self._context)
+            mantissa = mantissa.quantize(Decimal(1).scaleb(-digits), context=self._context)
+            return f"{format(mantissa.normalize(self._context), 'f')}e+{exponent}"
+        if value == value.to_integral_value():
+            return str(int(value))
+        rounded = value.quantize(Decimal(1).scaleb(-digits), context=self._context)
+        if rounded == rounded.to_integral_value():
+            return str(int(rounded))
+        return format(rounded.normalize(self._context), "f")
+
+
+class FractionBackend(ArithmeticBackend):
+    name = "fraction"
+
+    def number(self, literal: str) -> Any:
+        return Fraction(literal)
+
+    def sqrt(self, value: Any) -> Any:
+        numerator = math.isqrt(value.numerator)
+        denominator = math.isqrt(value.denominator)
+        if numerator * numerator == value.numerator and denominator * denominator == value.denominator:
+            return Fraction(numerator, denominator)
+        with localcontext(Context(prec=34)):
+            return Fraction(Decimal(value.numerator).sqrt() / Decimal(value.denominator).sqrt())
+
+    def power(self, base: Any, exponent: Any) -> Any:
+        if exponent.denominator == 1:
+            return base ** int(exponent)
+        return Fraction(math.pow(base, exponent))
+
+    def is_finite(self, value: Any) -> bool:
+        return True
+
+    def format(self, value: Any, digits: int) -> str:
+        if value.denominator == 1:
+            return str(value.numerator)
+        denominator = value.denominator
+        for factor in (2, 5):
+            while denominator % factor == 0:
+                denominator //= factor
+        if denominator == 1:
+            with localcontext(Context(prec=max(34, digits + 20))):
+                exact = Decimal(value.numerator) / Decimal(value.denominator)
+            text = format(exact.normalize(), "f")
+            if len(text.partition(".")[2]) <= digits:
+                return text
+        if value.denominator <= _MAX_SPOKEN_DENOMINATOR:
+            return f"{value.numerator}/{value.denominator}"
+        with localcontext(Context(prec=max(34, digits + 20))):
+            approx = Decimal(value.numerator) / Decimal(value.denominator)
+        return BACKENDS["decimal"].format(approx, digits)
+
+
+BACKENDS: Dict[str, ArithmeticBackend] = {
+    backend.name: backend for backend in (ArithmeticBackend(), DecimalBackend(), FractionBackend())
+}
+
+
+_WORD_OPERATORS = {
+    "\u0443\u043c\u043d\u043e\u0436\u0438\u0442\u044c \u043d\u0430": "*",
+    "\u0443\u043c\u043d\u043e\u0436\u0438\u0442\u044c": "*",
+    "\u0440\u0430\u0437\u0434\u0435\u043b\u0438\u0442\u044c \u043d\u0430": "/",
+    "\u043f\u043e\u0434\u0435\u043b\u0438\u0442\u044c \u043d\u0430": "/",
+    "\u0434\u0435\u043b\u0438\u0442\u044c \u043d\u0430": "/",
+    "\u043f\u043b\u044e\u0441": "+",
+    "\u043c\u0438\u043d\u0443\u0441": "-",
+    "\u0432 \u0441\u0442\u0435\u043f\u0435\u043d\u0438": "^",
+    "\u0432 \u043a\u0432\u0430\u0434\u0440\u0430\u0442\u0435": "^2",
+    "\u0432 \u043a\u0443\u0431\u0435": "^3",
+    "\u043a\u0432\u0430\u0434\u0440\u0430\u0442\u043d\u044b\u0439 \u043a\u043e\u0440\u0435\u043d\u044c \u0438\u0437": "\u221a",
+    "\u043a\u043e\u0440\u0435\u043d\u044c \u0438\u0437": "\u221a",
+    "\u043a\u043e\u0440\u0435\u043d\u044c": "\u221a",
+    "\u043f\u0440\u043e\u0446\u0435\u043d\u0442\u043e\u0432": "%",
+    "\u043f\u0440\u043e\u0446\u0435\u043d\u0442\u0430": "%",
+    "\u043f\u0440\u043e\u0446\u0435\u043d\u0442": "%",
+    "\u043e\u0442": "*",
+}
+
+_WORD_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(word) for word in sorted(_WORD_OPERATORS, key=len, reverse=True)) + r")\b"
+)
+_OPERATOR_PATTERN = re.compile(r"[\+\-\*/\^%\u221a\u00d7]|\d\s*[x\u0445]\s*\d")
+_DIGIT_PATTERN = re.compile(r"\d")
+_TIMES_PATTERN = re.compile(r"(?<=[\d\s)])[x\u0445](?=[\s\d(])")
+_EXACT_PATTERN = re.compile(r"\b\u0442\u043e\u0447\u043d\u043e\b")
+_PRECISION_PATTERN = re.compile(r"\u0441 \u0442\u043e\u0447\u043d\u043e\u0441\u0442\u044c\u044e(?: \u0434\u043e)? (\d+)(?: \S+)?")
+_JUNK_PATTERN = re.compile(r"[^0-9\+\-\*/\(\)\.,\^%\u221a]+")
+_SPACE_PATTERN = re.compile(r"\s+")
+
+_MAX_EXPONENT = 1000
+_MAX_DIGITS = 4000
+_LOG10_2 = math.log10(2)
+
+Node = Tuple[Any, ...]
+
+
+def looks_like_math(text: str) -> bool:
+    cleaned = replace_number_words(text.lower().replace("\u0451", "\u0435"), ordinals=False)
+    if not _DIGIT_PATTERN.search(cleaned):
+        return False
+    if _OPERATOR_PATTERN.search(cleaned):
+        return True
+    return any(match.group(0) != "\u043e\u0442" for match in _WORD_PATTERN.finditer(cleaned))
 
 
 class MathEvaluator:
-    def __init__(self, max_length: int = 200, max_depth: int = 6) -> None:
+    def __init__(
+        self,
+        max_length: int = 200,
+        max_depth: int = 6,
+        precision: int = 6,
+        cache_size: int = 256,
+        mode: str = "float",
+        exact_mode: str = "fraction",
+    ) -> None:
         self.max_length = max_length
         self.max_depth = max_depth
+        self.precision = max(0, int(precision))
+        self.mode = mode if mode in BACKENDS else "float"
+        self.exact_mode = exact_mode if exact_mode in BACKENDS else "fraction"
+        self._cache_size = max(0, int(cache_size))
+        self._cache: "OrderedDict[Tuple[str, str], Node | str]" = OrderedDict()
+        self._prepared: "OrderedDict[str, Tuple[str, int | None, bool]]" = OrderedDict()
 
     def extract_expression(self, text: str) -> str:
-        if not text:
-            return ""
-        cleaned = text.lower()
-        cleaned = cleaned.replace("\u0451", "\u0435")
-        replacements = [
-            (r"\b\u0443\u043c\u043d\u043e\u0436\u0438\u0442\u044c \u043d\u0430\b", "*"),
-            (r"\b\u0443\u043c\u043d\u043e\u0436\u0438\u0442\u044c\b", "*"),
-            (r"\b\u0440\u0430\u0437\u0434\u0435\u043b\u0438\u0442\u044c \u043d\u0430\b", "/"),
-            (r"\b\u043f\u043e\u0434\u0435\u043b\u0438\u0442\u044c \u043d\u0430\b", "/"),
-            (r"\b\u0434\u0435\u043b\u0438\u0442\u044c \u043d\u0430\b", "/"),
-            (r"\b\u043f\u043b\u044e\u0441\b", "+"),
-            (r"\b\u043c\u0438\u043d\u0443\u0441\b", "-"),
-        ]
-        for pattern, replacement in replacements:
-            cleaned = re.sub(pattern, replacement, cleaned)
-        cleaned = cleaned.replace("x", "*")
-        cleaned = cleaned.replace("\u0445", "*")
-        cleaned = re.sub(r"[^0-9\+\-\*/\(\)\.,]+", " ", cleaned)
-        cleaned = re.sub(r"\s+", " ", cleaned).strip()
-        return cleaned
-
-    def evaluate(self, text: str) -> MathResult:
-        expr = self.extract_expression(text)
+        expr, _, _ = self._prepare_cached(text)
+        return expr
+
+    def evaluate(self, text: str, mode: str | None = None) -> MathResult:
+        expr, precision, exact = self._prepare_cached(text)
+        if mode not in BACKENDS:
+            mode = self.exact_mode if exact else self.mode
         if not expr:
-            return MathResult(False, error="empty")
+            return MathResult(False, error="empty", mode=mode)
         if len(expr) > self.max_length:
-            return MathResult(False, error="too_long")
+            return MathResult(False, error="too_long", mode=mode)
+        backend = BACKENDS[mode]
+        tree = self.compile(expr, mode)
+        if isinstance(tree, str):
+            return MathResult(False, error=tree, mode=mode)
         try:
-            tokens = self._tokenize(expr)
-            if not tokens:
-                return MathResult(False, error="no_tokens")
-            if self._max_parentheses_depth(tokens) > self.max_depth:
-                return MathResult(False, error="too_deep")
-            rpn = self._to_rpn(tokens)
-            value = self._eval_rpn(rpn)
-            return MathResult(True, value=value)
+            with backend.context():
+                value = self._eval(tree, backend)
+        except MathError as exc:
+            return MathResult(False, error=exc.code, mode=mode)
         except ZeroDivisionError:
-            return MathResult(False, error="divide_by_zero")
-        except Exception:
-            return MathResult(False, error="invalid")
+            return MathResult(False, error="divide_by_zero", mode=mode)
+        except (ArithmeticError, ValueError):
+            return MathResult(False, error="invalid", mode=mode)
+        if not backend.is_finite(value):
+            return MathResult(False, error="invalid", mode=mode)
+        return MathResult(True, value=value, precision=precision, mode=mode)
+
+    def compile(self, expr: str, mode: str = "float") -> Node | str:
+        key = (mode, expr)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+        try:
+            tokens = self._scan(expr, BACKENDS.get(mode, BACKENDS["float"]))
+            if not tokens:
+                compiled: Node | str = "no_tokens"
+            else:
+                compiled = _Parser(tokens, self.max_depth).parse()
+        except MathError as exc:
+            compiled = exc.code
+        if self._cache_size:
+            self._cache[key] = compiled
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return compiled
 
-    def format_value(self, value: float) -> str:
-        if value is None or math.isnan(value) or math.isinf(value):
+    def clear_cache(self) -> None:
+        self._cache.clear()
+        self._prepared.clear()
+
+    def format_value(self, value: Any, precision: int | None = None) -> str:
+        if value is None:
             return ""
-        if abs(value - round(value)) < 1e-9:
-            return str(int(round(value)))
-        return f"{value:.6f}".rstrip("0").rstrip(".")
-
-    def _tokenize(self, expr: str) -> List[str]:
-        expr = expr.replace(",", ".")
-        tokens: List[str] = []
-        number = ""
-        prev = None
-        for char in expr:
-            if char.isdigit() or char == ".":
-                number += char
-                prev = char
+        digits = self.precision if precision is None else max(0, int(precision))
+        try:
+            if isinstance(value, Fraction):
+                return BACKENDS["fraction"].format(value, digits)
+            if isinstance(value, Decimal):
+                if not value.is_finite():
+                    return ""
+                return BACKENDS["decimal"].format(value, digits)
+            if math.isnan(value) or math.isinf(value):
+                return ""
+            return BACKENDS["float"].format(value, digits)
+        except (ArithmeticError, ValueError):
+            return ""
+
+    def _prepare_cached(self, text: str) -> Tuple[str, int | None, bool]:
+        prepared = self._prepared.get(text)
+        if prepared is not None:
+            self._prepared.move_to_end(text)
+            return prepared
+        prepared = self._prepare(text)
+        if self._cache_size:
+            self._prepared[text] = prepared
+            if len(self._prepared) > self._cache_size:
+                self._prepared.popitem(last=False)
+        return prepared
+
+    def _prepare(self, text: str) -> Tuple[str, int | None, bool]:
+        if not text:
+            return "", None, False
+        cleaned = text.lower().replace("\u0451", "\u0435")
+        cleaned = replace_number_words(cleaned)
+        exact = bool(_EXACT_PATTERN.search(cleaned))
+        precision = None
+        match = _PRECISION_PATTERN.search(cleaned)
+        if match:
+            precision = int(match.group(1))
+            cleaned = cleaned[: match.start()] + " " + cleaned[match.end() :]
+        cleaned = _WORD_PATTERN.sub(lambda m: f" {_WORD_OPERATORS[m.group(0)]} ", cleaned)
+        cleaned = _TIMES_PATTERN.sub("*", cleaned)
+        cleaned = _JUNK_PATTERN.sub(" ", cleaned)
+        cleaned = _SPACE_PATTERN.sub(" ", cleaned).strip()
+        return cleaned, precision, exact
+
+    def _scan(self, expr: str, backend: ArithmeticBackend) -> List[Any]:
+        tokens: List[Any] = []
+        i = 0
+        size = len(expr)
+        while i < size:
+            char = expr[i]
+            if char.isdigit() or char in ".,":
+                start = i
+                while i < size and (expr[i].isdigit() or expr[i] in ".,"):
+                    i += 1
+                literal = expr[start:i].replace(",", ".")
+                if literal.count(".") > 1 or literal == ".":
+                    raise MathError("invalid")
+                tokens.append(("num", backend.number(literal)))
                 continue
-            if number:
-                tokens.append(number)
-                number = ""
-            if char in "+-*/()":
+            if char in "+-*/()^%\u221a":
                 tokens.append(char)
-                prev = char
-            elif char.isspace():
-                continue
-            else:
-                raise ValueError("invalid")
-        if number:
-            tokens.append(number)
-        return self._apply_unary(tokens)
-
-    def _apply_unary(self, tokens: List[str]) -> List[str]:
-        result: List[str] = []
-        prev = None
-        for token in tokens:
-            if token == "-" and (prev is None or prev in "+-*/("):
-                result.append("0")
-                result.append("-")
-            else:
-                result.append(token)
-            prev = token
-        return result
-
-    def _to_rpn(self, tokens: List[str]) -> List[str]:
-        output: List[str] = []
-        stack: List[str] = []
-        precedence = {"+": 1, "-": 1, "*": 2, "/": 2}
-        for token in tokens:
-            if re.match(r"^\d+(?:\.\d+)?$", token):
-                output.append(token)
-            elif token in "+-*/":
-                while stack and stack[-1] in precedence and precedence[stack[-1]] >= precedence[token]:
-                    output.append(stack.pop())
-                stack.append(token)
-            elif token == "(":
-                stack.append(token)
-            elif token == ")":
-                while stack and stack[-1] != "(":
-                    output.append(stack.pop())
-                if not stack:
-                    raise ValueError("mismatch")
-                stack.pop()
-            else:
-                raise ValueError("invalid")
-        while stack:
-            op = stack.pop()
-            if op in "()":
-                raise ValueError("mismatch")
-            output.append(op)
-        return output
-
-    def _eval_rpn(self, tokens: List[str]) -> float:
-        stack: List[float] = []
-        for token in tokens:
-            if token in "+-*/":
-                if len(stack) < 2:
-                    raise ValueError("invalid")
-                b = stack.pop()
-                a = stack.pop()
-                if token == "+":
-                    stack.append(a + b)
-                elif token == "-":
-                    stack.append(a - b)
-                elif token == "*":
-                    stack.append(a * b)
-                elif token == "/":
-                    if b == 0:
-                        raise ZeroDivisionError("zero")
-                    stack.append(a / b)
+            elif not char.isspace():
+                raise MathError("invalid")
+            i += 1
+        return tokens
+
+    def _eval(self, node: Node, backend: ArithmeticBackend) -> Any:
+        kind = node[0]
+        if kind == "num":
+            return node[1]
+        if kind == "neg":
+            return -self._eval(node[1], backend)
+        if kind == "pct":
+            return self._eval(node[1], backend) / 100
+        if kind == "sqrt":
+            value = self._eval(node[1], backend)
+            if value < 0:
+                raise MathError("invalid")
+            return backend.sqrt(value)
+        left = self._eval(node[1], backend)
+        right = self._eval(node[2], backend)
+        if kind == "+":
+            return left + right
+        if kind == "-":
+            return left - right
+        if kind == "*":
+            _check_digits(_digits(left) + _digits(right))
+            return left * right
+        if kind == "/":
+            if right == 0:
+                raise ZeroDivisionError("zero")
+            _check_digits(_digits(left) + _digits(right))
+            return left / right
+        if kind == "^":
+            if abs(right) > _MAX_EXPONENT:
+                raise MathError("too_large")
+            _check_digits(_digits(left) * abs(right))
+            return backend.power(left, right)
+        if kind in ("+%", "-%"):
+            _check_digits(_digits(left) + _digits(right))
+            change = left * right / 100
+            return left + change if kind == "+%" else left - change
+        raise MathError("invalid")
+
+
+def _digits(value: Any) -> float:
+    if isinstance(value, Fraction):
+        return max(value.numerator.bit_length(), value.denominator.bit_length()) * _LOG10_2
+    if isinstance(value, Decimal):
+        return abs(value.adjusted()) + 1 if value.is_finite() and value else 1
+    return 0.0
+
+
+def _check_digits(digits: float) -> None:
+    if digits > _MAX_DIGITS:
+        raise MathError("too_large")
+
+
+class _Parser:
+    def __init__(self, tokens: List[Any], max_depth: int) -> None:
+        self._tokens = tokens
+        self._pos = 0
+        self._depth = 0
+        self._max_depth = max_depth
+
+    def parse(self) -> Node:
+        node = self._expr()
+        if self._pos != len(self._tokens):
+            raise MathError("mismatch" if self._peek() == ")" else "invalid")
+        return node
+
+    def _peek(self) -> Any:
+        if self._pos < len(self._tokens):
+            return self._tokens[self._pos]
+        return None
+
+    def _take(self) -> Any:
+        token = self._peek()
+        self._pos += 1
+        return token
+
+    def _expr(self) -> Node:
+        node = self._term()
+        while self._peek() in ("+", "-"):
+            op = self._take()
+            right = self._term()
+            if right[0] == "pct":
+                node = (op + "%", node, right[1])
             else:
-                stack.append(float(token))
-        if len(stack) != 1:
-            raise ValueError("invalid")
-        return stack[0]
-
-    def _max_parentheses_depth(self, tokens: List[str]) -> int:
-        depth = 0
-        max_depth = 0
-        for token in tokens:
-            if token == "(":
-                depth += 1
-                max_depth = max(max_depth, depth)
-            elif token == ")":
-                depth -= 1
-                if depth < 0:
-                    raise ValueError("mismatch")
-        if depth != 0:
-            raise ValueError("mismatch")
-        return max_depth
+                node = (op, node, right)
+        return node
+
+    def _term(self) -> Node:
+        node = self._unary()
+        while self._peek() in ("*", "/"):
+            op = self._take()
+            node = (op, node, self._unary())
+        return node
+
+    def _unary(self) -> Node:
+        token = self._peek()
+        if token == "-":
+            self._take()
+            return ("neg", self._unary())
+        if token == "+":
+            self._take()
+            return self._unary()
+        return self._power()
+
+    def _power(self) -> Node:
+        node = self._postfix()
+        if self._peek() == "^":
+            self._take()
+            node = ("^", node, self._unary())
+        return node
+
+    def _postfix(self) -> Node:
+        node = self._primary()
+        while self._peek() == "%":
+            self._take()
+            node = ("pct", node)
+        return node
+
+    def _primary(self) -> Node:
+        token = self._take()
+        if isinstance(token, tuple):
+            return token
+        if token == "\u221a":
+            return ("sqrt", self._postfix())
+        if token == "(":
+            self._depth += 1
+            if self._depth > self._max_depth:
+                raise MathError("too_deep")
+            node = self._expr()
+            if self._take() != ")":
+                raise MathError("mismatch")
+            self._depth -= 1
+            return node
+        if token == ")":
+            raise MathError("mismatch")
+        raise MathError("invalid")
@@ -0,0 +1,302 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.scheduler import DeadlineQueue
+
+_BUCKET_BASE = 1e-6
+_BUCKET_COUNT = 40
+_OBSERVE = 0
+_COUNT = 1
+
+
+def bucket_index(value: float) -> int:
+    if value <= _BUCKET_BASE:
+        return 0
+    return min(_BUCKET_COUNT - 1, int(math.log2(value / _BUCKET_BASE)) + 1)
+
+
+def bucket_bound(index: int) -> float:
+    return _BUCKET_BASE * (2**index)
+
+
+@dataclass
+class Histogram:
+    count: int = 0
+    total: float = 0.0
+    minimum: float = math.inf
+    maximum: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * _BUCKET_COUNT)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        self.buckets[bucket_index(value)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q))
+        seen = 0
+        for index, hits in enumerate(self.buckets):
+            seen += hits
+            if seen >= rank:
+                return min(bucket_bound(index), self.maximum)
+        return self.maximum
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.minimum if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.maximum,
+        }
+
+
+class _Span:
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics: "Metrics", name: str) -> None:
+        self._metrics = metrics
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        self._metrics.observe(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _ThreadBuffer:
+    __slots__ = ("events", "thread")
+
+    def __init__(self, size: int) -> None:
+        self.events: Deque[tuple] = deque(maxlen=size)
+        self.thread = threading.current_thread()
+
+
+class Metrics:
+    def __init__(self, enabled: bool = True, buffer_size: int = 8192) -> None:
+        self.enabled = enabled
+        self._buffer_size = max(16, int(buffer_size))
+        self._high_water = self._buffer_size // 2
+        self._local = threading.local()
+        self._buffers: List[_ThreadBuffer] = []
+        self._register_lock = threading.Lock()
+        self._aggregate_lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._marks: Dict[str, float] = {}
+        self._started = time.monotonic()
+        self._collector: Optional[threading.Thread] = None
+        self._collector_stop = threading.Event()
+        self._collector_wake: DeadlineQueue[bool] = DeadlineQueue()
+
+    def start_collector(self, interval_sec: float = 2.0) -> None:
+        if self._collector and self._collector.is_alive():
+            return
+        self._collector_stop.clear()
+        interval = max(0.1, float(interval_sec))
+
+        def run() -> None:
+            while not self._collector_stop.is_set():
+                full = self._collector_wake.get()
+                deadline = time.monotonic() + interval
+                while not full and not self._collector_stop.is_set() and time.monotonic() < deadline:
+                    full = self._collector_wake.get(deadline)
+                self.collect()
+
+        self._collector = threading.Thread(target=run, daemon=True)
+        self._collector.start()
+
+    def stop_collector(self) -> None:
+        self._collector_stop.set()
+        self._collector_wake.wake()
+
+    def span(self, name: str) -> _Span | _NullSpan:
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def observe(self, name: str, value: float) -> None:
+        if self.enabled:
+            self._push((_OBSERVE, name, value))
+
+    def count(self, name: str, amount: int = 1) -> None:
+        if self.enabled:
+            self._push((_COUNT, name, amount))
+
+    def mark(self, name: str, at: float | None = None) -> None:
+        if self.enabled:
+            self._marks[name] = time.monotonic() if at is None else at
+
+    def observe_since(self, name: str, mark: str, clear: bool = True) -> Optional[float]:
+        started = self._marks.pop(mark, None) if clear else self._marks.get(mark)
+        if started is None:
+            return None
+        elapsed = time.monotonic() - started
+        self.observe(name, elapsed)
+        return elapsed
+
+    def collect(self) -> None:
+        with self._aggregate_lock:
+            with self._register_lock:
+                buffers = list(self._buffers)
+            for buffer in buffers:
+                events = buffer.events
+                while True:
+                    try:
+                        kind, name, value = events.popleft()
+                    except IndexError:
+                        break
+                    if kind == _OBSERVE:
+                        histogram = self._histograms.get(name)
+                        if histogram is None:
+                            histogram = self._histograms[name] = Histogram()
+                        histogram.add(value)
+                    else:
+                        self._counters[name] = self._counters.get(name, 0) + value
+            with self._register_lock:
+                self._buffers = [
+                    buffer for buffer in self._buffers if buffer.thread.is_alive() or buffer.events
+                ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        self.collect()
+        with self._aggregate_lock:
+            return {
+                "uptime_sec": round(time.monotonic() - self._started, 3),
+                "counters": dict(self._counters),
+                "histograms": {name: hist.as_dict() for name, hist in sorted(self._histograms.items())},
+            }
+
+    def reset(self) -> None:
+        self.collect()
+        with self._aggregate_lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._started = time.monotonic()
+
+    def _push(self, event: tuple) -> None:
+        events = self._events()
+        if self._collector is None:
+            events.append(event)
+            return
+        if not events:
+            self._collector_wake.wake()
+        events.append(event)
+        if len(events) == self._high_water:
+            self._collector_wake.put(True)
+
+    def _events(self) -> Deque[tuple]:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = _ThreadBuffer(self._buffer_size)
+            self._local.buffer = buffer
+            with self._register_lock:
+                self._buffers.append(buffer)
+        return buffer.events
+
+
+METRICS = Metrics()
+
+
+class JsonlExporter:
+    def __init__(
+        self,
+        metrics: Metrics,
+        path: Path | str,
+        interval_sec: float = 60.0,
+        max_bytes: int = 1_048_576,
+        backups: int = 3,
+    ) -> None:
+        self._metrics = metrics
+        self._path = Path(path)
+        self._interval = max(1.0, float(interval_sec))
+        self._max_bytes = max(1024, int(max_bytes))
+        self._backups = max(0, int(backups))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, flush: bool = True) -> None:
+        self._stop.set()
+        if flush:
+            self.write_now()
+
+    def write_now(self) -> Path:
+        record = {"ts": datetime.now().isoformat(timespec="seconds")}
+        record.update(self._metrics.snapshot())
+        line = json.dumps(record, ensure_ascii=True) + "\n"
+        with self._lock:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._rotate(len(line))
+            with self._path.open("a", encoding="utf-8") as handle:
+                handle.write(line)
+        return self._path
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.write_now()
+            except OSError as exc:
+                print(f"[metrics] export failed: {exc}")
+
+    def _rotate(self, incoming: int) -> None:
+        try:
+            size = self._path.stat().st_size
+        except OSError:
+            return
+        if size + incoming <= self._max_bytes:
+            return
+        if not self._backups:
+            self._path.unlink(missing_ok=True)
+            return
+        for index in range(self._backups, 0, -1):
+            source = self._path if index == 1 else self._path.with_name(f"{self._path.name}.{index - 1}")
+            target = self._path.with_name(f"{self._path.name}.{index}")
+            if source.exists():
+                source.replace(target)
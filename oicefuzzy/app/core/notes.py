@@ -0,0 +1,183 @@
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from app.core.utils import normalize_text
+
+
+@dataclass
+class Note:
+    id: int
+    created: str
+    text: str
+    tags: List[str] = field(default_factory=list)
+
+    def display(self) -> str:
+        return f"[{self.created}] {self.text}"
+
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    "CREATE TABLE IF NOT EXISTS notes (id INTEGER PRIMARY KEY AUTOINCREMENT, created TEXT NOT NULL, text TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS note_tags (note_id INTEGER NOT NULL, tag TEXT NOT NULL, PRIMARY KEY (tag, note_id))",
+    "CREATE INDEX IF NOT EXISTS note_tags_note ON note_tags (note_id)",
+]
+
+_FTS_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(text, content='notes', content_rowid='id', tokenize='unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN "
+    "INSERT INTO notes_fts(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN "
+    "INSERT INTO notes_fts(notes_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+]
+
+_LEGACY_LINE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2})\]\s*(.*)$")
+
+
+class NotesStore:
+    def __init__(self, db_path: Path | str, legacy_path: Path | str | None = None) -> None:
+        self._db_path = str(db_path)
+        if self._db_path != ":memory:":
+            Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._fts = True
+        with self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+            try:
+                for statement in _FTS_SCHEMA:
+                    self._conn.execute(statement)
+            except sqlite3.OperationalError:
+                self._fts = False
+        if legacy_path:
+            self.import_legacy(Path(legacy_path))
+
+    @property
+    def has_fts(self) -> bool:
+        return self._fts
+
+    def add(self, text: str, tags: Optional[List[str]] = None, created: Optional[str] = None) -> Note:
+        text = text.strip()
+        created = created or datetime.now().strftime("%Y-%m-%d %H:%M")
+        clean_tags = self._clean_tags(tags or [])
+        with self._lock, self._conn:
+            cursor = self._conn.execute("INSERT INTO notes (created, text) VALUES (?, ?)", (created, text))
+            note_id = int(cursor.lastrowid)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO note_tags (note_id, tag) VALUES (?, ?)",
+                [(note_id, tag) for tag in clean_tags],
+            )
+        return Note(note_id, created, text, clean_tags)
+
+    def delete(self, note_id: int) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM note_tags WHERE note_id = ?", (note_id,))
+            cursor = self._conn.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+        return cursor.rowcount > 0
+
+    def tail(self, limit: int = 5) -> List[Note]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, created, text FROM notes ORDER BY id DESC LIMIT ?", (max(0, int(limit)),)
+            ).fetchall()
+            notes = self._with_tags(rows)
+        notes.reverse()
+        return notes
+
+    def by_tag(self, tag: str, limit: int = 5) -> List[Note]:
+        wanted = self._clean_tags([tag])
+        if not wanted:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT n.id, n.created, n.text FROM note_tags t JOIN notes n ON n.id = t.note_id "
+                "WHERE t.tag = ? ORDER BY t.note_id DESC LIMIT ?",
+                (wanted[0], max(0, int(limit))),
+            ).fetchall()
+            notes = self._with_tags(rows)
+        notes.reverse()
+        return notes
+
+    def search(self, query: str, limit: int = 5) -> List[Note]:
+        words = normalize_text(query).replace(".", " ").split()
+        words = [word for word in words if word.isalnum()]
+        if not words:
+            return []
+        limit = max(0, int(limit))
+        with self._lock:
+            if self._fts:
+                match = " ".join(f'"{word}"*' for word in words)
+                rows = self._conn.execute(
+                    "SELECT n.id, n.created, n.text FROM notes_fts f JOIN notes n ON n.id = f.rowid "
+                    "WHERE notes_fts MATCH ? ORDER BY bm25(notes_fts), n.id DESC LIMIT ?",
+                    (match, limit),
+                ).fetchall()
+            else:
+                clause = " AND ".join("lower(text) LIKE ?" for _ in words)
+                rows = self._conn.execute(
+                    f"SELECT id, created, text FROM notes WHERE {clause} ORDER BY id DESC LIMIT ?",
+                    [f"%{word}%" for word in words] + [limit],
+                ).fetchall()
+            return self._with_tags(rows)
+
+    def count(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT count(*) FROM notes").fetchone()
+        return int(row[0]) if row else 0
+
+    def import_legacy(self, path: Path) -> int:
+        if not path.exists() or self._meta("legacy_imported") == str(path):
+            return 0
+        entries = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            match = _LEGACY_LINE.match(line)
+            if match:
+                entries.append((match.group(1), match.group(2).strip()))
+            else:
+                entries.append((datetime.now().strftime("%Y-%m-%d %H:%M"), line))
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT INTO notes (created, text) VALUES (?, ?)", entries)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)", (str(path),)
+            )
+        return len(entries)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _with_tags(self, rows: list) -> List[Note]:
+        notes = [Note(int(row[0]), row[1], row[2]) for row in rows]
+        if not notes:
+            return notes
+        by_id = {note.id: note for note in notes}
+        placeholders = ",".join("?" for _ in by_id)
+        for note_id, tag in self._conn.execute(
+            f"SELECT note_id, tag FROM note_tags WHERE note_id IN ({placeholders})", list(by_id)
+        ):
+            by_id[note_id].tags.append(tag)
+        return notes
+
+    @staticmethod
+    def _clean_tags(tags: List[str]) -> List[str]:
+        cleaned = []
+        for tag in tags:
+            value = normalize_text(tag).lstrip("#").strip()
+            if value and value not in cleaned:
+                cleaned.append(value)
+        return cleaned
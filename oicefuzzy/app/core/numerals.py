@@ -0,0 +1,340 @@
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Dict, Iterator, List, Optional, Tuple
+
+UNIT = 0
+TEEN = 1
+TEN = 2
+HUNDRED = 3
+SCALE = 4
+ORDINAL = 5
+FRACTION = 6
+WHOLE = 7
+
+_CARDINALS: Dict[int, Tuple[int, Tuple[str, ...]]] = {
+    0: (UNIT, ("\u043d\u043e\u043b\u044c", "\u043d\u0443\u043b\u044c", "\u043d\u0443\u043b\u044f")),
+    1: (UNIT, ("\u043e\u0434\u0438\u043d", "\u043e\u0434\u043d\u0430", "\u043e\u0434\u043d\u043e", "\u043e\u0434\u043d\u0443", "\u043e\u0434\u043d\u043e\u0433\u043e", "\u043e\u0434\u043d\u043e\u0439", "\u043e\u0434\u043d\u0438\u043c", "\u043e\u0434\u043d\u043e\u043c", "\u043e\u0434\u043d\u043e\u043c\u0443")),
+    2: (UNIT, ("\u0434\u0432\u0430", "\u0434\u0432\u0435", "\u0434\u0432\u0443\u0445", "\u0434\u0432\u0443\u043c", "\u0434\u0432\u0443\u043c\u044f")),
+    3: (UNIT, ("\u0442\u0440\u0438", "\u0442\u0440\u0435\u0445", "\u0442\u0440\u0435\u043c", "\u0442\u0440\u0435\u043c\u044f")),
+    4: (UNIT, ("\u0447\u0435\u0442\u044b\u0440\u0435", "\u0447\u0435\u0442\u044b\u0440\u0435\u0445", "\u0447\u0435\u0442\u044b\u0440\u0435\u043c", "\u0447\u0435\u0442\u044b\u0440\u044c\u043c\u044f")),
+    5: (UNIT, ("\u043f\u044f\u0442\u044c", "\u043f\u044f\u0442\u0438", "\u043f\u044f\u0442\u044c\u044e")),
+    6: (UNIT, ("\u0448\u0435\u0441\u0442\u044c", "\u0448\u0435\u0441\u0442\u0438", "\u0448\u0435\u0441\u0442\u044c\u044e")),
+    7: (UNIT, ("\u0441\u0435\u043c\u044c", "\u0441\u0435\u043c\u0438", "\u0441\u0435\u043c\u044c\u044e")),
+    8: (UNIT, ("\u0432\u043e\u0441\u0435\u043c\u044c", "\u0432\u043e\u0441\u044c\u043c\u0438", "\u0432\u043e\u0441\u0435\u043c\u044c\u044e")),
+    9: (UNIT, ("\u0434\u0435\u0432\u044f\u0442\u044c", "\u0434\u0435\u0432\u044f\u0442\u0438", "\u0434\u0435\u0432\u044f\u0442\u044c\u044e")),
+    10: (TEEN, ("\u0434\u0435\u0441\u044f\u0442\u044c", "\u0434\u0435\u0441\u044f\u0442\u0438", "\u0434\u0435\u0441\u044f\u0442\u044c\u044e")),
+    11: (TEEN, ("\u043e\u0434\u0438\u043d\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u043e\u0434\u0438\u043d\u043d\u0430\u0434\u0446\u0430\u0442\u0438")),
+    12: (TEEN, ("\u0434\u0432\u0435\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0434\u0432\u0435\u043d\u0430\u0434\u0446\u0430\u0442\u0438")),
+    13: (TEEN, ("\u0442\u0440\u0438\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0442\u0440\u0438\u043d\u0430\u0434\u0446\u0430\u0442\u0438")),
+    14: (TEEN, ("\u0447\u0435\u0442\u044b\u0440\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0447\u0435\u0442\u044b\u0440\u043d\u0430\u0434\u0446\u0430\u0442\u0438")),
+    15: (TEEN, ("\u043f\u044f\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u043f\u044f\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u0438")),
+    16: (TEEN, ("\u0448\u0435\u0441\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0448\u0435\u0441\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u0438")),
+    17: (TEEN, ("\u0441\u0435\u043c\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0441\u0435\u043c\u043d\u0430\u0434\u0446\u0430\u0442\u0438")),
+    18: (TEEN, ("\u0432\u043e\u0441\u0435\u043c\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0432\u043e\u0441\u0435\u043c\u043d\u0430\u0434\u0446\u0430\u0442\u0438")),
+    19: (TEEN, ("\u0434\u0435\u0432\u044f\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0434\u0435\u0432\u044f\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u0438")),
+    20: (TEN, ("\u0434\u0432\u0430\u0434\u0446\u0430\u0442\u044c", "\u0434\u0432\u0430\u0434\u0446\u0430\u0442\u0438")),
+    30: (TEN, ("\u0442\u0440\u0438\u0434\u0446\u0430\u0442\u044c", "\u0442\u0440\u0438\u0434\u0446\u0430\u0442\u0438")),
+    40: (TEN, ("\u0441\u043e\u0440\u043e\u043a", "\u0441\u043e\u0440\u043e\u043a\u0430")),
+    50: (TEN, ("\u043f\u044f\u0442\u044c\u0434\u0435\u0441\u044f\u0442", "\u043f\u044f\u0442\u0438\u0434\u0435\u0441\u044f\u0442\u0438")),
+    60: (TEN, ("\u0448\u0435\u0441\u0442\u044c\u0434\u0435\u0441\u044f\u0442", "\u0448\u0435\u0441\u0442\u0438\u0434\u0435\u0441\u044f\u0442\u0438")),
+    70: (TEN, ("\u0441\u0435\u043c\u044c\u0434\u0435\u0441\u044f\u0442", "\u0441\u0435\u043c\u0438\u0434\u0435\u0441\u044f\u0442\u0438")),
+    80: (TEN, ("\u0432\u043e\u0441\u0435\u043c\u044c\u0434\u0435\u0441\u044f\u0442", "\u0432\u043e\u0441\u044c\u043c\u0438\u0434\u0435\u0441\u044f\u0442\u0438")),
+    90: (TEN, ("\u0434\u0435\u0432\u044f\u043d\u043e\u0441\u0442\u043e", "\u0434\u0435\u0432\u044f\u043d\u043e\u0441\u0442\u0430")),
+    100: (HUNDRED, ("\u0441\u0442\u043e", "\u0441\u0442\u0430")),
+    200: (HUNDRED, ("\u0434\u0432\u0435\u0441\u0442\u0438", "\u0434\u0432\u0443\u0445\u0441\u043e\u0442", "\u0434\u0432\u0443\u043c\u0441\u0442\u0430\u043c")),
+    300: (HUNDRED, ("\u0442\u0440\u0438\u0441\u0442\u0430", "\u0442\u0440\u0435\u0445\u0441\u043e\u0442", "\u0442\u0440\u0435\u043c\u0441\u0442\u0430\u043c")),
+    400: (HUNDRED, ("\u0447\u0435\u0442\u044b\u0440\u0435\u0441\u0442\u0430", "\u0447\u0435\u0442\u044b\u0440\u0435\u0445\u0441\u043e\u0442", "\u0447\u0435\u0442\u044b\u0440\u0435\u043c\u0441\u0442\u0430\u043c")),
+    500: (HUNDRED, ("\u043f\u044f\u0442\u044c\u0441\u043e\u0442", "\u043f\u044f\u0442\u0438\u0441\u043e\u0442", "\u043f\u044f\u0442\u0438\u0441\u0442\u0430\u043c")),
+    600: (HUNDRED, ("\u0448\u0435\u0441\u0442\u044c\u0441\u043e\u0442", "\u0448\u0435\u0441\u0442\u0438\u0441\u043e\u0442", "\u0448\u0435\u0441\u0442\u0438\u0441\u0442\u0430\u043c")),
+    700: (HUNDRED, ("\u0441\u0435\u043c\u044c\u0441\u043e\u0442", "\u0441\u0435\u043c\u0438\u0441\u043e\u0442", "\u0441\u0435\u043c\u0438\u0441\u0442\u0430\u043c")),
+    800: (HUNDRED, ("\u0432\u043e\u0441\u0435\u043c\u044c\u0441\u043e\u0442", "\u0432\u043e\u0441\u044c\u043c\u0438\u0441\u043e\u0442", "\u0432\u043e\u0441\u044c\u043c\u0438\u0441\u0442\u0430\u043c")),
+    900: (HUNDRED, ("\u0434\u0435\u0432\u044f\u0442\u044c\u0441\u043e\u0442", "\u0434\u0435\u0432\u044f\u0442\u0438\u0441\u043e\u0442", "\u0434\u0435\u0432\u044f\u0442\u0438\u0441\u0442\u0430\u043c")),
+    1000: (SCALE, ("\u0442\u044b\u0441\u044f\u0447\u0430", "\u0442\u044b\u0441\u044f\u0447\u0438", "\u0442\u044b\u0441\u044f\u0447", "\u0442\u044b\u0441\u044f\u0447\u0443", "\u0442\u044b\u0441\u044f\u0447\u0435\u0439")),
+    1000000: (SCALE, ("\u043c\u0438\u043b\u043b\u0438\u043e\u043d", "\u043c\u0438\u043b\u043b\u0438\u043e\u043d\u0430", "\u043c\u0438\u043b\u043b\u0438\u043e\u043d\u043e\u0432", "\u043c\u0438\u043b\u043b\u0438\u043e\u043d\u043e\u043c")),
+    1000000000: (SCALE, ("\u043c\u0438\u043b\u043b\u0438\u0430\u0440\u0434", "\u043c\u0438\u043b\u043b\u0438\u0430\u0440\u0434\u0430", "\u043c\u0438\u043b\u043b\u0438\u0430\u0440\u0434\u043e\u0432", "\u043c\u0438\u043b\u043b\u0438\u0430\u0440\u0434\u043e\u043c")),
+}
+
+_ORDINAL_STEMS: Dict[int, str] = {
+    1: "\u043f\u0435\u0440\u0432",
+    2: "\u0432\u0442\u043e\u0440",
+    4: "\u0447\u0435\u0442\u0432\u0435\u0440\u0442",
+    5: "\u043f\u044f\u0442",
+    6: "\u0448\u0435\u0441\u0442",
+    7: "\u0441\u0435\u0434\u044c\u043c",
+    8: "\u0432\u043e\u0441\u044c\u043c",
+    9: "\u0434\u0435\u0432\u044f\u0442",
+    10: "\u0434\u0435\u0441\u044f\u0442",
+    11: "\u043e\u0434\u0438\u043d\u043d\u0430\u0434\u0446\u0430\u0442",
+    12: "\u0434\u0432\u0435\u043d\u0430\u0434\u0446\u0430\u0442",
+    13: "\u0442\u0440\u0438\u043d\u0430\u0434\u0446\u0430\u0442",
+    14: "\u0447\u0435\u0442\u044b\u0440\u043d\u0430\u0434\u0446\u0430\u0442",
+    15: "\u043f\u044f\u0442\u043d\u0430\u0434\u0446\u0430\u0442",
+    16: "\u0448\u0435\u0441\u0442\u043d\u0430\u0434\u0446\u0430\u0442",
+    17: "\u0441\u0435\u043c\u043d\u0430\u0434\u0446\u0430\u0442",
+    18: "\u0432\u043e\u0441\u0435\u043c\u043d\u0430\u0434\u0446\u0430\u0442",
+    19: "\u0434\u0435\u0432\u044f\u0442\u043d\u0430\u0434\u0446\u0430\u0442",
+    20: "\u0434\u0432\u0430\u0434\u0446\u0430\u0442",
+    30: "\u0442\u0440\u0438\u0434\u0446\u0430\u0442",
+    40: "\u0441\u043e\u0440\u043e\u043a\u043e\u0432",
+    50: "\u043f\u044f\u0442\u0438\u0434\u0435\u0441\u044f\u0442",
+    60: "\u0448\u0435\u0441\u0442\u0438\u0434\u0435\u0441\u044f\u0442",
+    70: "\u0441\u0435\u043c\u0438\u0434\u0435\u0441\u044f\u0442",
+    80: "\u0432\u043e\u0441\u044c\u043c\u0438\u0434\u0435\u0441\u044f\u0442",
+    90: "\u0434\u0435\u0432\u044f\u043d\u043e\u0441\u0442",
+    100: "\u0441\u043e\u0442",
+    200: "\u0434\u0432\u0443\u0445\u0441\u043e\u0442",
+    300: "\u0442\u0440\u0435\u0445\u0441\u043e\u0442",
+    400: "\u0447\u0435\u0442\u044b\u0440\u0435\u0445\u0441\u043e\u0442",
+    500: "\u043f\u044f\u0442\u0438\u0441\u043e\u0442",
+    600: "\u0448\u0435\u0441\u0442\u0438\u0441\u043e\u0442",
+    700: "\u0441\u0435\u043c\u0438\u0441\u043e\u0442",
+    800: "\u0432\u043e\u0441\u044c\u043c\u0438\u0441\u043e\u0442",
+    900: "\u0434\u0435\u0432\u044f\u0442\u0438\u0441\u043e\u0442",
+    1000: "\u0442\u044b\u0441\u044f\u0447\u043d",
+}
+_ORDINAL_ENDINGS = ("\u044b\u0439", "\u043e\u0439", "\u043e\u0435", "\u043e\u0433\u043e", "\u043e\u043c\u0443", "\u044b\u043c", "\u043e\u043c", "\u044b\u0435", "\u0430\u044f", "\u0443\u044e", "\u044b\u0445", "\u044b\u043c\u0438")
+_THIRD_ENDINGS = ("\u0438\u0439", "\u044c\u0435", "\u044c\u0435\u0433\u043e", "\u044c\u0435\u043c\u0443", "\u044c\u0438\u043c", "\u044c\u0435\u043c", "\u044c\u0438", "\u044c\u044f", "\u044c\u044e", "\u044c\u0438\u0445", "\u044c\u0438\u043c\u0438")
+_FRACTION_ENDINGS = {"\u0430\u044f", "\u0443\u044e", "\u043e\u0439", "\u044b\u0445", "\u044b\u0435", "\u044b\u043c\u0438", "\u044c\u044f", "\u044c\u044e", "\u044c\u0435\u0439", "\u044c\u0438\u0445", "\u044c\u0438", "\u044c\u0438\u043c\u0438"}
+
+_FRACTION_WORDS: Dict[str, Fraction] = {
+    "\u043f\u043e\u043b\u043e\u0432\u0438\u043d\u0430": Fraction(1, 2),
+    "\u043f\u043e\u043b\u043e\u0432\u0438\u043d\u044b": Fraction(1, 2),
+    "\u043f\u043e\u043b\u043e\u0432\u0438\u043d\u0443": Fraction(1, 2),
+    "\u0442\u0440\u0435\u0442\u044c": Fraction(1, 3),
+    "\u0442\u0440\u0435\u0442\u0438": Fraction(1, 3),
+    "\u0447\u0435\u0442\u0432\u0435\u0440\u0442\u044c": Fraction(1, 4),
+    "\u0447\u0435\u0442\u0432\u0435\u0440\u0442\u0438": Fraction(1, 4),
+    "\u043f\u043e\u043b\u0442\u043e\u0440\u0430": Fraction(3, 2),
+    "\u043f\u043e\u043b\u0442\u043e\u0440\u044b": Fraction(3, 2),
+    "\u043f\u043e\u043b\u0443\u0442\u043e\u0440\u0430": Fraction(3, 2),
+}
+_STANDALONE_FRACTIONS = {"\u043f\u043e\u043b\u0442\u043e\u0440\u0430", "\u043f\u043e\u043b\u0442\u043e\u0440\u044b", "\u043f\u043e\u043b\u0443\u0442\u043e\u0440\u0430"}
+_WHOLE_WORDS = ("\u0446\u0435\u043b\u044b\u0445", "\u0446\u0435\u043b\u0430\u044f", "\u0446\u0435\u043b\u043e\u0439", "\u0446\u0435\u043b\u0443\u044e")
+_HALF_SUFFIX = ("\u0441", "\u043f\u043e\u043b\u043e\u0432\u0438\u043d\u043e\u0439")
+
+_MAX_DECIMALS = 6
+
+
+def _build_lexicon() -> Dict[str, Tuple[int, Fraction, bool]]:
+    lexicon: Dict[str, Tuple[int, Fraction, bool]] = {}
+    for value, (kind, forms) in _CARDINALS.items():
+        for form in forms:
+            lexicon[form] = (kind, Fraction(value), False)
+    for value, stem in _ORDINAL_STEMS.items():
+        for ending in _ORDINAL_ENDINGS:
+            lexicon.setdefault(stem + ending, (ORDINAL, Fraction(value), ending in _FRACTION_ENDINGS))
+    for ending in _THIRD_ENDINGS:
+        lexicon["\u0442\u0440\u0435\u0442" + ending] = (ORDINAL, Fraction(3), ending in _FRACTION_ENDINGS)
+    for word, value in _FRACTION_WORDS.items():
+        lexicon[word] = (FRACTION, value, word in _STANDALONE_FRACTIONS)
+    for word in _WHOLE_WORDS:
+        lexicon[word] = (WHOLE, Fraction(0), False)
+    return lexicon
+
+
+LEXICON = _build_lexicon()
+
+
+@dataclass
+class NumeralToken:
+    text: str
+    value: Fraction | None = None
+
+
+def _fits(group: Fraction, value: Fraction, started: bool) -> bool:
+    if not started:
+        return True
+    if value == 0:
+        return False
+    if value < 10:
+        return group % 10 == 0 and group % 100 != 10
+    if value < 100:
+        return group % 100 == 0
+    if value < 1000:
+        return group % 1000 == 0
+    return False
+
+
+class _Number:
+    __slots__ = ("words", "total", "group", "started", "last_scale", "whole", "whole_at")
+
+    def __init__(self) -> None:
+        self.words: List[str] = []
+        self.total = Fraction(0)
+        self.group = Fraction(0)
+        self.started = False
+        self.last_scale = 0
+        self.whole: Fraction | None = None
+        self.whole_at = 0
+
+    def value(self) -> Fraction:
+        return self.total + self.group
+
+
+def tokenize(text: str, ordinals: bool = True) -> Iterator[NumeralToken]:
+    if not text:
+        return
+    tokens = text.split()
+    size = len(tokens)
+    number: Optional[_Number] = None
+    i = 0
+    while i < size:
+        word = tokens[i]
+        entry = LEXICON.get(word)
+        if entry is None and word.isdigit() and i + 1 < size:
+            following = LEXICON.get(tokens[i + 1])
+            if following is not None and following[0] == SCALE and int(word) < 1000:
+                entry = (HUNDRED, Fraction(int(word)), False)
+        if entry is None:
+            if number is not None:
+                yield from _finish(number)
+                number = None
+            yield NumeralToken(word)
+            i += 1
+            continue
+        kind, value, flag = entry
+        if number is None:
+            if kind == WHOLE or (kind == ORDINAL and not ordinals):
+                yield NumeralToken(word)
+                i += 1
+                continue
+            if kind == FRACTION:
+                following = LEXICON.get(tokens[i + 1]) if i + 1 < size else None
+                if following is None or following[0] != SCALE:
+                    yield NumeralToken(word, value)
+                    i += 1
+                    continue
+                number = _Number()
+                number.group = value
+                number.started = True
+                number.words.append(word)
+                i += 1
+                continue
+            number = _Number()
+        if kind in (UNIT, TEEN, TEN, HUNDRED):
+            if not _fits(number.group, value, number.started):
+                yield from _finish(number)
+                number = _Number()
+            number.group += value
+            number.started = True
+            number.words.append(word)
+            if tokens[i + 1 : i + 3] == list(_HALF_SUFFIX):
+                number.group += Fraction(1, 2)
+                number.words.extend(_HALF_SUFFIX)
+                i += 3
+                following = LEXICON.get(tokens[i]) if i < size else None
+                if following is None or following[0] != SCALE:
+                    yield from _finish(number)
+                    number = None
+                continue
+            i += 1
+            continue
+        if kind == SCALE:
+            if number.last_scale and value >= number.last_scale or (number.started and number.group == 0):
+                yield from _finish(number)
+                number = _Number()
+            number.total += (number.group or 1) * value
+            number.group = Fraction(0)
+            number.last_scale = value
+            number.started = True
+            number.words.append(word)
+            i += 1
+            continue
+        if kind == WHOLE:
+            if number.started and number.whole is None:
+                number.whole = number.value()
+                number.whole_at = len(number.words)
+                number.words.append(word)
+                number.total = Fraction(0)
+                number.group = Fraction(0)
+                number.started = False
+                number.last_scale = 0
+                i += 1
+                continue
+            yield from _finish(number)
+            number = None
+            yield NumeralToken(word)
+            i += 1
+            continue
+        if kind == ORDINAL:
+            if number.started and flag and not _fits(number.group, value, True):
+                numerator = number.value()
+                number.words.append(word)
+                yield NumeralToken(" ".join(number.words), (number.whole or 0) + numerator / value)
+                number = None
+                i += 1
+                continue
+            if number.started and _fits(number.group, value, True) and number.whole is None:
+                number.words.append(word)
+                if ordinals:
+                    number.group += value
+                    yield from _finish(number)
+                else:
+                    yield NumeralToken(" ".join(number.words))
+                number = None
+                i += 1
+                continue
+            yield from _finish(number)
+            number = None
+            if ordinals:
+                yield NumeralToken(word, value)
+            else:
+                yield NumeralToken(word)
+            i += 1
+            continue
+        if kind == FRACTION:
+            if number.started and not flag:
+                value = number.value() * value
+                number.words.append(word)
+                yield NumeralToken(" ".join(number.words), (number.whole or 0) + value)
+                number = None
+                i += 1
+                continue
+            yield from _finish(number)
+            number = None
+            yield NumeralToken(word, value)
+            i += 1
+            continue
+    if number is not None:
+        yield from _finish(number)
+
+
+def _finish(number: _Number) -> Iterator[NumeralToken]:
+    if number.whole is not None:
+        yield NumeralToken(" ".join(number.words[: number.whole_at]), number.whole)
+        yield NumeralToken(number.words[number.whole_at])
+        if number.started:
+            yield NumeralToken(" ".join(number.words[number.whole_at + 1 :]), number.value())
+        return
+    if number.started:
+        yield NumeralToken(" ".join(number.words), number.value())
+
+
+def format_value(value: Fraction) -> str:
+    if value.denominator == 1:
+        return str(value.numerator)
+    denominator = value.denominator
+    for factor in (2, 5):
+        while denominator % factor == 0:
+            denominator //= factor
+    if denominator == 1:
+        text = f"{float(value):.{_MAX_DECIMALS}f}".rstrip("0").rstrip(".")
+        if Fraction(text) == value:
+            return text
+    return f"({value.numerator}/{value.denominator})"
+
+
+def replace_number_words(text: str, ordinals: bool = True) -> str:
+    if not text:
+        return text
+    return " ".join(
+        token.text if token.value is None else format_value(token.value) for token in tokenize(text, ordinals)
+    )
+
+
+def parse_number(text: str) -> Fraction | None:
+    values = [token.value for token in tokenize(text) if token.value is not None]
+    if len(values) != 1:
+        return None
+    return values[0]
+
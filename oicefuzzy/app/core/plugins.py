@@ -0,0 +1,210 @@
+import importlib
+import importlib.util
+import sys
+import threading
+from dataclasses import dataclass, field
+from importlib import metadata
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import yaml
+
+from app.core.actions import ActionResult
+from app.core.config import ConfigStore
+from app.core.metrics import METRICS
+from app.core.utils import resolve_asset_path
+
+MANIFEST_NAME = "plugin.yaml"
+ACTIONS_GROUP = "fazi.actions"
+_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+COMMANDS_GROUP = "fazi.commands"
+
+PluginHandler = Callable[[Dict[str, Any], Dict[str, str], str, Any], ActionResult]
+
+
+@dataclass
+class PluginSpec:
+    name: str
+    module: str
+    actions: List[str]
+    commands: List[Dict[str, Any]] = field(default_factory=list)
+    path: Optional[Path] = None
+    handlers: Dict[str, str] = field(default_factory=dict)
+
+
+class PluginRegistry:
+    def __init__(self) -> None:
+        self._specs: Dict[str, PluginSpec] = {}
+        self._owners: Dict[str, PluginSpec] = {}
+        self._modules: Dict[str, ModuleType] = {}
+        self._lock = threading.Lock()
+        self.problems: List[str] = []
+
+    @property
+    def specs(self) -> List[PluginSpec]:
+        return list(self._specs.values())
+
+    def action_types(self) -> List[str]:
+        return list(self._owners)
+
+    def commands(self) -> List[Dict[str, Any]]:
+        commands = []
+        for spec in self._specs.values():
+            commands.extend(spec.commands)
+        return commands
+
+    def loaded(self) -> List[str]:
+        return list(self._modules)
+
+    def add(self, spec: PluginSpec) -> None:
+        if spec.name in self._specs:
+            self.problems.append(f"{spec.name}: duplicate plugin name")
+            return
+        self._specs[spec.name] = spec
+        for action_type in spec.actions:
+            owner = self._owners.get(action_type)
+            if owner is not None:
+                self.problems.append(f"{spec.name}: action '{action_type}' already provided by {owner.name}")
+                continue
+            self._owners[action_type] = spec
+
+    def discover_dir(self, root: Path | str) -> None:
+        root = Path(root)
+        if not root.is_dir():
+            return
+        for manifest in sorted(root.glob(f"*/{MANIFEST_NAME}")):
+            try:
+                self.add(read_manifest(manifest))
+            except (OSError, TypeError, ValueError, yaml.YAMLError) as exc:
+                self.problems.append(f"{manifest.parent.name}: {exc}")
+
+    def discover_entry_points(self) -> None:
+        try:
+            actions = metadata.entry_points(group=ACTIONS_GROUP)
+            packs = metadata.entry_points(group=COMMANDS_GROUP)
+        except Exception as exc:
+            self.problems.append(f"entry points: {exc}")
+            return
+        grouped: Dict[str, PluginSpec] = {}
+        for entry in actions:
+            module, _, attr = entry.value.partition(":")
+            name = entry.dist.name if getattr(entry, "dist", None) else module
+            spec = grouped.setdefault(name, PluginSpec(name, module, []))
+            spec.actions.append(entry.name)
+            spec.handlers[entry.name] = attr or f"handle_{entry.name}"
+        handler_modules = {spec.module for spec in grouped.values()}
+        for entry in packs:
+            module, _, attr = entry.value.partition(":")
+            module, attr = module.strip(), attr.strip()
+            if not attr.endswith((".yaml", ".yml")) and module in handler_modules:
+                self.problems.append(f"{entry.name}: command pack imports handler module {module} at startup; publish it as YAML")
+            try:
+                commands = read_command_pack(entry, module, attr)
+            except Exception as exc:
+                self.problems.append(f"{entry.name}: {exc}")
+                continue
+            name = entry.dist.name if getattr(entry, "dist", None) else entry.name
+            spec = grouped.setdefault(name, PluginSpec(name, module, []))
+            spec.commands.extend(commands)
+        for spec in grouped.values():
+            self.add(spec)
+
+    def handler(self, action_type: str, dispatcher: Any) -> Optional[Callable[[Dict[str, Any], Dict[str, str], str], ActionResult]]:
+        spec = self._owners.get(action_type)
+        if spec is None:
+            return None
+        attr = spec.handlers.get(action_type, f"handle_{action_type}")
+
+        def handle(action: Dict[str, Any], params: Dict[str, str], raw_text: str) -> ActionResult:
+            try:
+                function: PluginHandler = getattr(self._load(spec), attr)
+            except Exception as exc:
+                print(f"[plugins] {spec.name}: {exc}")
+                return ActionResult(False, f"\u041f\u043b\u0430\u0433\u0438\u043d {spec.name} \u043d\u0435 \u0437\u0430\u0433\u0440\u0443\u0436\u0435\u043d")
+            try:
+                return function(action, params, raw_text, dispatcher)
+            except Exception as exc:
+                print(f"[plugins] {spec.name}.{attr}: {exc!r}")
+                METRICS.count("plugin.errors")
+                text = f"\u041e\u0448\u0438\u0431\u043a\u0430 \u043f\u043b\u0430\u0433\u0438\u043d\u0430 {spec.name}"
+                return ActionResult(False, f"{text}: {exc}", text)
+
+        return handle
+
+    def _load(self, spec: PluginSpec) -> ModuleType:
+        module = self._modules.get(spec.name)
+        if module is not None:
+            return module
+        with self._lock:
+            module = self._modules.get(spec.name)
+            if module is None:
+                with METRICS.span("plugin.import"):
+                    module = import_plugin(spec)
+                self._modules[spec.name] = module
+                METRICS.count("plugin.loaded")
+        return module
+
+
+def read_manifest(path: Path) -> PluginSpec:
+    with path.open("r", encoding="utf-8") as handle:
+        data = yaml.load(handle, Loader=_LOADER) or {}
+    name = str(data.get("name") or path.parent.name)
+    actions = [str(action) for action in data.get("actions", []) or []]
+    if not actions:
+        raise ValueError("manifest declares no actions")
+    commands = data.get("commands", []) or []
+    for command in commands:
+        if command.get("action", {}).get("type") not in actions:
+            raise ValueError(f"command '{command.get('id')}' uses an action the plugin does not declare")
+    return PluginSpec(name, str(data.get("module", "handlers")), actions, commands, path.parent)
+
+
+def read_command_pack(entry: metadata.EntryPoint, module: str, attr: str) -> List[Dict[str, Any]]:
+    if attr.endswith((".yaml", ".yml")):
+        if getattr(entry, "dist", None) is None:
+            raise ValueError("YAML command pack needs an installed distribution")
+        path = Path(entry.dist.locate_file(Path(*module.split(".")) / attr))
+        with path.open("r", encoding="utf-8") as handle:
+            data = yaml.load(handle, Loader=_LOADER) or []
+        return list(data.get("commands", []) if isinstance(data, dict) else data)
+    commands = entry.load()
+    return list(commands() if callable(commands) else commands)
+
+
+def import_plugin(spec: PluginSpec) -> ModuleType:
+    if spec.path is None:
+        return importlib.import_module(spec.module)
+    source = spec.path / f"{spec.module}.py"
+    if not source.exists():
+        source = spec.path / spec.module / "__init__.py"
+    module_name = f"fazi_plugin_{spec.name}"
+    module_spec = importlib.util.spec_from_file_location(module_name, source)
+    if module_spec is None or module_spec.loader is None:
+        raise ImportError(f"cannot import {source}")
+    module = importlib.util.module_from_spec(module_spec)
+    sys.modules[module_name] = module
+    try:
+        module_spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(module_name, None)
+        raise
+    return module
+
+
+def discover_plugins(dirs: Iterable[Path | str], entry_points: bool = True) -> PluginRegistry:
+    registry = PluginRegistry()
+    for root in dirs:
+        registry.discover_dir(root)
+    if entry_points:
+        registry.discover_entry_points()
+    for problem in registry.problems:
+        print(f"[plugins] {problem}")
+    return registry
+
+
+def build_plugins(config: ConfigStore) -> PluginRegistry:
+    if not config.get_setting("plugins", "enabled", default=True):
+        return PluginRegistry()
+    dirs = [resolve_asset_path(path) for path in config.get_setting("plugins", "dirs", default=["plugins"]) or []]
+    return discover_plugins(dirs, entry_points=bool(config.get_setting("plugins", "entry_points", default=True)))
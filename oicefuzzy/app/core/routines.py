@@ -0,0 +1,164 @@
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from app.core.actions import ActionDispatcher, ActionResult, PreparedAction
+from app.core.metrics import METRICS
+
+STEP_PARAM_KEYS = ("text", "query", "site", "topic", "place", "expr", "payload")
+NESTED_TYPES = ("routine", "routine_cancel")
+
+
+@dataclass
+class PlanStep:
+    kind: str
+    prepared: Optional[PreparedAction] = None
+    params: Dict[str, str] = field(default_factory=dict)
+    raw_text: str = ""
+    delay_ms: int = 0
+
+
+@dataclass
+class RoutinePlan:
+    routine_id: str
+    steps: List[PlanStep]
+    tts: Optional[str] = None
+
+
+@dataclass
+class RoutineRun:
+    run_id: int
+    plan: RoutinePlan
+    index: int = 0
+    cancelled: bool = False
+    results: List[ActionResult] = field(default_factory=list)
+
+
+def routine_commands(routines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    commands = []
+    for routine in routines:
+        routine_id = str(routine.get("id", "")).strip()
+        patterns = routine.get("patterns", [])
+        if routine_id and patterns:
+            commands.append({"id": routine_id, "patterns": patterns, "action": {"type": "routine", "routine": routine_id}})
+    return commands
+
+
+def compile_step(dispatcher: ActionDispatcher, step: Dict[str, Any]) -> PlanStep:
+    kind = str(step.get("type", "")).strip()
+    if kind == "delay":
+        if "sec" in step:
+            return PlanStep(kind, delay_ms=max(0, int(float(step["sec"]) * 1000)))
+        return PlanStep(kind, delay_ms=max(0, int(step.get("ms", 0))))
+    if kind in NESTED_TYPES:
+        raise ValueError(f"step type '{kind}' is not allowed inside a routine")
+    action = dict(step)
+    if kind == "open_site":
+        site = str(step.get("site", "")).strip()
+        url = dispatcher.resolve_site(site)
+        if not url:
+            raise ValueError(f"unknown site '{site}'")
+        action = {"type": "open_url", "url": url, "tts": step.get("tts")}
+        kind = "open_url"
+    params: Dict[str, str] = {}
+    if "param" not in action:
+        for key in STEP_PARAM_KEYS:
+            if key in step:
+                action["param"] = key
+                params[key] = str(step[key])
+                break
+    raw_text = next(iter(params.values()), "")
+    return PlanStep(kind, dispatcher.prepare(action), params, raw_text)
+
+
+def compile_routine(dispatcher: ActionDispatcher, routine: Dict[str, Any]) -> RoutinePlan:
+    routine_id = str(routine.get("id", "")).strip()
+    if not routine_id:
+        raise ValueError("routine without id")
+    steps = [compile_step(dispatcher, step) for step in routine.get("steps", []) or []]
+    if not steps:
+        raise ValueError("routine has no steps")
+    return RoutinePlan(routine_id, steps, routine.get("tts"))
+
+
+class RoutineEngine(QObject):
+    step_finished = Signal(str, object)
+    routine_finished = Signal(str, object)
+
+    def __init__(self, dispatcher: ActionDispatcher, routines: List[Dict[str, Any]]) -> None:
+        super().__init__()
+        self._dispatcher = dispatcher
+        self._plans: Dict[str, RoutinePlan] = {}
+        self._runs: Dict[int, RoutineRun] = {}
+        self._ids = itertools.count(1)
+        self.problems: List[str] = []
+        for routine in routines:
+            try:
+                plan = compile_routine(dispatcher, routine)
+            except (TypeError, ValueError) as exc:
+                self.problems.append(f"{routine.get('id', '?')}: {exc}")
+                continue
+            self._plans[plan.routine_id] = plan
+        for problem in self.problems:
+            print(f"[routines] {problem}")
+        dispatcher.set_routines(self)
+
+    @property
+    def plans(self) -> Dict[str, RoutinePlan]:
+        return self._plans
+
+    def active(self) -> List[str]:
+        return [run.plan.routine_id for run in self._runs.values()]
+
+    def start(self, routine_id: str) -> ActionResult:
+        plan = self._plans.get(routine_id)
+        if plan is None:
+            return ActionResult(False, f"\u0421\u0446\u0435\u043d\u0430\u0440\u0438\u0439 {routine_id} \u043d\u0435 \u043d\u0430\u0439\u0434\u0435\u043d")
+        run = RoutineRun(next(self._ids), plan)
+        self._runs[run.run_id] = run
+        METRICS.count("routine.started")
+        QTimer.singleShot(0, self, lambda run_id=run.run_id: self._advance(run_id))
+        return ActionResult(True, f"\u0417\u0430\u043f\u0443\u0441\u043a\u0430\u044e \u0441\u0446\u0435\u043d\u0430\u0440\u0438\u0439 {routine_id}", plan.tts)
+
+    def cancel(self, routine_id: Optional[str] = None) -> bool:
+        cancelled = False
+        for run in list(self._runs.values()):
+            if routine_id is None or run.plan.routine_id == routine_id:
+                run.cancelled = True
+                cancelled = True
+                self._finish(run)
+        return cancelled
+
+    def _advance(self, run_id: int) -> None:
+        run = self._runs.get(run_id)
+        if run is None or run.cancelled:
+            return
+        steps = run.plan.steps
+        while run.index < len(steps):
+            step = steps[run.index]
+            run.index += 1
+            if step.kind == "delay":
+                if step.delay_ms:
+                    QTimer.singleShot(step.delay_ms, self, lambda: self._advance(run_id))
+                    return
+                continue
+            prepared = step.prepared
+            with METRICS.span("routine.step"), METRICS.span(prepared.span):
+                try:
+                    result = prepared.handler(prepared.action, step.params, step.raw_text)
+                except Exception as exc:
+                    result = ActionResult(False, f"{run.plan.routine_id}: {exc}")
+            run.results.append(result)
+            self.step_finished.emit(run.plan.routine_id, result)
+            if not result.ok or run.cancelled:
+                break
+        self._finish(run)
+
+    def _finish(self, run: RoutineRun) -> None:
+        if self._runs.pop(run.run_id, None) is None:
+            return
+        ok = not run.cancelled and len(run.results) == sum(1 for step in run.plan.steps if step.kind != "delay")
+        ok = ok and all(result.ok for result in run.results)
+        self.routine_finished.emit(run.plan.routine_id, ActionResult(ok, run.plan.routine_id, None, list(run.results)))
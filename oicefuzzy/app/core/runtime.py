@@ -0,0 +1,197 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+from app.core.actions import ActionDispatcher, default_notes_store
+from app.core.capture_ring import CaptureRecorder, CaptureRing
+from app.core.commands import DEFAULT_CHAIN_WORDS, CommandMatcher, CommandProcessor
+from app.core.config import ConfigStore
+from app.core.devices import DeviceManager
+from app.core.echo import EchoGate
+from app.core.languages import LanguageRoute, load_commands, split_wake_words
+from app.core.math_eval import MathEvaluator
+from app.core.metrics import METRICS, JsonlExporter
+from app.core.notes import NotesStore
+from app.core.plugins import PluginRegistry, build_plugins
+from app.core.routines import RoutineEngine, routine_commands
+from app.core.stt import SpeechListener
+from app.core.timer_manager import TimerManager
+from app.core.tts import TtsEngine
+from app.core.tts_cache import PhraseCache, static_phrases
+from app.core.utils import resolve_asset_path
+
+
+def resolve_model_path(config: ConfigStore) -> str:
+    model_path = config.get_setting("stt", "model_path", default="")
+    if not model_path:
+        return ""
+    return resolve_asset_path(model_path)
+
+
+def build_languages(config: ConfigStore) -> List[LanguageRoute]:
+    locale = str(config.get_setting("app", "locale", default="ru-RU"))
+    primary = LanguageRoute(
+        locale.split("-")[0].lower() or "ru",
+        resolve_model_path(config),
+        split_wake_words(config.get_setting("stt", "wake_word", default="")),
+    )
+    routes = [primary]
+    for entry in config.get_setting("stt", "languages", default=[]) or []:
+        code = str(entry.get("code", "")).strip().lower()
+        if not entry.get("enabled", True) or not code or code in [route.code for route in routes]:
+            continue
+        model_path = resolve_asset_path(entry.get("model_path", ""))
+        if not model_path or not Path(model_path).exists():
+            print(f"[stt] {code}: model not found at {model_path}, language skipped")
+            continue
+        wake_words = split_wake_words(entry.get("wake_word", "")) or primary.wake_words
+        routes.append(LanguageRoute(code, model_path, wake_words, resolve_asset_path(entry.get("commands", ""))))
+    return routes
+
+
+def build_phrase_cache(config: ConfigStore) -> PhraseCache | None:
+    if not config.get_setting("tts", "cache_enabled", default=True):
+        return None
+    cache_dir = resolve_asset_path(config.get_setting("tts", "cache_dir", default="cache/tts"))
+    return PhraseCache(cache_dir, max_entries=int(config.get_setting("tts", "cache_max_entries", default=500)))
+
+
+def build_capture_recorder(config: ConfigStore) -> CaptureRecorder | None:
+    seconds = float(config.get_setting("diagnostics", "capture_ring_sec", default=0) or 0)
+    if seconds <= 0:
+        return None
+    ring = CaptureRing(seconds, int(config.get_setting("stt", "sample_rate", default=16000)))
+    return CaptureRecorder(
+        ring,
+        resolve_asset_path(config.get_setting("diagnostics", "capture_dir", default="logs/captures")),
+        keep=int(config.get_setting("diagnostics", "capture_keep", default=50)),
+    )
+
+
+def build_metrics_exporter(config: ConfigStore) -> JsonlExporter | None:
+    METRICS.enabled = bool(config.get_setting("diagnostics", "enabled", default=True))
+    if METRICS.enabled:
+        METRICS.start_collector()
+    export_path = config.get_setting("diagnostics", "export_path", default="logs/metrics.jsonl")
+    if not METRICS.enabled or not export_path:
+        return None
+    return JsonlExporter(
+        METRICS,
+        resolve_asset_path(export_path),
+        interval_sec=float(config.get_setting("diagnostics", "export_interval_sec", default=60)),
+        max_bytes=int(config.get_setting("diagnostics", "export_max_bytes", default=1048576)),
+        backups=int(config.get_setting("diagnostics", "export_backups", default=3)),
+    )
+
+
+@dataclass
+class Runtime:
+    config: ConfigStore
+    echo: EchoGate
+    tts: TtsEngine
+    timer_manager: TimerManager
+    notes: NotesStore
+    math: MathEvaluator
+    dispatcher: ActionDispatcher
+    matcher: CommandMatcher
+    processor: CommandProcessor
+    listener: SpeechListener
+    routines: RoutineEngine
+    plugins: PluginRegistry
+    exporter: JsonlExporter | None = None
+    matchers: Dict[str, CommandMatcher] = field(default_factory=dict)
+    devices: DeviceManager | None = None
+    capture: CaptureRecorder | None = None
+
+    def matcher_for(self, language: str) -> CommandMatcher:
+        return self.matchers.get(language, self.matcher)
+
+    def problems(self) -> List[str]:
+        problems = [f"plugins: {problem}" for problem in self.plugins.problems]
+        problems += [f"routines: {problem}" for problem in self.routines.problems]
+        for code, matcher in (self.matchers or {"": self.matcher}).items():
+            label = f"commands[{code}]" if code else "commands"
+            problems += [f"{label}: {problem}" for problem in matcher.problems]
+        return problems
+
+    def configure_listener(self) -> None:
+        config = self.config
+        self.listener.configure(
+            command_timeout_sec=int(config.get_setting("stt", "command_timeout_sec", default=8)),
+            silence_timeout_ms=int(config.get_setting("stt", "silence_timeout_ms", default=1200)),
+            device_index=config.get_setting("stt", "device_index", default=None),
+            debug_console=config.get_setting("stt", "debug_console", default=False),
+            partial_interval_ms=int(config.get_setting("stt", "partial_interval_ms", default=150)),
+        )
+
+    def shutdown(self) -> None:
+        self.routines.cancel()
+        self.listener.stop()
+        if self.capture:
+            self.listener.set_capture_recorder(None)
+            self.capture.close()
+        self.tts.stop()
+        self.notes.close()
+        if self.exporter:
+            self.exporter.stop()
+        METRICS.stop_collector()
+
+
+def build_runtime(config: ConfigStore) -> Runtime:
+    exporter = build_metrics_exporter(config)
+    if exporter:
+        exporter.start()
+    echo = EchoGate(
+        mode=config.get_setting("stt", "echo_mode", default="attenuate"),
+        tail_ms=int(config.get_setting("stt", "echo_tail_ms", default=300)),
+        attenuation=float(config.get_setting("stt", "echo_attenuation", default=0.2)),
+        sample_rate=int(config.get_setting("stt", "sample_rate", default=16000)),
+    )
+    tts = TtsEngine(
+        enabled=config.get_setting("tts", "enabled", default=True),
+        volume=float(config.get_setting("tts", "volume", default=0.9)),
+        rate=int(config.get_setting("tts", "rate", default=180)),
+        cache=build_phrase_cache(config),
+        max_age_sec=float(config.get_setting("tts", "max_age_sec", default=20)),
+        echo=echo,
+    )
+    plugins = build_plugins(config)
+    tts.preload(static_phrases(config.commands + plugins.commands()))
+    timer_manager = TimerManager()
+    notes = default_notes_store()
+    math = MathEvaluator(
+        precision=int(config.get_setting("math", "precision", default=6)),
+        mode=config.get_setting("math", "mode", default="float"),
+    )
+    dispatcher = ActionDispatcher(config.targets, config.allowlist, timer_manager, notes, math, plugins=plugins)
+    routines = RoutineEngine(dispatcher, config.routines)
+    matcher = CommandMatcher(config.commands + plugins.commands() + routine_commands(config.routines), dispatcher)
+    processor = CommandProcessor(
+        dispatcher,
+        config.get_setting("stt", "wake_word", default=""),
+        chaining=bool(config.get_setting("commands", "chaining", default=True)),
+        chain_words=config.get_setting("commands", "chain_words", default=DEFAULT_CHAIN_WORDS),
+    )
+    languages = build_languages(config)
+    matchers = {languages[0].code: matcher}
+    for route in languages[1:]:
+        matchers[route.code] = CommandMatcher(load_commands(route.commands_path), dispatcher)
+    listener = SpeechListener(
+        model_path=resolve_model_path(config),
+        wake_word=config.get_setting("stt", "wake_word", default=""),
+        sample_rate=int(config.get_setting("stt", "sample_rate", default=16000)),
+        languages=languages if len(languages) > 1 else None,
+        language=languages[0].code,
+        max_alternatives=int(config.get_setting("stt", "max_alternatives", default=0) or 0),
+    )
+    if len(languages) > 1 and config.get_setting("stt", "preload_languages", default=False):
+        listener.preload_languages()
+    listener.set_echo_gate(echo)
+    capture = build_capture_recorder(config)
+    listener.set_capture_recorder(capture)
+    devices = DeviceManager(poll_sec=float(config.get_setting("stt", "device_poll_sec", default=0) or 0))
+    devices.follow(listener)
+    devices.refresh()
+    runtime = Runtime(config, echo, tts, timer_manager, notes, math, dispatcher, matcher, processor, listener, routines, plugins, exporter, matchers, devices, capture)
+    runtime.configure_listener()
+    return runtime
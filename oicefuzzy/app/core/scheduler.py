@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Generic, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def earliest(deadlines: Iterable[Optional[float]]) -> Optional[float]:
+    due = [deadline for deadline in deadlines if deadline is not None]
+    return min(due) if due else None
+
+
+class DeadlineQueue(Generic[T]):
+    def __init__(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._items: Deque[T] = deque()
+        self._woken = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: T) -> None:
+        with self._cond:
+            self._items.append(item)
+            self._cond.notify()
+
+    def wake(self) -> None:
+        with self._cond:
+            self._woken = True
+            self._cond.notify()
+
+    def get(self, deadline: Optional[float] = None) -> Optional[T]:
+        with self._cond:
+            while not self._items and not self._woken:
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self._woken = False
+            return self._items.popleft() if self._items else None
+
+    def get_nowait(self) -> Optional[T]:
+        with self._cond:
+            return self._items.popleft() if self._items else None
@@ -1,28 +1,72 @@
-import json
-import re
 import queue
 import threading
 import time
-from typing import Optional
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional
 
 import sounddevice as sd
 from PySide6.QtCore import QObject, Signal
 from vosk import KaldiRecognizer, Model
 
+from app.core.audio_buffers import AudioSlab, BufferPool, accept_waveform, rms
+from app.core.capture_ring import CaptureRecorder
+from app.core.devices import PORTAUDIO_LOCK
+from app.core.echo import EchoGate
+from app.core.languages import (
+    Hypothesis,
+    LanguageRoute,
+    ModelPool,
+    Utterance,
+    combine_hypotheses,
+    mean_confidence,
+    result_hypotheses,
+    result_text,
+    split_wake_words,
+)
+from app.core.metrics import METRICS
+from app.core.scheduler import DeadlineQueue, earliest
+from app.core.stt_results import EmitLimiter, ResultDecoder
 from app.core.utils import normalize_text
 
+BLOCK_FRAMES = 8000
+
+_KEEP: Any = object()
+
 
 class SpeechListener(QObject):
     status_changed = Signal(str)
     partial_text = Signal(str)
     command_ready = Signal(str)
     error = Signal(str)
+    device_lost = Signal()
     wake_detected = Signal()
+    utterance_ready = Signal(object)
 
-    def __init__(self, model_path: str, wake_word: str, sample_rate: int = 16000) -> None:
+    def __init__(
+        self,
+        model_path: str,
+        wake_word: str,
+        sample_rate: int = 16000,
+        languages: Optional[List[LanguageRoute]] = None,
+        pool: Optional[ModelPool] = None,
+        language: str = "ru",
+        max_alternatives: int = 0,
+    ) -> None:
         super().__init__()
         self._model_path = model_path
         self._wake_words = self._split_wake_words(wake_word)
+        self._routes = list(languages) if languages else [LanguageRoute(language, model_path, self._wake_words)]
+        if languages:
+            self._wake_words = list(dict.fromkeys(word for route in self._routes for word in route.wake_words))
+        self._primary = self._routes[0].code
+        self._multi = len(self._routes) > 1
+        self._pool = pool or ModelPool()
+        self._max_alternatives = 0 if self._multi else max(0, int(max_alternatives))
+        self._command_hypotheses: List[List[Hypothesis]] = []
+        self._recognizers: Dict[str, KaldiRecognizer] = {}
+        self._candidates: List[str] = [self._primary]
+        self._parts: Dict[str, List[str]] = {}
+        self._confidences: Dict[str, List[float]] = {}
         self._sample_rate = sample_rate
         self._command_timeout_sec = 8
         self._silence_timeout_ms = 1200
@@ -31,10 +75,20 @@ class SpeechListener(QObject):
         self._direct_mode = False
         self._model: Optional[Model] = None
         self._recognizer: Optional[KaldiRecognizer] = None
-        self._audio_queue: queue.Queue[bytes] = queue.Queue()
+        self._buffers = BufferPool(BLOCK_FRAMES * 2)
+        self._audio_queue: DeadlineQueue[AudioSlab] = DeadlineQueue()
+        self._control: queue.SimpleQueue[Callable[[], None]] = queue.SimpleQueue()
+        self._decoder = ResultDecoder()
+        self._partial_limiter = EmitLimiter()
+        self._echo: Optional[EchoGate] = None
+        self._recorder: Optional[CaptureRecorder] = None
+        self._utterance_start = 0
+        self._utterance_partials: List[str] = []
         self._running = False
         self._worker: Optional[threading.Thread] = None
         self._stream: Optional[sd.RawInputStream] = None
+        self._stream_lock = threading.Lock()
+        self._closing_stream = False
         self._mode = "idle"
         self._command_deadline = 0.0
         self._last_voice_time = 0.0
@@ -49,15 +103,82 @@ class SpeechListener(QObject):
         silence_timeout_ms: int,
         device_index: Optional[int],
         debug_console: Optional[bool] = None,
+        partial_interval_ms: Optional[int] = None,
     ) -> None:
-        self._command_timeout_sec = command_timeout_sec
-        self._silence_timeout_ms = silence_timeout_ms
-        self._device_index = device_index
-        if debug_console is not None:
-            self._debug_console = bool(debug_console)
+        self.reconfigure(
+            command_timeout_sec=command_timeout_sec,
+            silence_timeout_ms=silence_timeout_ms,
+            device_index=device_index,
+            debug_console=debug_console,
+            partial_interval_ms=partial_interval_ms,
+        )
+
+    def reconfigure(
+        self,
+        command_timeout_sec: Optional[int] = None,
+        silence_timeout_ms: Optional[int] = None,
+        device_index: Optional[int] = _KEEP,
+        debug_console: Optional[bool] = None,
+        partial_interval_ms: Optional[int] = None,
+        wake_word: Optional[str] = None,
+        direct_mode: Optional[bool] = None,
+    ) -> List[str]:
+        changed = []
+        if command_timeout_sec is not None and int(command_timeout_sec) != self._command_timeout_sec:
+            changed.append("command_timeout_sec")
+        if silence_timeout_ms is not None and int(silence_timeout_ms) != self._silence_timeout_ms:
+            changed.append("silence_timeout_ms")
+        if debug_console is not None and bool(debug_console) != self._debug_console:
+            changed.append("debug_console")
+        if partial_interval_ms is not None and max(0, int(partial_interval_ms)) / 1000.0 != self._partial_limiter.interval:
+            changed.append("partial_interval_ms")
+        wake_words = self._split_wake_words(wake_word) if wake_word is not None else self._routes[0].wake_words
+        if wake_words != self._routes[0].wake_words:
+            changed.append("wake_word")
+        if direct_mode is not None and bool(direct_mode) != self._direct_mode:
+            changed.append("direct_mode")
+
+        def apply() -> None:
+            if command_timeout_sec is not None:
+                self._command_timeout_sec = int(command_timeout_sec)
+            if silence_timeout_ms is not None:
+                self._silence_timeout_ms = int(silence_timeout_ms)
+            if debug_console is not None:
+                self._debug_console = bool(debug_console)
+            if "partial_interval_ms" in changed:
+                self._partial_limiter = EmitLimiter(partial_interval_ms)
+            if "wake_word" in changed:
+                self._set_wake_words(wake_words)
+            if "direct_mode" in changed:
+                self._apply_direct_mode(bool(direct_mode))
+
+        if changed:
+            METRICS.count("stt.reconfigure")
+            self._post(apply)
+        if device_index is not _KEEP and device_index != self._device_index:
+            changed.append("device_index")
+            if self.is_capturing():
+                self.switch_device(device_index)
+            else:
+                self._device_index = device_index
+        return changed
+
+    def set_echo_gate(self, gate: Optional[EchoGate]) -> None:
+        self._echo = gate
+
+    def set_capture_recorder(self, recorder: Optional[CaptureRecorder]) -> None:
+        self._recorder = recorder
+
+    def dump_utterance(self, utterance: Utterance, reason: str, detail: str = "") -> Optional[threading.Thread]:
+        if self._recorder is None:
+            return None
+        return self._recorder.dump(utterance, reason, detail)
 
     def set_direct_mode(self, enabled: bool) -> None:
-        self._direct_mode = bool(enabled)
+        self._post(lambda: self._apply_direct_mode(bool(enabled)))
+
+    def _apply_direct_mode(self, enabled: bool) -> None:
+        self._direct_mode = enabled
         if not self._running:
             return
         if self._direct_mode:
@@ -69,10 +190,25 @@ class SpeechListener(QObject):
     def start(self) -> None:
         if self._running:
             return
+        if not self._join_worker():
+            print("[stt] previous worker still running, start refused")
+            return
         try:
             if not self._model:
-                self._model = Model(self._model_path)
-            self._recognizer = KaldiRecognizer(self._model, self._sample_rate)
+                self._model = self._pool.get(self._routes[0].model_path, self._primary)
+            if self._recognizer is None:
+                self._recognizer = KaldiRecognizer(self._model, self._sample_rate)
+                if self._multi:
+                    self._recognizer.SetWords(True)
+                elif self._max_alternatives > 1:
+                    self._recognizer.SetMaxAlternatives(self._max_alternatives)
+                    self._recognizer.SetWords(True)
+                self._recognizers = {self._primary: self._recognizer}
+            else:
+                for recognizer in self._recognizers.values():
+                    recognizer.Reset()
+                self._decoder.reset()
+                METRICS.count("stt.recognizer_reused")
         except Exception as exc:
             self.error.emit(str(exc))
             return
@@ -84,105 +220,387 @@ class SpeechListener(QObject):
         self._worker = threading.Thread(target=self._run, daemon=True)
         self._worker.start()
 
+    def languages(self) -> List[str]:
+        return [route.code for route in self._routes]
+
+    def preload_languages(self) -> None:
+        for route in self._routes[1:]:
+            self._pool.preload(route.model_path, route.code)
+
     def stop(self) -> None:
         self._running = False
-        if self._stream:
-            try:
-                self._stream.stop()
-                self._stream.close()
-            except Exception:
-                pass
-        self._stream = None
+        with self._stream_lock:
+            self._close_stream()
+        self._join_worker()
         self._status("idle")
 
-    def _run(self) -> None:
-        def callback(indata, frames, time_info, status):
-            if status:
-                pass
-            self._audio_queue.put(bytes(indata))
+    def _join_worker(self, timeout: float = 2.0) -> bool:
+        worker = self._worker
+        if worker is None:
+            return True
+        if worker is threading.current_thread():
+            return False
+        self._audio_queue.wake()
+        worker.join(timeout)
+        if worker.is_alive():
+            print("[stt] worker did not stop in time")
+            return False
+        self._worker = None
+        self._apply_control()
+        while (slab := self._audio_queue.get_nowait()) is not None:
+            self._buffers.release(slab)
+        return True
 
-        try:
-            self._stream = sd.RawInputStream(
+    def _post(self, change: Callable[[], None]) -> None:
+        worker = self._worker
+        if self._running and worker is not None and worker.is_alive() and worker is not threading.current_thread():
+            self._control.put(change)
+            self._audio_queue.wake()
+        else:
+            change()
+
+    def _apply_control(self) -> None:
+        while True:
+            try:
+                change = self._control.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                change()
+            except Exception as exc:
+                print(f"[stt] reconfigure failed: {exc}")
+
+    def _set_wake_words(self, wake_words: List[str]) -> None:
+        previous = self._routes[0].wake_words
+        self._routes = [
+            replace(route, wake_words=list(wake_words)) if index == 0 or route.wake_words == previous else route
+            for index, route in enumerate(self._routes)
+        ]
+        self._wake_words = list(dict.fromkeys(word for route in self._routes for word in route.wake_words))
+
+    @property
+    def device_index(self) -> Optional[int]:
+        return self._device_index
+
+    def is_capturing(self) -> bool:
+        return self._running and self._stream is not None
+
+    def switch_device(self, device_index: Optional[int]) -> threading.Thread:
+        return self.reopen_stream(lambda: device_index)
+
+    def reopen_stream(self, resolve: Callable[[], Optional[int]]) -> threading.Thread:
+        def run() -> None:
+            with self._stream_lock:
+                self._close_stream()
+                try:
+                    self._device_index = resolve()
+                except Exception as exc:
+                    print(f"[stt] device lookup failed: {exc}")
+                    self._device_index = None
+                if not self._running:
+                    return
+                with METRICS.span("audio.device_switch"):
+                    try:
+                        self._open_stream()
+                    except Exception as exc:
+                        if self._device_index is None:
+                            self.error.emit(str(exc))
+                            return
+                        print(f"[stt] device {self._device_index} failed ({exc}), using the default input")
+                        self._device_index = None
+                        try:
+                            self._open_stream()
+                        except Exception as fallback_exc:
+                            self.error.emit(str(fallback_exc))
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def _open_stream(self) -> None:
+        with PORTAUDIO_LOCK:
+            stream = sd.RawInputStream(
                 samplerate=self._sample_rate,
-                blocksize=8000,
+                blocksize=BLOCK_FRAMES,
                 dtype="int16",
                 channels=1,
-                callback=callback,
+                callback=self._stream_callback,
+                finished_callback=self._stream_finished,
                 device=self._device_index,
             )
-            self._stream.start()
+            stream.start()
+        self._stream = stream
+
+    def _close_stream(self) -> None:
+        stream, self._stream = self._stream, None
+        if stream is None:
+            return
+        self._closing_stream = True
+        try:
+            stream.stop()
+            stream.close()
+        except Exception:
+            pass
+        finally:
+            self._closing_stream = False
+
+    def _stream_callback(self, indata, frames, time_info, status) -> None:
+        if status:
+            pass
+        self._capture(indata)
+
+    def _stream_finished(self) -> None:
+        if self._running and not self._closing_stream:
+            METRICS.count("audio.stream_lost")
+            self.device_lost.emit()
+
+    def _run(self) -> None:
+        try:
+            with self._stream_lock:
+                self._open_stream()
         except Exception as exc:
             self.error.emit(str(exc))
             self._running = False
             return
 
         while self._running:
-            try:
-                data = self._audio_queue.get(timeout=0.2)
-            except queue.Empty:
-                self._check_command_timeout()
-                continue
-            self._process_audio(data)
+            self._apply_control()
+            slab = self._audio_queue.get(self._next_deadline())
+            METRICS.count("stt.wakeup")
+            if slab is not None:
+                self._consume(slab)
+            self._flush_partial()
             self._check_command_timeout()
 
-    def _process_audio(self, data: bytes) -> None:
+    def _next_deadline(self) -> Optional[float]:
+        if self._mode != "command":
+            return None
+        deadlines = [self._partial_limiter.due()]
+        if not (self._direct_mode and not self._heard_speech):
+            deadlines.append(self._command_deadline)
+        if self._heard_speech:
+            deadlines.append(self._last_voice_time + self._silence_timeout_ms / 1000.0)
+        return earliest(deadlines)
+
+    def _capture(self, indata) -> None:
+        slab = self._buffers.fill(indata, time.monotonic())
+        if slab is None:
+            METRICS.count("audio.dropped")
+            return
+        self._audio_queue.put(slab)
+        METRICS.count("audio.blocks")
+
+    def _consume(self, slab: AudioSlab) -> None:
+        try:
+            METRICS.observe("audio.queue_delay", time.monotonic() - slab.captured)
+            data = slab.data()
+            if self._recorder:
+                self._recorder.record(data)
+            if self._echo:
+                data = self._echo.process(data, slab.captured)
+                if data is None:
+                    METRICS.count("echo.gated")
+                    return
+            self._process_audio(data)
+        finally:
+            self._buffers.release(slab)
+
+    def _process_audio(self, data: bytes | memoryview) -> None:
         if not self._recognizer:
             return
-        rms = self._calculate_rms(data)
+        with METRICS.span("stt.vad"):
+            rms = self._calculate_rms(data)
         now = time.monotonic()
         if rms > self._rms_threshold:
             self._last_voice_time = now
             if not self._heard_speech:
                 self._command_deadline = now + self._command_timeout_sec
             self._heard_speech = True
-        if self._recognizer.AcceptWaveform(data):
-            result = json.loads(self._recognizer.Result())
-            text = result.get("text", "")
+        if self._multi and self._mode == "command":
+            self._decode_candidates(data)
+            return
+        started = time.perf_counter()
+        final = accept_waveform(self._recognizer, data)
+        elapsed = time.perf_counter() - started
+        METRICS.observe("stt.accept_waveform", elapsed)
+        if data:
+            METRICS.observe("stt.rtf", elapsed / (len(data) / 2 / self._sample_rate))
+        if final:
+            with METRICS.span("stt.decode"):
+                result = self._decoder.result(self._recognizer.Result())
+            text = result_text(result)
             if self._debug_console and text:
                 print(f"[final:{self._mode}] {text}", flush=True)
+            if self._mode == "command" and self._max_alternatives > 1 and normalize_text(text):
+                self._command_hypotheses.append(result_hypotheses(result))
             self._handle_text(text, is_final=True)
         else:
-            partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+            with METRICS.span("stt.decode"):
+                partial = self._decoder.partial(self._recognizer.PartialResult())
+            if partial is None:
+                return
             if self._debug_console and partial:
                 print(f"[partial:{self._mode}] {partial}", flush=True)
             self._handle_text(partial, is_final=False)
 
+    def _decode_candidates(self, data: bytes | memoryview) -> None:
+        for code in self._candidates:
+            recognizer = self._recognizers.get(code)
+            if recognizer is None:
+                continue
+            with METRICS.span(f"stt.accept_waveform.{code}"):
+                final = accept_waveform(recognizer, data)
+            if final:
+                result = self._decoder.result(recognizer.Result(), code)
+                self._collect(code, result)
+                if code != self._candidates[0]:
+                    continue
+                text = result_text(result)
+            elif code != self._candidates[0]:
+                continue
+            else:
+                text = self._decoder.partial(recognizer.PartialResult(), code)
+                if text is None:
+                    continue
+            if self._debug_console and text:
+                print(f"[{'final' if final else 'partial'}:{code}] {text}", flush=True)
+            cleaned = normalize_text(text)
+            if cleaned:
+                self._note_partial(cleaned)
+
+    def _collect(self, code: str, result: dict) -> None:
+        text = normalize_text(result_text(result))
+        if not text:
+            return
+        self._parts.setdefault(code, []).append(text)
+        confidence = mean_confidence(result)
+        if confidence is not None:
+            self._confidences.setdefault(code, []).append(confidence)
+
+    def _recognizer_for(self, code: str) -> Optional[KaldiRecognizer]:
+        recognizer = self._recognizers.get(code)
+        if recognizer is not None:
+            return recognizer
+        route = next((route for route in self._routes if route.code == code), None)
+        if route is None:
+            return None
+        if threading.current_thread() is not self._worker and not self._pool.loaded(route.model_path):
+            self._pool.preload(route.model_path, code)
+            return None
+        try:
+            model = self._pool.get(route.model_path, code)
+            recognizer = KaldiRecognizer(model, self._sample_rate)
+            recognizer.SetWords(True)
+        except Exception as exc:
+            self.error.emit(f"{code}: {exc}")
+            return None
+        self._recognizers[code] = recognizer
+        return recognizer
+
+    def _choose_language(self) -> Utterance:
+        started = time.perf_counter()
+        texts: Dict[str, str] = {}
+        scores: Dict[str, float] = {}
+        for code in self._candidates:
+            recognizer = self._recognizers.get(code)
+            if recognizer is None:
+                continue
+            self._collect(code, self._decoder.result(recognizer.FinalResult(), code))
+            text = " ".join(self._parts.get(code, [])).strip()
+            if not text:
+                continue
+            texts[code] = text
+            confidences = self._confidences.get(code) or [0.0]
+            scores[code] = sum(confidences) / len(confidences)
+        if not texts:
+            utterance = Utterance(self._last_partial, self._candidates[0], 0.0)
+        else:
+            best = max(texts, key=lambda code: (scores[code], code == self._primary))
+            utterance = Utterance(texts[best], best, scores[best], texts)
+        elapsed = time.perf_counter() - started
+        METRICS.observe("stt.route", elapsed)
+        METRICS.observe(f"stt.route.{utterance.language}", elapsed)
+        if self._debug_console and len(texts) > 1:
+            print(f"[route] {utterance.language} " + ", ".join(f"{code}={score:.2f}" for code, score in scores.items()), flush=True)
+        return utterance
+
     def _handle_text(self, text: str, is_final: bool) -> None:
-        cleaned = normalize_text(text)
+        with METRICS.span("stt.normalize"):
+            cleaned = normalize_text(text)
         if not cleaned:
             return
         if self._mode == "idle":
             if self._wake_words and any(word in cleaned for word in self._wake_words):
+                self._candidates = [route.code for route in self._routes if any(word in cleaned for word in route.wake_words)]
                 self._enter_command_mode(emit_wake=True)
         elif self._mode == "command":
-            self._last_partial = cleaned
-            self.partial_text.emit(cleaned)
+            self._note_partial(cleaned)
             if is_final:
                 self._command_parts.append(cleaned)
 
+    def _note_partial(self, cleaned: str) -> None:
+        self._last_partial = cleaned
+        self._emit_partial(cleaned)
+        if self._recorder and (not self._utterance_partials or self._utterance_partials[-1] != cleaned):
+            self._utterance_partials.append(cleaned)
+
+    def _emit_partial(self, text: str) -> None:
+        text = self._partial_limiter.offer(text, time.monotonic())
+        if text is not None:
+            self.partial_text.emit(text)
+
+    def _flush_partial(self) -> None:
+        text = self._partial_limiter.flush(time.monotonic())
+        if text is not None and self._mode == "command":
+            self.partial_text.emit(text)
+
     def _enter_command_mode(self, emit_wake: bool) -> None:
         self._mode = "command"
         self._command_parts = []
+        self._command_hypotheses = []
         self._last_partial = ""
+        self._partial_limiter.reset()
+        self._decoder.reset()
         self._heard_speech = False
         now = time.monotonic()
         self._command_deadline = now + self._command_timeout_sec
         self._last_voice_time = now
-        if self._recognizer:
-            try:
-                self._recognizer.Reset()
-            except Exception:
-                pass
+        if not emit_wake or not self._candidates:
+            self._candidates = [route.code for route in self._routes]
+        self._parts = {}
+        self._confidences = {}
+        self._utterance_partials = []
+        if self._recorder:
+            self._utterance_start = self._recorder.mark()
+        if self._multi:
+            self._candidates = [code for code in self._candidates if self._recognizer_for(code) is not None] or [self._primary]
+        for code, recognizer in self._recognizers.items():
+            if code == self._primary or code in self._candidates:
+                try:
+                    recognizer.Reset()
+                except Exception:
+                    pass
         if emit_wake:
+            METRICS.count("stt.wake")
+            METRICS.mark("wake")
             self.wake_detected.emit()
         self._status("listening")
 
     def _finalize_command(self) -> None:
         if self._mode != "command":
             return
-        command_text = " ".join(self._command_parts).strip()
-        if not command_text and self._last_partial:
-            command_text = self._last_partial
+        if self._multi:
+            utterance = self._choose_language()
+            command_text = utterance.text
+        else:
+            command_text = " ".join(self._command_parts).strip()
+            if not command_text and self._last_partial:
+                command_text = self._last_partial
+            alternatives = combine_hypotheses(self._command_hypotheses, self._max_alternatives)
+            utterance = Utterance(command_text, self._primary, alternatives=alternatives if len(alternatives) > 1 else [])
+        if self._recorder:
+            utterance.partials = self._utterance_partials
+            utterance.audio = (self._utterance_start, self._recorder.ring.position)
         if self._direct_mode and self._running:
             self._enter_command_mode(emit_wake=False)
         else:
@@ -192,7 +610,9 @@ class SpeechListener(QObject):
             else:
                 self._status("idle")
         self._command_parts = []
+        self._command_hypotheses = []
         self._last_partial = ""
+        self.utterance_ready.emit(utterance)
         if command_text:
             self.command_ready.emit(command_text)
         else:
@@ -207,23 +627,14 @@ class SpeechListener(QObject):
         if now >= self._command_deadline:
             self._finalize_command()
             return
-        if self._heard_speech and (now - self._last_voice_time) * 1000 > self._silence_timeout_ms:
+        if self._heard_speech and (now - self._last_voice_time) * 1000 >= self._silence_timeout_ms:
             self._finalize_command()
 
     def _status(self, value: str) -> None:
         self.status_changed.emit(value)
 
-    def _calculate_rms(self, data: bytes) -> float:
-        if not data:
-            return 0.0
-        count = len(data) // 2
-        if count == 0:
-            return 0.0
-        total = 0
-        for i in range(0, len(data), 2):
-            sample = int.from_bytes(data[i : i + 2], byteorder="little", signed=True)
-            total += sample * sample
-        return (total / count) ** 0.5
+    def _calculate_rms(self, data: bytes | memoryview) -> float:
+        return rms(data)
 
     @staticmethod
     def list_input_devices() -> list[dict]:
@@ -235,12 +646,4 @@ class SpeechListener(QObject):
 
     @staticmethod
     def _split_wake_words(wake_word: str) -> list[str]:
-        if not wake_word:
-            return []
-        parts = re.split(r"[|,;]+", wake_word)
-        words = []
-        for part in parts:
-            normalized = normalize_text(part)
-            if normalized:
-                words.append(normalized)
-        return words
+        return split_wake_words(wake_word)
@@ -0,0 +1,71 @@
+import json
+from typing import Any, Callable, Dict, Optional
+
+from app.core.metrics import METRICS
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+loads: Callable[[str | bytes], Any] = orjson.loads if orjson is not None else json.loads
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+
+class ResultDecoder:
+    def __init__(self) -> None:
+        self._partials: Dict[str, str] = {}
+
+    def partial(self, raw: str, key: str = "") -> Optional[str]:
+        if self._partials.get(key) == raw:
+            METRICS.count("stt.partial_unchanged")
+            return None
+        self._partials[key] = raw
+        METRICS.count("stt.partial_decoded")
+        return loads(raw).get("partial", "")
+
+    def result(self, raw: str, key: str = "") -> Dict[str, Any]:
+        self._partials.pop(key, None)
+        METRICS.count("stt.result_decoded")
+        return loads(raw)
+
+    def reset(self) -> None:
+        self._partials.clear()
+
+
+class EmitLimiter:
+    def __init__(self, interval_ms: int = 150) -> None:
+        self.interval = max(0, int(interval_ms)) / 1000.0
+        self._last = float("-inf")
+        self._sent: Optional[str] = None
+        self._pending: Optional[str] = None
+
+    def offer(self, value: str, now: float) -> Optional[str]:
+        if value == self._sent:
+            self._pending = None
+            METRICS.count("stt.partial_emit_skipped")
+            return None
+        if now - self._last >= self.interval:
+            return self._send(value, now)
+        self._pending = value
+        METRICS.count("stt.partial_emit_deferred")
+        return None
+
+    def flush(self, now: float) -> Optional[str]:
+        if self._pending is None or now - self._last < self.interval:
+            return None
+        return self._send(self._pending, now)
+
+    def due(self) -> Optional[float]:
+        return None if self._pending is None else self._last + self.interval
+
+    def reset(self) -> None:
+        self._sent = None
+        self._pending = None
+
+    def _send(self, value: str, now: float) -> str:
+        self._last = now
+        self._sent = value
+        self._pending = None
+        METRICS.count("stt.partial_emitted")
+        return value
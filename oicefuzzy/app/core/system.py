@@ -0,0 +1,316 @@
+import ctypes
+import os
+import subprocess
+import sys
+import threading
+import time
+import webbrowser
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, Iterable, List, Optional, Set, Tuple
+
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+
+VK_CONTROL = 0x11
+VK_SHIFT = 0x10
+VK_MENU = 0x12
+VK_RETURN = 0x0D
+VK_ESCAPE = 0x1B
+VK_TAB = 0x09
+VK_SNAPSHOT = 0x2C
+VK_F4 = 0x73
+VK_LWIN = 0x5B
+VK_D = 0x44
+VK_A = 0x41
+VK_C = 0x43
+VK_V = 0x56
+VK_X = 0x58
+VK_S = 0x53
+VK_Z = 0x5A
+
+VK_VOLUME_MUTE = 0xAD
+VK_VOLUME_DOWN = 0xAE
+VK_VOLUME_UP = 0xAF
+VK_MEDIA_NEXT_TRACK = 0xB0
+VK_MEDIA_PREV_TRACK = 0xB1
+VK_MEDIA_PLAY_PAUSE = 0xB3
+VK_BRIGHTNESS_DOWN = 0xD8
+VK_BRIGHTNESS_UP = 0xD9
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", ctypes.c_ushort),
+        ("wScan", ctypes.c_ushort),
+        ("dwFlags", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("dwExtraInfo", ctypes.c_void_p),
+    ]
+
+
+class _INPUT_UNION(ctypes.Union):
+    _fields_ = [("ki", KEYBDINPUT)]
+
+
+class INPUT(ctypes.Structure):
+    _anonymous_ = ("_input",)
+    _fields_ = [("type", ctypes.c_ulong), ("_input", _INPUT_UNION)]
+
+
+class SYSTEM_POWER_STATUS(ctypes.Structure):
+    _fields_ = [
+        ("ACLineStatus", ctypes.c_byte),
+        ("BatteryFlag", ctypes.c_byte),
+        ("BatteryLifePercent", ctypes.c_byte),
+        ("SystemStatusFlag", ctypes.c_byte),
+        ("BatteryLifeTime", ctypes.c_ulong),
+        ("BatteryFullLifeTime", ctypes.c_ulong),
+    ]
+
+
+class SystemUnavailable(RuntimeError):
+    pass
+
+
+class SystemBackend(ABC):
+    @abstractmethod
+    def press_key(self, vk: int, repeat: int = 1) -> None:
+        ...
+
+    @abstractmethod
+    def hotkey(self, *vks: int) -> None:
+        ...
+
+    @abstractmethod
+    def type_text(self, text: str) -> None:
+        ...
+
+    @abstractmethod
+    def delay(self, seconds: float) -> None:
+        ...
+
+    @abstractmethod
+    def open_url(self, url: str) -> bool:
+        ...
+
+    @abstractmethod
+    def path_exists(self, path: str) -> bool:
+        ...
+
+    @abstractmethod
+    def open_path(self, path: str) -> None:
+        ...
+
+    @abstractmethod
+    def shutdown(self) -> None:
+        ...
+
+    @abstractmethod
+    def restart(self) -> None:
+        ...
+
+    @abstractmethod
+    def suspend(self) -> None:
+        ...
+
+    @abstractmethod
+    def lock(self) -> None:
+        ...
+
+    @abstractmethod
+    def battery_percent(self) -> Optional[int]:
+        ...
+
+
+class WindowsSystemBackend(SystemBackend):
+    def __init__(self) -> None:
+        self._user32 = None
+        self._kernel32 = None
+        self._lock = threading.Lock()
+
+    @property
+    def user32(self):
+        if self._user32 is None:
+            with self._lock:
+                if self._user32 is None:
+                    user32 = ctypes.WinDLL("user32", use_last_error=True)
+                    user32.SendInput.argtypes = (ctypes.c_uint, ctypes.c_void_p, ctypes.c_int)
+                    user32.SendInput.restype = ctypes.c_uint
+                    self._user32 = user32
+        return self._user32
+
+    @property
+    def kernel32(self):
+        if self._kernel32 is None:
+            self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        return self._kernel32
+
+    def press_key(self, vk: int, repeat: int = 1) -> None:
+        user32 = self.user32
+        for _ in range(max(1, repeat)):
+            user32.keybd_event(vk, 0, 0, 0)
+            user32.keybd_event(vk, 0, KEYEVENTF_KEYUP, 0)
+
+    def hotkey(self, *vks: int) -> None:
+        user32 = self.user32
+        for vk in vks:
+            user32.keybd_event(vk, 0, 0, 0)
+        for vk in reversed(vks):
+            user32.keybd_event(vk, 0, KEYEVENTF_KEYUP, 0)
+
+    def type_text(self, text: str) -> None:
+        if not text:
+            return
+        user32 = self.user32
+        for char in text:
+            code = ord(char)
+            inputs = (INPUT * 2)(
+                INPUT(type=1, ki=KEYBDINPUT(0, code, KEYEVENTF_UNICODE, 0, None)),
+                INPUT(type=1, ki=KEYBDINPUT(0, code, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP, 0, None)),
+            )
+            user32.SendInput(2, ctypes.byref(inputs[0]), ctypes.sizeof(INPUT))
+
+    def delay(self, seconds: float) -> None:
+        time.sleep(max(0.0, seconds))
+
+    def open_url(self, url: str) -> bool:
+        return bool(webbrowser.open(url))
+
+    def path_exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def open_path(self, path: str) -> None:
+        os.startfile(path)
+
+    def shutdown(self) -> None:
+        subprocess.Popen(["shutdown", "/s", "/t", "0"], shell=False)
+
+    def restart(self) -> None:
+        subprocess.Popen(["shutdown", "/r", "/t", "0"], shell=False)
+
+    def suspend(self) -> None:
+        subprocess.Popen(["rundll32.exe", "powrprof.dll,SetSuspendState", "0,1,0"], shell=False)
+
+    def lock(self) -> None:
+        self.user32.LockWorkStation()
+
+    def battery_percent(self) -> Optional[int]:
+        status = SYSTEM_POWER_STATUS()
+        if not self.kernel32.GetSystemPowerStatus(ctypes.byref(status)):
+            return None
+        return int(status.BatteryLifePercent)
+
+
+class PortableSystemBackend(SystemBackend):
+    def press_key(self, vk: int, repeat: int = 1) -> None:
+        raise SystemUnavailable("press_key")
+
+    def hotkey(self, *vks: int) -> None:
+        raise SystemUnavailable("hotkey")
+
+    def type_text(self, text: str) -> None:
+        raise SystemUnavailable("type_text")
+
+    def delay(self, seconds: float) -> None:
+        time.sleep(max(0.0, seconds))
+
+    def open_url(self, url: str) -> bool:
+        return bool(webbrowser.open(url))
+
+    def path_exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def open_path(self, path: str) -> None:
+        opener = "open" if sys.platform == "darwin" else "xdg-open"
+        try:
+            subprocess.Popen([opener, path], shell=False)
+        except OSError as exc:
+            raise SystemUnavailable(f"open_path: {exc}") from exc
+
+    def shutdown(self) -> None:
+        raise SystemUnavailable("shutdown")
+
+    def restart(self) -> None:
+        raise SystemUnavailable("restart")
+
+    def suspend(self) -> None:
+        raise SystemUnavailable("suspend")
+
+    def lock(self) -> None:
+        raise SystemUnavailable("lock")
+
+    def battery_percent(self) -> Optional[int]:
+        return None
+
+
+class RecordingSystemBackend(SystemBackend):
+    def __init__(
+        self,
+        battery: Optional[int] = None,
+        existing_paths: Optional[Iterable[str]] = None,
+        browser_ok: bool = True,
+        max_calls: Optional[int] = 1000,
+    ) -> None:
+        self.battery = battery
+        self.existing_paths: Optional[Set[str]] = set(existing_paths) if existing_paths is not None else None
+        self.browser_ok = browser_ok
+        self.calls: Deque[Tuple[str, Tuple[Any, ...]]] = deque(maxlen=max_calls)
+        self._lock = threading.Lock()
+
+    def _record(self, name: str, *args: Any) -> None:
+        with self._lock:
+            self.calls.append((name, args))
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return [name for name, _ in self.calls]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    def press_key(self, vk: int, repeat: int = 1) -> None:
+        self._record("press_key", vk, repeat)
+
+    def hotkey(self, *vks: int) -> None:
+        self._record("hotkey", *vks)
+
+    def type_text(self, text: str) -> None:
+        self._record("type_text", text)
+
+    def delay(self, seconds: float) -> None:
+        self._record("delay", seconds)
+
+    def open_url(self, url: str) -> bool:
+        self._record("open_url", url)
+        return self.browser_ok
+
+    def path_exists(self, path: str) -> bool:
+        return self.existing_paths is None or path in self.existing_paths
+
+    def open_path(self, path: str) -> None:
+        self._record("open_path", path)
+
+    def shutdown(self) -> None:
+        self._record("shutdown")
+
+    def restart(self) -> None:
+        self._record("restart")
+
+    def suspend(self) -> None:
+        self._record("suspend")
+
+    def lock(self) -> None:
+        self._record("lock")
+
+    def battery_percent(self) -> Optional[int]:
+        self._record("battery_percent")
+        return self.battery
+
+
+def default_system_backend() -> SystemBackend:
+    if sys.platform == "win32":
+        return WindowsSystemBackend()
+    print(f"[system] no native backend for {sys.platform}: key, power and lock commands are unavailable")
+    return PortableSystemBackend()
@@ -6,7 +6,8 @@ from typing import Dict, List, Optional, Tuple
 
 from PySide6.QtCore import QObject, QTimer, Signal
 
-from app.core.utils import normalize_text, format_duration
+from app.core.numerals import replace_number_words
+from app.core.utils import format_duration, normalize_text
 
 
 @dataclass
@@ -145,7 +146,7 @@ def parse_timer_request(text: str) -> Tuple[int | None, str | None]:
     cleaned = _replace_number_words(cleaned)
     total_seconds = 0
     matches = re.findall(
-        r"(\d+(?:[\.,]\d+)?)\s*(\u0447\u0430\u0441(?:\u0430|\u043e\u0432)?|\u043c\u0438\u043d\u0443\u0442(?:\u0430|\u044b)?|\u0441\u0435\u043a\u0443\u043d\u0434(?:\u0430|\u044b)?)",
+        r"(\d+(?:[\.,]\d+)?)\s*(\u0447\u0430\u0441(?:\u0430|\u043e\u0432)?|\u043c\u0438\u043d\u0443\u0442(?:\u0430|\u0443|\u044b)?|\u0441\u0435\u043a\u0443\u043d\u0434(?:\u0430|\u0443|\u044b)?)",
         cleaned,
     )
     for value, unit in matches:
@@ -162,7 +163,7 @@ def parse_timer_request(text: str) -> Tuple[int | None, str | None]:
             total_seconds = int(float(fallback.group(0).replace(",", ".")) * 60)
     if total_seconds > 0 and not name:
         name_guess = re.sub(
-            r"\d+(?:[\.,]\d+)?\s*(\u0447\u0430\u0441(?:\u0430|\u043e\u0432)?|\u043c\u0438\u043d\u0443\u0442(?:\u0430|\u044b)?|\u0441\u0435\u043a\u0443\u043d\u0434(?:\u0430|\u044b)?)",
+            r"\d+(?:[\.,]\d+)?\s*(\u0447\u0430\u0441(?:\u0430|\u043e\u0432)?|\u043c\u0438\u043d\u0443\u0442(?:\u0430|\u0443|\u044b)?|\u0441\u0435\u043a\u0443\u043d\u0434(?:\u0430|\u0443|\u044b)?)",
             " ",
             cleaned,
         )
@@ -186,59 +187,4 @@ def _replace_number_words(text: str) -> str:
     text = re.sub(r"\b\u043f\u043e\u043b\u0447\u0430\u0441\u0430\b", "30 \u043c\u0438\u043d\u0443\u0442", text)
     text = re.sub(r"\b\u043f\u043e\u043b\u0442\u043e\u0440\u0430\s*\u0447\u0430\u0441\u0430?\b", "90 \u043c\u0438\u043d\u0443\u0442", text)
     text = re.sub(r"\b\u043f\u043e\u043b\u0442\u043e\u0440\u044b\s*\u0447\u0430\u0441\u0430?\b", "90 \u043c\u0438\u043d\u0443\u0442", text)
-    ones = {
-        "\u043d\u043e\u043b\u044c": 0,
-        "\u043e\u0434\u0438\u043d": 1,
-        "\u043e\u0434\u043d\u0430": 1,
-        "\u043e\u0434\u043d\u043e": 1,
-        "\u0434\u0432\u0430": 2,
-        "\u0434\u0432\u0435": 2,
-        "\u0442\u0440\u0438": 3,
-        "\u0447\u0435\u0442\u044b\u0440\u0435": 4,
-        "\u043f\u044f\u0442\u044c": 5,
-        "\u0448\u0435\u0441\u0442\u044c": 6,
-        "\u0441\u0435\u043c\u044c": 7,
-        "\u0432\u043e\u0441\u0435\u043c\u044c": 8,
-        "\u0434\u0435\u0432\u044f\u0442\u044c": 9,
-        "\u0434\u0435\u0441\u044f\u0442\u044c": 10,
-        "\u043e\u0434\u0438\u043d\u043d\u0430\u0434\u0446\u0430\u0442\u044c": 11,
-        "\u0434\u0432\u0435\u043d\u0430\u0434\u0446\u0430\u0442\u044c": 12,
-        "\u0442\u0440\u0438\u043d\u0430\u0434\u0446\u0430\u0442\u044c": 13,
-        "\u0447\u0435\u0442\u044b\u0440\u043d\u0430\u0434\u0446\u0430\u0442\u044c": 14,
-        "\u043f\u044f\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u044c": 15,
-        "\u0448\u0435\u0441\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u044c": 16,
-        "\u0441\u0435\u043c\u043d\u0430\u0434\u0446\u0430\u0442\u044c": 17,
-        "\u0432\u043e\u0441\u0435\u043c\u043d\u0430\u0434\u0446\u0430\u0442\u044c": 18,
-        "\u0434\u0435\u0432\u044f\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u044c": 19,
-    }
-    tens = {
-        "\u0434\u0432\u0430\u0434\u0446\u0430\u0442\u044c": 20,
-        "\u0442\u0440\u0438\u0434\u0446\u0430\u0442\u044c": 30,
-        "\u0441\u043e\u0440\u043e\u043a": 40,
-        "\u043f\u044f\u0442\u044c\u0434\u0435\u0441\u044f\u0442": 50,
-        "\u0448\u0435\u0441\u0442\u044c\u0434\u0435\u0441\u044f\u0442": 60,
-        "\u0441\u0435\u043c\u044c\u0434\u0435\u0441\u044f\u0442": 70,
-        "\u0432\u043e\u0441\u0435\u043c\u044c\u0434\u0435\u0441\u044f\u0442": 80,
-        "\u0434\u0435\u0432\u044f\u043d\u043e\u0441\u0442\u043e": 90,
-    }
-    tokens = text.split()
-    output = []
-    i = 0
-    while i < len(tokens):
-        token = tokens[i]
-        if token in tens:
-            value = tens[token]
-            consumed = 1
-            if i + 1 < len(tokens) and tokens[i + 1] in ones:
-                value += ones[tokens[i + 1]]
-                consumed = 2
-            output.append(str(value))
-            i += consumed
-            continue
-        if token in ones:
-            output.append(str(ones[token]))
-            i += 1
-            continue
-        output.append(token)
-        i += 1
-    return " ".join(output)
+    return replace_number_words(text, ordinals=False)
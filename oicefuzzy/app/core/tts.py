@@ -1,61 +1,395 @@
-import queue
+import heapq
 import threading
-from typing import Optional
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional, Set
 
-import pyttsx3
+from app.core.echo import EchoGate, clip_duration
+from app.core.metrics import METRICS
+from app.core.tts_cache import PhraseCache
+
+PRIORITY_ALERT = 0
+PRIORITY_REPLY = 1
+PRIORITY_INFO = 2
+
+
+@dataclass(order=True)
+class SpeechItem:
+    priority: int
+    seq: int
+    text: str = field(compare=False)
+    created: float = field(compare=False)
+    max_age: float = field(compare=False)
+    dropped: bool = field(default=False, compare=False)
+
+    def expired(self, now: float) -> bool:
+        return self.max_age > 0 and now - self.created > self.max_age
+
+
+class SpeechBackend(ABC):
+    can_play = False
+
+    def start(self) -> None:
+        pass
+
+    def apply(self, volume: float, rate: int) -> None:
+        pass
+
+    def voice(self) -> str:
+        return ""
+
+    @abstractmethod
+    def speak(self, text: str, cancel: threading.Event) -> bool:
+        ...
+
+    def play(self, path: Path, cancel: threading.Event) -> bool:
+        return False
+
+    def render(self, text: str, path: Path) -> bool:
+        return False
+
+    def stop(self) -> None:
+        pass
+
+
+class Pyttsx3Backend(SpeechBackend):
+    def __init__(self, poll_sec: float = 0.02) -> None:
+        self._poll_sec = poll_sec
+        self._engine = None
+        try:
+            import winsound
+        except ImportError:
+            winsound = None
+        self._winsound = winsound
+        self.can_play = winsound is not None
+
+    def start(self) -> None:
+        import pyttsx3
+
+        self._engine = pyttsx3.init()
+
+    def apply(self, volume: float, rate: int) -> None:
+        if not self._engine:
+            return
+        self._engine.setProperty("volume", volume)
+        self._engine.setProperty("rate", rate)
+
+    def voice(self) -> str:
+        if not self._engine:
+            return ""
+        try:
+            return str(self._engine.getProperty("voice") or "")
+        except Exception:
+            return ""
+
+    def speak(self, text: str, cancel: threading.Event) -> bool:
+        engine = self._engine
+        engine.say(text)
+        engine.startLoop(False)
+        try:
+            while engine.isBusy():
+                if cancel.is_set():
+                    engine.stop()
+                    return False
+                engine.iterate()
+                time.sleep(self._poll_sec)
+        finally:
+            engine.endLoop()
+        return True
+
+    def play(self, path: Path, cancel: threading.Event) -> bool:
+        if not self._winsound:
+            return False
+        duration = clip_duration(path)
+        if duration <= 0:
+            return False
+        self._winsound.PlaySound(str(path), self._winsound.SND_FILENAME | self._winsound.SND_ASYNC | self._winsound.SND_NODEFAULT)
+        if cancel.wait(duration):
+            self._winsound.PlaySound(None, 0)
+        return True
+
+    def render(self, text: str, path: Path) -> bool:
+        if not self._engine:
+            return False
+        self._engine.save_to_file(text, str(path))
+        self._engine.runAndWait()
+        return True
+
+    def stop(self) -> None:
+        if self._winsound:
+            try:
+                self._winsound.PlaySound(None, 0)
+            except Exception:
+                pass
+        if self._engine:
+            try:
+                self._engine.stop()
+            except Exception:
+                pass
+
+
+class FakeSpeechBackend(SpeechBackend):
+    def __init__(self, seconds_per_char: float = 0.0, can_play: bool = True) -> None:
+        self.seconds_per_char = seconds_per_char
+        self.can_play = can_play
+        self.spoken: List[str] = []
+        self.played: List[Path] = []
+        self.cancelled: List[str] = []
+        self.rendered: List[str] = []
+        self.settings = (1.0, 180)
+
+    def apply(self, volume: float, rate: int) -> None:
+        self.settings = (volume, rate)
+
+    def voice(self) -> str:
+        return "fake"
+
+    def speak(self, text: str, cancel: threading.Event) -> bool:
+        if cancel.wait(self.seconds_per_char * len(text)):
+            self.cancelled.append(text)
+            return False
+        self.spoken.append(text)
+        return True
+
+    def play(self, path: Path, cancel: threading.Event) -> bool:
+        if not self.can_play:
+            return False
+        self.played.append(path)
+        return True
+
+    def render(self, text: str, path: Path) -> bool:
+        path.write_bytes(b"RIFF" + b"\0" * 124)
+        self.rendered.append(text)
+        return True
 
 
 class TtsEngine:
-    def __init__(self, enabled: bool = True, volume: float = 1.0, rate: int = 180) -> None:
+    def __init__(
+        self,
+        enabled: bool = True,
+        volume: float = 1.0,
+        rate: int = 180,
+        cache: Optional[PhraseCache] = None,
+        learn_after: int = 2,
+        backend: Optional[SpeechBackend] = None,
+        max_age_sec: float = 20.0,
+        echo: Optional[EchoGate] = None,
+    ) -> None:
         self._enabled = enabled
         self._volume = volume
         self._rate = rate
-        self._queue: queue.Queue[str] = queue.Queue()
+        self._voice = ""
+        self._backend = backend or Pyttsx3Backend()
+        self._cache = cache
+        self._echo = echo
+        self._learn_after = max(0, int(learn_after))
+        self._max_age_sec = max(0.0, float(max_age_sec))
+        self._cond = threading.Condition()
+        self._heap: List[SpeechItem] = []
+        self._pending: Dict[str, SpeechItem] = {}
+        self._seq = 0
+        self._current: Optional[SpeechItem] = None
+        self._cancel = threading.Event()
+        self._render_lock = threading.Lock()
+        self._render_queue: Deque[str] = deque()
+        self._render_pending: Set[str] = set()
+        self._phrases: List[str] = []
+        self._seen: Dict[str, int] = {}
+        self._prune_due = False
+        self._settings_dirty = True
         self._thread = threading.Thread(target=self._run, daemon=True)
         self._running = True
-        self._engine: Optional[pyttsx3.Engine] = None
         self._thread.start()
 
-    def _run(self) -> None:
-        self._engine = pyttsx3.init()
-        self._apply_settings()
-        while self._running:
-            try:
-                text = self._queue.get(timeout=0.2)
-            except queue.Empty:
-                continue
-            if not text or not self._enabled:
-                continue
-            try:
-                self._engine.say(text)
-                self._engine.runAndWait()
-            except Exception:
-                continue
-
-    def _apply_settings(self) -> None:
-        if not self._engine:
-            return
-        self._engine.setProperty("volume", max(0.0, min(1.0, self._volume)))
-        self._engine.setProperty("rate", int(self._rate))
+    @property
+    def caching(self) -> bool:
+        return self._cache is not None and self._backend.can_play
 
     def update(self, enabled: bool | None = None, volume: float | None = None, rate: int | None = None) -> None:
         if enabled is not None:
             self._enabled = enabled
+            if not enabled:
+                self.interrupt(keep_alerts=False)
         if volume is not None:
             self._volume = volume
         if rate is not None:
             self._rate = rate
-        self._apply_settings()
+        with self._cond:
+            self._settings_dirty = True
+            self._cond.notify()
+        if volume is not None or rate is not None:
+            self.preload(self._phrases)
 
-    def speak(self, text: str) -> None:
-        if not text:
+    def preload(self, phrases: Iterable[str]) -> None:
+        self._phrases = [text.strip() for text in phrases if text and text.strip()]
+        if not self.caching:
             return
-        self._queue.put(text)
+        with self._render_lock:
+            for text in self._phrases:
+                self._enqueue_render(text)
+            self._prune_due = True
+        with self._cond:
+            self._cond.notify()
+
+    def speak(self, text: str, priority: int = PRIORITY_REPLY, max_age: float | None = None) -> None:
+        text = (text or "").strip()
+        if not text or not self._enabled:
+            return
+        now = time.monotonic()
+        with self._cond:
+            if self._current and self._current.text == text and not self._cancel.is_set():
+                return
+            existing = self._pending.get(text)
+            if existing and existing.priority <= priority:
+                existing.created = now
+                METRICS.count("tts.coalesced")
+                return
+            if existing:
+                existing.dropped = True
+            self._seq += 1
+            item = SpeechItem(priority, self._seq, text, now, self._max_age_sec if max_age is None else max_age)
+            self._pending[text] = item
+            heapq.heappush(self._heap, item)
+            self._cond.notify()
+
+    def interrupt(self, keep_alerts: bool = True) -> None:
+        with self._cond:
+            if self._current and not (keep_alerts and self._current.priority <= PRIORITY_ALERT):
+                self._cancel.set()
+            for item in self._heap:
+                if not (keep_alerts and item.priority <= PRIORITY_ALERT):
+                    item.dropped = True
+                    self._pending.pop(item.text, None)
+
+    def pending(self) -> List[str]:
+        with self._cond:
+            return [item.text for item in sorted(self._heap) if not item.dropped]
+
+    def is_speaking(self) -> bool:
+        return self._current is not None
 
     def stop(self) -> None:
         self._running = False
-        if self._engine:
+        with self._cond:
+            self._cancel.set()
+            self._cond.notify()
+        self._backend.stop()
+
+    def _run(self) -> None:
+        try:
+            self._backend.start()
+        except Exception as exc:
+            print(f"[TTS] backend start failed: {exc}")
+            self._running = False
+            return
+        while self._running:
+            item = self._next_item()
+            if item is None:
+                self._render_next()
+                continue
             try:
-                self._engine.stop()
+                self._say(item.text)
             except Exception:
-                pass
+                pass
+            finally:
+                with self._cond:
+                    self._current = None
+                    self._cancel.clear()
+
+    def _next_item(self) -> Optional[SpeechItem]:
+        with self._cond:
+            if self._settings_dirty:
+                self._apply_settings()
+            if not self._heap and not self._has_render_work():
+                self._cond.wait()
+            METRICS.count("tts.wakeup")
+            now = time.monotonic()
+            while self._heap:
+                item = heapq.heappop(self._heap)
+                if item.dropped:
+                    continue
+                self._pending.pop(item.text, None)
+                if item.expired(now) or not self._enabled:
+                    METRICS.count("tts.expired")
+                    continue
+                self._current = item
+                self._cancel.clear()
+                METRICS.observe("tts.queue_delay", now - item.created)
+                return item
+        return None
+
+    def _apply_settings(self) -> None:
+        self._settings_dirty = False
+        self._backend.apply(max(0.0, min(1.0, self._volume)), int(self._rate))
+        self._voice = self._backend.voice()
+
+    def _settings_key(self) -> tuple[str, int, float]:
+        return self._voice, int(self._rate), max(0.0, min(1.0, float(self._volume)))
+
+    def _say(self, text: str) -> None:
+        clip = self._cache.lookup(text, *self._settings_key()) if self.caching else None
+        if self._echo:
+            self._echo.begin(text, clip)
+        try:
+            if clip is not None:
+                with METRICS.span("tts.play"):
+                    played = self._backend.play(clip, self._cancel)
+                if played:
+                    METRICS.count("tts.cache_hit")
+                    return
+            METRICS.count("tts.cache_miss")
+            with METRICS.span("tts.speak"):
+                spoken = self._backend.speak(text, self._cancel)
+            if spoken:
+                self._learn(text)
+        finally:
+            if self._echo:
+                self._echo.end()
+
+    def _learn(self, text: str) -> None:
+        if not self.caching or not self._learn_after or len(text) > 200:
+            return
+        count = self._seen.get(text, 0) + 1
+        if len(self._seen) >= 256 and text not in self._seen:
+            self._seen.clear()
+        self._seen[text] = count
+        if count >= self._learn_after:
+            with self._render_lock:
+                self._enqueue_render(text)
+
+    def _enqueue_render(self, text: str) -> None:
+        if text not in self._render_pending:
+            self._render_pending.add(text)
+            self._render_queue.append(text)
+
+    def _has_render_work(self) -> bool:
+        return self.caching and (bool(self._render_queue) or self._prune_due)
+
+    def _render_next(self) -> None:
+        if not self.caching:
+            return
+        with self._render_lock:
+            if not self._render_queue:
+                if self._prune_due:
+                    self._prune_due = False
+                    keep = [self._cache.path_for(text, *self._settings_key()) for text in self._phrases]
+                    self._cache.prune(keep)
+                return
+            text = self._render_queue.popleft()
+            self._render_pending.discard(text)
+        final = self._cache.path_for(text, *self._settings_key())
+        if final.exists():
+            return
+        staged = self._cache.staging_path(final)
+        try:
+            with METRICS.span("tts.render"):
+                rendered = self._backend.render(text, staged)
+            if not rendered:
+                return
+        except Exception:
+            staged.unlink(missing_ok=True)
+            return
+        self._cache.commit(staged, final)
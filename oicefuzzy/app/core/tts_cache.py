@@ -0,0 +1,93 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+PHRASE_NOT_RECOGNIZED = "\u041a\u043e\u043c\u0430\u043d\u0434\u0430 \u043d\u0435 \u0440\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u0430"
+PHRASE_TIME_UP = "\u0412\u0440\u0435\u043c\u044f \u0432\u044b\u0448\u043b\u043e"
+FIXED_PHRASES = (PHRASE_NOT_RECOGNIZED, PHRASE_TIME_UP)
+
+_MIN_WAV_BYTES = 64
+
+
+def phrase_key(text: str, voice: str, rate: int, volume: float) -> str:
+    payload = "\x1f".join([text.strip(), voice or "", str(int(rate)), f"{float(volume):.2f}"])
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def static_phrases(commands: List[Dict[str, Any]], extra: Iterable[str] = FIXED_PHRASES) -> List[str]:
+    phrases: List[str] = []
+    candidates = list(extra)
+    for command in commands:
+        action = command.get("action") or {}
+        if action.get("type") != "say":
+            continue
+        candidates.append(action.get("tts") or action.get("text") or "")
+    for text in candidates:
+        text = (text or "").strip()
+        if text and "{" not in text and text not in phrases:
+            phrases.append(text)
+    return phrases
+
+
+class PhraseCache:
+    def __init__(self, cache_dir: Path | str, max_entries: int = 500) -> None:
+        self._dir = Path(cache_dir)
+        self._max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        return self._dir
+
+    def path_for(self, text: str, voice: str, rate: int, volume: float) -> Path:
+        key = phrase_key(text, voice, rate, volume)
+        return self._dir / key[:2] / f"{key}.wav"
+
+    def lookup(self, text: str, voice: str, rate: int, volume: float) -> Optional[Path]:
+        path = self.path_for(text, voice, rate, volume)
+        try:
+            if path.stat().st_size >= _MIN_WAV_BYTES:
+                return path
+        except OSError:
+            pass
+        return None
+
+    def staging_path(self, final: Path) -> Path:
+        final.parent.mkdir(parents=True, exist_ok=True)
+        return final.with_name(f"{final.stem}.{os.getpid()}.{threading.get_ident()}.tmp.wav")
+
+    def commit(self, staged: Path, final: Path) -> bool:
+        try:
+            if staged.stat().st_size < _MIN_WAV_BYTES:
+                staged.unlink(missing_ok=True)
+                return False
+            with self._lock:
+                os.replace(staged, final)
+            return True
+        except OSError:
+            return False
+
+    def prune(self, keep: Iterable[Path] = ()) -> int:
+        if not self._dir.exists():
+            return 0
+        keep_set = {Path(path) for path in keep}
+        files = []
+        for path in self._dir.glob("*/*.wav"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        files.sort(reverse=True)
+        removed = 0
+        with self._lock:
+            for index, (_, path) in enumerate(files):
+                if index < self._max_entries or path in keep_set:
+                    continue
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    continue
+        return removed
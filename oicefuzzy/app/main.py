@@ -1,41 +1,24 @@
 import sys
+import time
 from pathlib import Path
 
 from PySide6.QtCore import QUrl
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QApplication, QDialog
 
-from app.core.actions import ActionDispatcher
-from app.core.commands import CommandMatcher, CommandProcessor
 from app.core.config import ConfigStore
-from app.core.stt import SpeechListener
-from app.core.timer_manager import TimerManager
-from app.core.tts import TtsEngine
-from app.core.utils import app_root
+from app.core.metrics import METRICS
+from app.core.runtime import build_runtime, resolve_asset_path
+from app.core.utils import resident_memory_bytes
+from app.ui.diagnostics import DiagnosticsDialog
 from app.ui.main_window import MainWindow
 from app.ui.settings_dialog import SettingsDialog
 from app.ui.splash import SplashScreen
-from app.ui.styles import theme_styles
+from app.ui.theme import ThemeManager
 from app.ui.tray import TrayManager
 
 
-def resolve_model_path(config: ConfigStore) -> str:
-    model_path = config.get_setting("stt", "model_path", default="")
-    if not model_path:
-        return ""
-    return resolve_asset_path(model_path)
-
-
-def resolve_asset_path(value: str) -> str:
-    if not value:
-        return ""
-    path = Path(value)
-    if path.is_absolute():
-        return str(path)
-    return str(app_root() / value)
-
-
-def show_splash(app: QApplication, config: ConfigStore):
+def show_splash(app: QApplication, config: ConfigStore, themes: ThemeManager):
     if not config.get_setting("ui", "splash_enabled", default=False):
         return None, None
     icon_path = resolve_asset_path(config.get_setting("ui", "splash_icon", default=""))
@@ -43,6 +26,7 @@ def show_splash(app: QApplication, config: ConfigStore):
     duration_ms = int(config.get_setting("ui", "splash_duration_ms", default=3500))
 
     splash = SplashScreen(icon_path, duration_ms=duration_ms)
+    themes.attach(splash)
     splash.show()
     splash.start()
     app.processEvents()
@@ -73,12 +57,18 @@ def show_splash(app: QApplication, config: ConfigStore):
 
 
 def main() -> int:
+    if "--headless" in sys.argv[1:]:
+        from app.cli import main as headless_main
+
+        return headless_main([arg for arg in sys.argv[1:] if arg != "--headless"])
+    started = time.perf_counter()
+    startup_probe = "--startup-probe" in sys.argv[1:]
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
 
     config = ConfigStore()
-    theme = config.get_setting("ui", "theme", default="dark")
-    app.setStyleSheet(theme_styles(theme))
+    themes = ThemeManager()
+    themes.apply(config.get_setting("ui", "theme", default="dark"), app)
 
     icon_path = resolve_asset_path(
         config.get_setting("ui", "app_icon", default=config.get_setting("ui", "splash_icon", default=""))
@@ -87,45 +77,38 @@ def main() -> int:
     if not app_icon.isNull():
         app.setWindowIcon(app_icon)
 
-    splash, splash_player = show_splash(app, config)
-
-    tts = TtsEngine(
-        enabled=config.get_setting("tts", "enabled", default=True),
-        volume=float(config.get_setting("tts", "volume", default=0.9)),
-        rate=int(config.get_setting("tts", "rate", default=180)),
-    )
-    timer_manager = TimerManager()
-    dispatcher = ActionDispatcher(config.targets, config.allowlist, timer_manager)
-    matcher = CommandMatcher(config.commands)
-    processor = CommandProcessor(dispatcher, config.get_setting("stt", "wake_word", default=""))
+    splash, splash_player = show_splash(app, config, themes) if not startup_probe else (None, None)
+    runtime = build_runtime(config)
+    tts = runtime.tts
+    math = runtime.math
+    listener = runtime.listener
+    exporter = runtime.exporter
 
-    window = MainWindow(config, matcher, processor, timer_manager, tts)
+    window = MainWindow(config, runtime.matcher, runtime.processor, runtime.timer_manager, tts)
     if not app_icon.isNull():
         window.setWindowIcon(app_icon)
     tray = TrayManager(window, icon=app_icon if not app_icon.isNull() else None)
     window.set_notifier(tray.show_message)
+    window.set_theme(themes.current)
+    themes.theme_changed.connect(window.set_theme)
+    themes.attach(window)
+    themes.attach(tray.menu)
 
-    model_path = resolve_model_path(config)
-    listener = SpeechListener(
-        model_path=model_path,
-        wake_word=config.get_setting("stt", "wake_word", default=""),
-        sample_rate=int(config.get_setting("stt", "sample_rate", default=16000)),
-    )
-    listener.configure(
-        command_timeout_sec=int(config.get_setting("stt", "command_timeout_sec", default=8)),
-        silence_timeout_ms=int(config.get_setting("stt", "silence_timeout_ms", default=1200)),
-        device_index=config.get_setting("stt", "device_index", default=None),
-        debug_console=config.get_setting("stt", "debug_console", default=False),
-    )
     window.set_listener(listener)
+    window.set_routines(runtime.routines)
+    window.set_language_matchers(runtime.matchers)
+    problems = runtime.problems()
+    for problem in problems:
+        window.add_history(f"\u041e\u0448\u0438\u0431\u043a\u0430 \u043a\u043e\u043d\u0444\u0438\u0433\u0443\u0440\u0430\u0446\u0438\u0438: {problem}")
+    if problems and not startup_probe:
+        tray.show_message("\u0424\u0430\u0437\u0438", f"\u041e\u0448\u0438\u0431\u043e\u043a \u043a\u043e\u043d\u0444\u0438\u0433\u0443\u0440\u0430\u0446\u0438\u0438: {len(problems)}, \u0441\u043c. \u0438\u0441\u0442\u043e\u0440\u0438\u044e")
     window.listening_changed.connect(tray.update_state)
     window.direct_mode_changed.connect(tray.update_direct_mode)
 
     def open_settings() -> None:
-        dialog = SettingsDialog(config, listener, window)
+        dialog = SettingsDialog(config, listener, window, devices=runtime.devices)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             values = dialog.values()
-            was_listening = window.is_listening()
             config.set_setting("stt", "device_index", value=values["device_index"])
             config.set_setting("stt", "command_timeout_sec", value=values["command_timeout_sec"])
             config.set_setting("tts", "enabled", value=values["tts_enabled"])
@@ -133,21 +116,34 @@ def main() -> int:
             config.set_setting("tts", "rate", value=values["tts_rate"])
             config.set_setting("ui", "theme", value=values["theme"])
             config.set_setting("ui", "overlay_enabled", value=values["overlay_enabled"])
+            config.set_setting("math", "mode", value=values["math_mode"])
             config.save_settings()
             tts.update(values["tts_enabled"], values["tts_volume"], values["tts_rate"])
-            listener.configure(
+            math.mode = values["math_mode"]
+            listener.reconfigure(
                 command_timeout_sec=values["command_timeout_sec"],
                 silence_timeout_ms=int(config.get_setting("stt", "silence_timeout_ms", default=1200)),
                 device_index=values["device_index"],
                 debug_console=config.get_setting("stt", "debug_console", default=False),
+                wake_word=config.get_setting("stt", "wake_word", default=""),
             )
-            app.setStyleSheet(theme_styles(values["theme"]))
-            if was_listening:
-                listener.stop()
-                listener.start()
+            themes.apply(values["theme"], app)
+        dialog.deleteLater()
 
     window.settings_button_clicked(open_settings)
 
+    def open_diagnostics() -> None:
+        DiagnosticsDialog(METRICS, exporter, window).exec()
+
+    window.diagnostics_button_clicked(open_diagnostics)
+
+    if startup_probe:
+        window.show()
+        app.processEvents()
+        print(f"startup_sec={time.perf_counter() - started:.3f} rss_bytes={resident_memory_bytes()}", flush=True)
+        runtime.shutdown()
+        return 0
+
     def show_main() -> None:
         window.show()
         window.start_listening()
@@ -156,10 +152,7 @@ def main() -> int:
         splash.finished.connect(lambda: (splash.close(), show_main()))
     else:
         show_main()
-    def shutdown() -> None:
-        listener.stop()
-        tts.stop()
-    app.aboutToQuit.connect(shutdown)
+    app.aboutToQuit.connect(runtime.shutdown)
     return app.exec()
 
 
@@ -0,0 +1,111 @@
+from typing import Optional
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import (
+    QDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from app.core.metrics import JsonlExporter, Metrics
+
+_UNITLESS_SUFFIXES = (".rtf",)
+
+
+def format_metric(name: str, value: float) -> str:
+    if name.endswith(_UNITLESS_SUFFIXES):
+        return f"{value:.3f}"
+    if value >= 1.0:
+        return f"{value:.2f} \u0441"
+    return f"{value * 1000:.2f} \u043c\u0441"
+
+
+class DiagnosticsDialog(QDialog):
+    def __init__(self, metrics: Metrics, exporter: Optional[JsonlExporter] = None, parent=None) -> None:
+        super().__init__(parent)
+        self._metrics = metrics
+        self._exporter = exporter
+        self.setWindowTitle("\u0414\u0438\u0430\u0433\u043d\u043e\u0441\u0442\u0438\u043a\u0430")
+        self.setMinimumSize(720, 460)
+        self._build_ui()
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start()
+        self.refresh()
+
+    def _build_ui(self) -> None:
+        layout = QVBoxLayout(self)
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+
+        self.table = QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(["\u041c\u0435\u0442\u0440\u0438\u043a\u0430", "\u041a\u043e\u043b-\u0432\u043e", "\u0421\u0440\u0435\u0434\u043d\u0435\u0435", "p50", "p95", "\u041c\u0430\u043a\u0441"])
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        self.export_button = QPushButton("\u042d\u043a\u0441\u043f\u043e\u0440\u0442 \u0432 JSONL")
+        self.export_button.setEnabled(self._exporter is not None)
+        self.export_button.clicked.connect(self._export)
+        self.reset_button = QPushButton("\u0421\u0431\u0440\u043e\u0441")
+        self.reset_button.clicked.connect(self._reset)
+        close_button = QPushButton("\u0417\u0430\u043a\u0440\u044b\u0442\u044c")
+        close_button.clicked.connect(self.accept)
+        buttons.addWidget(self.export_button)
+        buttons.addWidget(self.reset_button)
+        buttons.addStretch(1)
+        buttons.addWidget(close_button)
+        layout.addLayout(buttons)
+
+    def refresh(self) -> None:
+        snapshot = self._metrics.snapshot()
+        histograms = snapshot["histograms"]
+        counters = snapshot["counters"]
+        self.table.setRowCount(len(histograms) + len(counters))
+        row = 0
+        for name, stats in histograms.items():
+            cells = [
+                name,
+                str(stats["count"]),
+                format_metric(name, stats["mean"]),
+                format_metric(name, stats["p50"]),
+                format_metric(name, stats["p95"]),
+                format_metric(name, stats["max"]),
+            ]
+            for column, value in enumerate(cells):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+            row += 1
+        for name, value in sorted(counters.items()):
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            self.table.setItem(row, 1, QTableWidgetItem(str(value)))
+            for column in range(2, 6):
+                self.table.setItem(row, column, QTableWidgetItem("\u2014"))
+            row += 1
+        state = "\u0432\u043a\u043b" if self._metrics.enabled else "\u0432\u044b\u043a\u043b"
+        self.summary.setText(f"\u0421\u0431\u043e\u0440 \u043c\u0435\u0442\u0440\u0438\u043a: {state}. \u0412\u0440\u0435\u043c\u044f \u0440\u0430\u0431\u043e\u0442\u044b: {snapshot['uptime_sec']:.0f} \u0441")
+
+    def _export(self) -> None:
+        if not self._exporter:
+            return
+        try:
+            path = self._exporter.write_now()
+        except OSError as exc:
+            self.summary.setText(f"\u041e\u0448\u0438\u0431\u043a\u0430 \u044d\u043a\u0441\u043f\u043e\u0440\u0442\u0430: {exc}")
+            return
+        self.summary.setText(f"\u0421\u043e\u0445\u0440\u0430\u043d\u0435\u043d\u043e: {path}")
+
+    def _reset(self) -> None:
+        self._metrics.reset()
+        self.refresh()
+
+    def done(self, result: int) -> None:
+        self._timer.stop()
+        super().done(result)
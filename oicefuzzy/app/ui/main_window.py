@@ -1,6 +1,6 @@
 import threading
 from datetime import datetime
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional
 
 from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QAction
@@ -23,13 +23,18 @@ from PySide6.QtWidgets import (
 from app.core.actions import ActionResult
 from app.core.commands import CommandMatcher, CommandProcessor
 from app.core.config import ConfigStore
+from app.core.languages import Hypothesis, Utterance
+from app.core.routines import RoutineEngine
 from app.core.stt import SpeechListener
 from app.core.timer_manager import TimerItem, TimerManager
-from app.core.tts import TtsEngine
+from app.core.tts import PRIORITY_ALERT, PRIORITY_INFO, TtsEngine
+from app.core.tts_cache import PHRASE_NOT_RECOGNIZED, PHRASE_TIME_UP
 from PySide6.QtGui import QPixmap
 
 from app.core.utils import format_duration
 from app.ui.overlay import OverlayWindow
+from app.ui.status_dot import StatusDot
+from app.ui.theme import Theme
 
 
 class MainWindow(QMainWindow):
@@ -48,13 +53,14 @@ class MainWindow(QMainWindow):
         self._config = config
         self._matcher = matcher
         self._processor = processor
+        self._matchers: Dict[str, CommandMatcher] = {}
         self._timer_manager = timer_manager
         self._tts = tts
         self._listener: Optional[SpeechListener] = None
         self._listening = False
         self._direct_mode = False
         self._notifier: Optional[Callable[[str, str], None]] = None
-        self._overlay = OverlayWindow()
+        self._overlay = OverlayWindow(painted=bool(config.get_setting("ui", "overlay_painted", default=True)))
         self._force_close = False
         self._close_notice_shown = False
         self._build_ui()
@@ -65,10 +71,27 @@ class MainWindow(QMainWindow):
         self._listener = listener
         listener.status_changed.connect(self._on_status)
         listener.partial_text.connect(self._on_partial)
-        listener.command_ready.connect(self._on_command)
+        listener.utterance_ready.connect(self._on_utterance)
         listener.error.connect(self._on_error)
         listener.wake_detected.connect(self._on_wake)
 
+    def set_routines(self, routines: RoutineEngine) -> None:
+        routines.step_finished.connect(self._on_routine_step)
+        routines.routine_finished.connect(self._on_routine_finished)
+
+    def _on_routine_step(self, routine_id: str, result: ActionResult) -> None:
+        self._handle_result(result)
+
+    def _on_routine_finished(self, routine_id: str, result: ActionResult) -> None:
+        state = "\u0432\u044b\u043f\u043e\u043b\u043d\u0435\u043d" if result.ok else "\u043f\u0440\u0435\u0440\u0432\u0430\u043d"
+        self._append_history(f"\u0421\u0446\u0435\u043d\u0430\u0440\u0438\u0439 {routine_id} {state}")
+
+    def set_theme(self, theme: Theme) -> None:
+        self.status_dot.set_colors(theme.status_colors)
+
+    def set_language_matchers(self, matchers: Dict[str, CommandMatcher]) -> None:
+        self._matchers = dict(matchers)
+
     def set_notifier(self, notifier: Callable[[str, str], None]) -> None:
         self._notifier = notifier
 
@@ -101,9 +124,7 @@ class MainWindow(QMainWindow):
         title.setObjectName("Title")
         status_layout.addWidget(title)
         status_layout.addStretch(1)
-        self.status_dot = QLabel()
-        self.status_dot.setObjectName("StatusDot")
-        self.status_dot.setProperty("status", "idle")
+        self.status_dot = StatusDot()
         self.status_text = QLabel("\u041e\u0436\u0438\u0434\u0430\u043d\u0438\u0435")
         self.status_text.setObjectName("StatusText")
         status_layout.addWidget(self.status_dot)
@@ -122,12 +143,14 @@ class MainWindow(QMainWindow):
         self.test_button = QPushButton("\u0422\u0435\u0441\u0442 \u043c\u0438\u043a\u0440\u043e\u0444\u043e\u043d\u0430")
         self.test_button.clicked.connect(self._test_microphone)
         self.settings_button = QPushButton("\u041d\u0430\u0441\u0442\u0440\u043e\u0439\u043a\u0438")
+        self.diagnostics_button = QPushButton("\u0414\u0438\u0430\u0433\u043d\u043e\u0441\u0442\u0438\u043a\u0430")
         self.exit_button = QPushButton("\u0412\u044b\u0445\u043e\u0434")
         self.exit_button.clicked.connect(self.request_exit)
         controls.addWidget(self.listen_button)
         controls.addWidget(self.direct_button)
         controls.addWidget(self.test_button)
         controls.addWidget(self.settings_button)
+        controls.addWidget(self.diagnostics_button)
         controls.addWidget(self.exit_button)
         controls.addStretch(1)
         left_panel.addWidget(control_card)
@@ -271,9 +294,7 @@ class MainWindow(QMainWindow):
             "executing": "\u0412\u044b\u043f\u043e\u043b\u043d\u044f\u044e",
         }
         self.status_text.setText(labels.get(status, status))
-        self.status_dot.setProperty("status", status)
-        self.status_dot.style().unpolish(self.status_dot)
-        self.status_dot.style().polish(self.status_dot)
+        self.status_dot.set_status(status)
 
     def _on_partial(self, text: str) -> None:
         if self._config.get_setting("ui", "overlay_enabled", default=False):
@@ -281,6 +302,7 @@ class MainWindow(QMainWindow):
             self._overlay.show_text(text, opacity)
 
     def _on_wake(self) -> None:
+        self._tts.interrupt()
         try:
             import winsound
 
@@ -289,16 +311,24 @@ class MainWindow(QMainWindow):
             pass
         self._append_history("\u0410\u043a\u0442\u0438\u0432\u0430\u0446\u0438\u044f: \u0424\u0430\u0437\u0438")
 
-    def _on_command(self, text: str) -> None:
+    def _on_utterance(self, utterance: Utterance) -> None:
+        result = self._on_command(utterance.text, utterance.language, utterance.alternatives)
+        if self._listener and (result is None or not result.routed):
+            self._listener.dump_utterance(utterance, "unrecognized")
+        elif self._listener and not result.ok:
+            self._listener.dump_utterance(utterance, "failed", result.log)
+
+    def _on_command(self, text: str, language: str = "", alternatives: Optional[List[Hypothesis]] = None) -> Optional[ActionResult]:
         if not text:
             self._append_history("\u041a\u043e\u043c\u0430\u043d\u0434\u0430 \u043d\u0435 \u0440\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u0430")
-            self._tts.speak("\u041a\u043e\u043c\u0430\u043d\u0434\u0430 \u043d\u0435 \u0440\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u0430")
-            return
+            self._tts.speak(PHRASE_NOT_RECOGNIZED, PRIORITY_INFO, max_age=5.0)
+            return None
         self._append_history(f"\u0420\u0430\u0441\u043f\u043e\u0437\u043d\u0430\u043d\u043e: {text}")
         self._on_status("executing")
-        result = self._processor.handle(text, self._matcher)
+        result = self._processor.handle(text, self._matchers.get(language, self._matcher), alternatives)
         self._handle_result(result)
         self._on_status("listening" if self._listening else "idle")
+        return result
 
     def _handle_result(self, result: ActionResult) -> None:
         self._append_history(result.log)
@@ -346,7 +376,7 @@ class MainWindow(QMainWindow):
             winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
         except Exception:
             pass
-        self._tts.speak("\u0412\u0440\u0435\u043c\u044f \u0432\u044b\u0448\u043b\u043e")
+        self._tts.speak(PHRASE_TIME_UP, PRIORITY_ALERT)
         if self._notifier:
             self._notifier("\u0424\u0430\u0437\u0438", message)
 
@@ -383,4 +413,7 @@ class MainWindow(QMainWindow):
         action.triggered.connect(self.settings_button.click)
 
     def settings_button_clicked(self, handler) -> None:
-        self.settings_button.clicked.connect(handler)
+        self.settings_button.clicked.connect(handler)
+
+    def diagnostics_button_clicked(self, handler) -> None:
+        self.diagnostics_button.clicked.connect(handler)
@@ -1,37 +1,140 @@
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtWidgets import QLabel, QWidget, QVBoxLayout
+from typing import Optional
+
+from PySide6.QtCore import QRect, QSize, Qt, QTimer
+from PySide6.QtGui import QColor, QFontMetrics, QGuiApplication, QPainter, QScreen
+from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+from app.core.metrics import METRICS
+
+PADDING_X = 12
+PADDING_Y = 8
+MAX_WIDTH = 640
 
 
 class OverlayWindow(QWidget):
-    def __init__(self) -> None:
+    def __init__(self, painted: bool = True, bucket_px: int = 96) -> None:
         super().__init__()
         self.setWindowFlags(
             Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.WindowDoesNotAcceptFocus
         )
         self.setAttribute(Qt.WA_TranslucentBackground, True)
-        self._label = QLabel("")
-        self._label.setStyleSheet(
-            "QLabel { background: rgba(10, 10, 10, 180); color: white; padding: 8px 12px; border-radius: 8px; }"
-        )
-        layout = QVBoxLayout()
-        layout.addWidget(self._label)
-        layout.setContentsMargins(0, 0, 0, 0)
-        self.setLayout(layout)
+        self._bucket = max(1, int(bucket_px))
+        self._text = ""
+        self._display = ""
+        self._opacity = -1.0
+        self._pending: Optional[tuple[str, float]] = None
+        self._available: Optional[QRect] = None
+        self._watched: set[int] = set()
+        self._handle_watched = False
+        self._label: Optional[QLabel] = None
+        if not painted:
+            self._label = QLabel("")
+            self._label.setStyleSheet(
+                "QLabel { background: rgba(10, 10, 10, 180); color: white; "
+                f"padding: {PADDING_Y}px {PADDING_X}px; border-radius: 8px; }}"
+            )
+            layout = QVBoxLayout()
+            layout.addWidget(self._label)
+            layout.setContentsMargins(0, 0, 0, 0)
+            self.setLayout(layout)
+        self._metrics = QFontMetrics(self._label.font() if self._label else self.font())
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(16)
+        self._flush_timer.timeout.connect(self._flush)
         self._hide_timer = QTimer(self)
         self._hide_timer.setInterval(2500)
         self._hide_timer.setSingleShot(True)
         self._hide_timer.timeout.connect(self.hide)
 
+    @property
+    def painted(self) -> bool:
+        return self._label is None
+
     def show_text(self, text: str, opacity: float = 0.9) -> None:
         if not text:
             return
-        self.setWindowOpacity(opacity)
-        self._label.setText(text)
-        self.adjustSize()
-        self._move_to_corner()
-        self.show()
-        self._hide_timer.start()
-
-    def _move_to_corner(self) -> None:
-        screen = self.screen().availableGeometry()
-        self.move(screen.right() - self.width() - 20, screen.top() + 40)
+        METRICS.count("overlay.update")
+        self._pending = (text, opacity)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self) -> None:
+        if self._pending is None:
+            return
+        text, opacity = self._pending
+        self._pending = None
+        with METRICS.span("overlay.flush"):
+            if opacity != self._opacity:
+                self._opacity = opacity
+                self.setWindowOpacity(opacity)
+            if text != self._text:
+                self._text = text
+                self._display = self._metrics.elidedText(text, Qt.ElideLeft, MAX_WIDTH - 2 * PADDING_X)
+                size = self._size_for(self._display)
+                if size.height() != self.height() or not 0 <= self.width() - size.width() <= self._bucket:
+                    METRICS.count("overlay.resize")
+                    self.resize(size)
+                    self._place()
+                if self._label is not None:
+                    self._label.setText(self._display)
+                else:
+                    self.update()
+            if not self.isVisible():
+                self._place()
+                self.show()
+                self._watch_handle()
+            self._hide_timer.start()
+
+    def _size_for(self, text: str) -> QSize:
+        width = self._metrics.horizontalAdvance(text) + 2 * PADDING_X
+        width = min(MAX_WIDTH, -(-width // self._bucket) * self._bucket)
+        return QSize(width, self._metrics.height() + 2 * PADDING_Y)
+
+    def paintEvent(self, event) -> None:
+        if self._label is not None:
+            super().paintEvent(event)
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(10, 10, 10, 180))
+        painter.drawRoundedRect(self.rect(), 8, 8)
+        painter.setPen(QColor("white"))
+        painter.setFont(self.font())
+        painter.drawText(
+            self.rect().adjusted(PADDING_X, PADDING_Y, -PADDING_X, -PADDING_Y),
+            Qt.AlignLeft | Qt.AlignVCenter,
+            self._display,
+        )
+        painter.end()
+
+    def _place(self) -> None:
+        if self._available is None:
+            screen = self.screen() or QGuiApplication.primaryScreen()
+            if screen is None:
+                return
+            self._watch_screen(screen)
+            self._available = screen.availableGeometry()
+            rate = screen.refreshRate()
+            self._flush_timer.setInterval(max(1, int(1000 / rate)) if rate > 0 else 16)
+        self.move(self._available.right() - self.width() - 20, self._available.top() + 40)
+
+    def _watch_screen(self, screen: QScreen) -> None:
+        if id(screen) in self._watched:
+            return
+        self._watched.add(id(screen))
+        screen.availableGeometryChanged.connect(self._invalidate_geometry)
+        screen.refreshRateChanged.connect(self._invalidate_geometry)
+
+    def _watch_handle(self) -> None:
+        handle = self.windowHandle()
+        if handle is None or self._handle_watched:
+            return
+        self._handle_watched = True
+        handle.screenChanged.connect(self._invalidate_geometry)
+
+    def _invalidate_geometry(self, *args) -> None:
+        self._available = None
+        if self.isVisible():
+            self._place()
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QCheckBox,
@@ -14,32 +16,44 @@ from PySide6.QtWidgets import (
 )
 
 from app.core.config import ConfigStore
+from app.core.devices import DeviceManager, InputDevice
 from app.core.stt import SpeechListener
 
 
 class SettingsDialog(QDialog):
-    def __init__(self, config: ConfigStore, listener: SpeechListener, parent=None) -> None:
+    def __init__(
+        self, config: ConfigStore, listener: SpeechListener, parent=None, devices: Optional[DeviceManager] = None
+    ) -> None:
         super().__init__(parent)
         self._config = config
         self._listener = listener
+        self._devices = devices
         self.setWindowTitle("\u041d\u0430\u0441\u0442\u0440\u043e\u0439\u043a\u0438")
         self.setModal(True)
         self._build_ui()
 
+    def done(self, result: int) -> None:
+        if self._devices is not None:
+            try:
+                self._devices.devices_changed.disconnect(self._fill_devices)
+            except (RuntimeError, TypeError):
+                pass
+        super().done(result)
+
     def _build_ui(self) -> None:
         layout = QVBoxLayout(self)
         form = QFormLayout()
 
         self.mic_combo = QComboBox()
-        self.mic_combo.addItem("\u041f\u043e \u0443\u043c\u043e\u043b\u0447\u0430\u043d\u0438\u044e", userData=None)
-        for device in SpeechListener.list_input_devices():
-            self.mic_combo.addItem(device["name"], userData=device["index"])
-
-        device_index = self._config.get_setting("stt", "device_index", default=None)
-        for idx in range(self.mic_combo.count()):
-            if self.mic_combo.itemData(idx) == device_index:
-                self.mic_combo.setCurrentIndex(idx)
-                break
+        if self._devices is None:
+            self._fill_devices(
+                [InputDevice(device["index"], device["name"]) for device in SpeechListener.list_input_devices()]
+            )
+        else:
+            self._fill_devices(self._devices.devices())
+            self._devices.devices_changed.connect(self._fill_devices)
+            if not self._devices.is_ready():
+                self._devices.refresh()
 
         self.tts_enabled = QCheckBox()
         self.tts_enabled.setChecked(self._config.get_setting("tts", "enabled", default=True))
@@ -66,6 +80,16 @@ class SettingsDialog(QDialog):
                 self.theme_combo.setCurrentIndex(idx)
                 break
 
+        self.math_mode = QComboBox()
+        self.math_mode.addItem("Float", userData="float")
+        self.math_mode.addItem("Decimal", userData="decimal")
+        self.math_mode.addItem("Fraction", userData="fraction")
+        current_mode = self._config.get_setting("math", "mode", default="float")
+        for idx in range(self.math_mode.count()):
+            if self.math_mode.itemData(idx) == current_mode:
+                self.math_mode.setCurrentIndex(idx)
+                break
+
         self.overlay_enabled = QCheckBox()
         self.overlay_enabled.setChecked(self._config.get_setting("ui", "overlay_enabled", default=False))
 
@@ -83,6 +107,7 @@ class SettingsDialog(QDialog):
         form.addRow("TTS \u0441\u043a\u043e\u0440\u043e\u0441\u0442\u044c", self.tts_rate)
         form.addRow("\u0422\u0430\u0439\u043c\u0430\u0443\u0442 \u043a\u043e\u043c\u0430\u043d\u0434\u044b (\u0441)", self.command_timeout)
         form.addRow("\u0422\u0435\u043c\u0430", self.theme_combo)
+        form.addRow("\u0420\u0435\u0436\u0438\u043c \u0432\u044b\u0447\u0438\u0441\u043b\u0435\u043d\u0438\u0439", self.math_mode)
         form.addRow("\u041e\u0432\u0435\u0440\u043b\u0435\u0439 \u0442\u0435\u043a\u0441\u0442\u0430", self.overlay_enabled)
         form.addRow("\u041f\u0430\u043f\u043a\u0430 \u043a\u043e\u043d\u0444\u0438\u0433\u043e\u0432", config_row)
 
@@ -99,6 +124,21 @@ class SettingsDialog(QDialog):
         path = expand_path(self._config.config_dir_path())
         os.startfile(path)
 
+    def _fill_devices(self, devices: List[InputDevice]) -> None:
+        selected = self.mic_combo.currentData() if self.mic_combo.count() else self._config.get_setting(
+            "stt", "device_index", default=None
+        )
+        self.mic_combo.blockSignals(True)
+        self.mic_combo.clear()
+        self.mic_combo.addItem("\u041f\u043e \u0443\u043c\u043e\u043b\u0447\u0430\u043d\u0438\u044e", userData=None)
+        for device in devices:
+            self.mic_combo.addItem(device.name, userData=device.index)
+        for idx in range(self.mic_combo.count()):
+            if self.mic_combo.itemData(idx) == selected:
+                self.mic_combo.setCurrentIndex(idx)
+                break
+        self.mic_combo.blockSignals(False)
+
     def values(self) -> dict:
         return {
             "device_index": self.mic_combo.currentData(),
@@ -108,4 +148,5 @@ class SettingsDialog(QDialog):
             "command_timeout_sec": int(self.command_timeout.value()),
             "theme": self.theme_combo.currentData(),
             "overlay_enabled": self.overlay_enabled.isChecked(),
+            "math_mode": self.math_mode.currentData(),
         }
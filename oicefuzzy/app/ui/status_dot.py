@@ -0,0 +1,35 @@
+from typing import Dict, Optional
+
+from PySide6.QtCore import QRectF, Qt
+from PySide6.QtGui import QColor, QPainter, QPen
+from PySide6.QtWidgets import QWidget
+
+
+class StatusDot(QWidget):
+    def __init__(self, colors: Optional[Dict[str, QColor]] = None, size: int = 12, parent=None) -> None:
+        super().__init__(parent)
+        self.setObjectName("StatusDot")
+        self.setFixedSize(size, size)
+        self._colors = dict(colors or {})
+        self._status = "idle"
+
+    def status(self) -> str:
+        return self._status
+
+    def set_status(self, status: str) -> None:
+        if status == self._status:
+            return
+        self._status = status
+        self.update()
+
+    def set_colors(self, colors: Dict[str, QColor]) -> None:
+        self._colors = dict(colors)
+        self.update()
+
+    def paintEvent(self, event) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(self._colors.get("border", QColor(0, 0, 0, 0)), 1))
+        painter.setBrush(self._colors.get(self._status, self._colors.get("idle", QColor(Qt.gray))))
+        painter.drawEllipse(QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -0.5))
+        painter.end()
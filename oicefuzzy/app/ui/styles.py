@@ -31,20 +31,6 @@ QLabel#StatusText {
     color: #A7B6D8;
 }
 
-QLabel#StatusDot {
-    background: #64748B;
-    border-radius: 6px;
-    min-width: 12px;
-    min-height: 12px;
-    max-width: 12px;
-    max-height: 12px;
-    border: 1px solid rgba(255, 255, 255, 0.2);
-}
-
-QLabel#StatusDot[status="listening"] { background: #2DD4BF; }
-QLabel#StatusDot[status="executing"] { background: #F97316; }
-QLabel#StatusDot[status="idle"] { background: #64748B; }
-
 QPushButton {
     background: rgba(30, 41, 59, 0.9);
     border: 1px solid rgba(148, 163, 184, 0.24);
@@ -142,20 +128,6 @@ QLabel#StatusText {
     color: #475569;
 }
 
-QLabel#StatusDot {
-    background: #94A3B8;
-    border-radius: 6px;
-    min-width: 12px;
-    min-height: 12px;
-    max-width: 12px;
-    max-height: 12px;
-    border: 1px solid rgba(15, 23, 42, 0.2);
-}
-
-QLabel#StatusDot[status="listening"] { background: #0F766E; }
-QLabel#StatusDot[status="executing"] { background: #EA580C; }
-QLabel#StatusDot[status="idle"] { background: #94A3B8; }
-
 QPushButton {
     background: rgba(241, 245, 249, 0.95);
     border: 1px solid rgba(15, 23, 42, 0.12);
@@ -0,0 +1,103 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QColor, QPalette
+from PySide6.QtWidgets import QApplication, QWidget
+
+from app.core.metrics import METRICS
+from app.ui.styles import theme_styles
+
+THEME_NAMES = ("dark", "light")
+
+_PALETTES = {
+    "dark": {
+        QPalette.Window: "#111827",
+        QPalette.WindowText: "#E6EDF7",
+        QPalette.Base: "#0F172A",
+        QPalette.AlternateBase: "#1E293B",
+        QPalette.Text: "#E6EDF7",
+        QPalette.Button: "#1E293B",
+        QPalette.ButtonText: "#E6EDF7",
+        QPalette.ToolTipBase: "#1E293B",
+        QPalette.ToolTipText: "#E6EDF7",
+        QPalette.Highlight: "#38BDF8",
+        QPalette.HighlightedText: "#0B1220",
+        QPalette.PlaceholderText: "#94A3B8",
+    },
+    "light": {
+        QPalette.Window: "#EEF2F7",
+        QPalette.WindowText: "#0F172A",
+        QPalette.Base: "#FFFFFF",
+        QPalette.AlternateBase: "#F1F5F9",
+        QPalette.Text: "#0F172A",
+        QPalette.Button: "#F1F5F9",
+        QPalette.ButtonText: "#0F172A",
+        QPalette.ToolTipBase: "#FFFFFF",
+        QPalette.ToolTipText: "#0F172A",
+        QPalette.Highlight: "#0EA5E9",
+        QPalette.HighlightedText: "#F8FAFC",
+        QPalette.PlaceholderText: "#64748B",
+    },
+}
+
+_STATUS_COLORS = {
+    "dark": {"idle": "#64748B", "listening": "#2DD4BF", "executing": "#F97316", "border": "#33FFFFFF"},
+    "light": {"idle": "#94A3B8", "listening": "#0F766E", "executing": "#EA580C", "border": "#330F172A"},
+}
+
+
+@dataclass(frozen=True)
+class Theme:
+    name: str
+    stylesheet: str
+    palette: QPalette
+    status_colors: Dict[str, QColor]
+
+
+def build_theme(name: str) -> Theme:
+    palette = QPalette()
+    for role, color in _PALETTES[name].items():
+        palette.setColor(role, QColor(color))
+    colors = {status: QColor(color) for status, color in _STATUS_COLORS[name].items()}
+    return Theme(name, theme_styles(name), palette, colors)
+
+
+class ThemeManager(QObject):
+    theme_changed = Signal(object)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._themes = {name: build_theme(name) for name in THEME_NAMES}
+        self._current: Optional[Theme] = None
+        self._scopes: List[QWidget] = []
+
+    @property
+    def current(self) -> Theme:
+        return self._current or self._themes["dark"]
+
+    def theme(self, name: str) -> Theme:
+        return self._themes.get(name, self._themes["dark"])
+
+    def attach(self, widget: QWidget) -> None:
+        self._scopes.append(widget)
+        widget.setStyleSheet(self.current.stylesheet)
+
+    def apply(self, name: str, app: QApplication) -> bool:
+        theme = self.theme(name)
+        if theme is self._current:
+            METRICS.count("ui.theme_unchanged")
+            return False
+        with METRICS.span("ui.theme_switch"):
+            app.setPalette(theme.palette)
+            self._current = theme
+            scopes = []
+            for widget in self._scopes:
+                try:
+                    widget.setStyleSheet(theme.stylesheet)
+                except RuntimeError:
+                    continue
+                scopes.append(widget)
+            self._scopes = scopes
+        self.theme_changed.emit(theme)
+        return True
@@ -36,6 +36,10 @@ class TrayManager(QObject):
         self._tray.activated.connect(self._on_activate)
         self._tray.show()
 
+    @property
+    def menu(self) -> QMenu:
+        return self._menu
+
     def _toggle_listening(self) -> None:
         self._window.toggle_listening()
         self.update_state(self._window.is_listening())
@@ -0,0 +1,92 @@
+import argparse
+import math
+import queue
+import random
+import time
+import tracemalloc
+from array import array
+
+from PySide6.QtCore import QCoreApplication
+
+from app.core.metrics import METRICS
+from app.core.stt import BLOCK_FRAMES, SpeechListener
+from bench.fakes import NullRecognizer
+
+
+def make_blocks(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    blocks = []
+    for index in range(count):
+        amplitude = rng.choice([200, 900, 4000])
+        samples = array("h", (int(amplitude * math.sin(position * (0.03 + index * 0.01))) for position in range(BLOCK_FRAMES)))
+        blocks.append(memoryview(bytearray(samples.tobytes())))
+    return blocks
+
+
+def legacy_step(audio: queue.Queue, recognizer: NullRecognizer, indata: bytes) -> None:
+    audio.put((time.monotonic(), bytes(indata)))
+    captured, data = audio.get_nowait()
+    total = 0
+    for i in range(0, len(data), 2):
+        sample = int.from_bytes(data[i : i + 2], byteorder="little", signed=True)
+        total += sample * sample
+    recognizer.AcceptWaveform(data)
+
+
+def pooled_step(listener: SpeechListener, indata: bytes) -> None:
+    listener._capture(indata)
+    listener._consume(listener._audio_queue.get_nowait())
+
+
+def run(label: str, step, blocks: list, total_blocks: int, report_every: int) -> None:
+    tracemalloc.start()
+    step(blocks[0])
+    METRICS.collect()
+    baseline = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    samples = []
+    worst = 0
+    for index in range(total_blocks):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        step(blocks[index % len(blocks)])
+        worst = max(worst, tracemalloc.get_traced_memory()[1] - before)
+        if (index + 1) % report_every == 0:
+            METRICS.collect()
+            samples.append(tracemalloc.get_traced_memory()[0] - baseline)
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+    retained = " ".join(f"{value / 1024:+.1f}" for value in samples)
+    print(f"{label}: {elapsed / total_blocks * 1e6:7.1f} us/block, per-block peak {worst / 1024:6.1f} KiB")
+    print(f"  retained KiB every 10 min: {retained}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Allocation profile of the capture -> VAD -> recognizer path")
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--rate", type=int, default=16000)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--legacy", action="store_true", help="also run the old bytes-copy path for comparison")
+    args = parser.parse_args()
+    app = QCoreApplication([])
+    blocks = make_blocks(16, args.seed)
+    per_minute = max(1, 60 * args.rate // BLOCK_FRAMES)
+    total_blocks = per_minute * args.minutes
+    print(f"replaying {args.minutes} min of audio ({total_blocks} blocks of {BLOCK_FRAMES} frames)")
+
+    listener = SpeechListener("", "", args.rate)
+    listener._recognizer = NullRecognizer()
+    listener._recognizers = {"ru": listener._recognizer}
+    run("pooled", lambda data: pooled_step(listener, data), blocks, total_blocks, per_minute * 10)
+    print(f"  pool: {listener._buffers.capacity} slabs, {listener._buffers.dropped} dropped")
+
+    if args.legacy:
+        audio: queue.Queue = queue.Queue()
+        recognizer = NullRecognizer()
+        run("legacy", lambda data: legacy_step(audio, recognizer, data), blocks, total_blocks, per_minute * 10)
+    app.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,70 @@
+import argparse
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from app.core.batch import BatchItem, run_batch
+from app.core.config import ConfigStore
+
+_VERBS = ["\u043e\u0442\u043a\u0440\u043e\u0439", "\u0437\u0430\u043a\u0440\u043e\u0439", "\u0437\u0430\u043f\u0443\u0441\u0442\u0438", "\u043f\u043e\u043a\u0430\u0436\u0438", "\u043d\u0430\u0439\u0434\u0438", "\u0432\u043a\u043b\u044e\u0447\u0438", "\u0432\u044b\u043a\u043b\u044e\u0447\u0438", "\u0441\u043e\u0445\u0440\u0430\u043d\u0438"]
+_NOUNS = ["\u043f\u0440\u043e\u0435\u043a\u0442", "\u043e\u0442\u0447\u0435\u0442", "\u043f\u043b\u0435\u0439\u043b\u0438\u0441\u0442", "\u043f\u0430\u043f\u043a\u0443", "\u0437\u0430\u043c\u0435\u0442\u043a\u0443", "\u043e\u043a\u043d\u043e", "\u0432\u043a\u043b\u0430\u0434\u043a\u0443", "\u0434\u043e\u043a\u0443\u043c\u0435\u043d\u0442"]
+
+
+def synthetic_pack(size: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    commands = []
+    for index in range(size):
+        verb = rng.choice(_VERBS)
+        noun = rng.choice(_NOUNS)
+        patterns = [f"{verb} {noun} \u043d\u043e\u043c\u0435\u0440 {index}", f"{verb} {noun} {index} {{param}}"]
+        commands.append({"id": f"synthetic_{index}", "patterns": patterns, "action": {"type": "say", "text": str(index)}})
+    return commands
+
+
+def synthetic_corpus(commands: List[Dict[str, Any]], size: int, seed: int) -> List[BatchItem]:
+    rng = random.Random(seed + 1)
+    items = []
+    for line in range(1, size + 1):
+        command = rng.choice(commands)
+        roll = rng.random()
+        if roll < 0.6:
+            text = command["patterns"][0]
+        elif roll < 0.9:
+            text = command["patterns"][1].replace("{param}", "\u043f\u043e\u0431\u044b\u0441\u0442\u0440\u0435\u0435")
+        else:
+            text = "\u043d\u0435\u043f\u043e\u043d\u044f\u0442\u043d\u0430\u044f \u0444\u0440\u0430\u0437\u0430 " + str(line)
+        items.append(BatchItem(line, text))
+    return items
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Batch command matching throughput on a large synthetic command pack")
+    parser.add_argument("--commands", type=int, default=2000)
+    parser.add_argument("--utterances", type=int, default=4000)
+    parser.add_argument("--workers", type=int, default=max(2, min(8, os.cpu_count() or 2)))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    commands = ConfigStore().commands + synthetic_pack(args.commands, args.seed)
+    items = synthetic_corpus(commands[-args.commands :], args.utterances, args.seed)
+    patterns = sum(len(command.get("patterns", [])) for command in commands)
+    print(f"pack: {len(commands)} commands, {patterns} patterns; corpus: {len(items)} utterances")
+    reference = None
+    for label, workers, processes in [
+        ("1 thread", 1, False),
+        (f"{args.workers} threads", args.workers, False),
+        (f"{args.workers} processes", args.workers, True),
+    ]:
+        started = time.perf_counter()
+        results = list(run_batch(items, commands, workers=workers, processes=processes, chunk_size=64))
+        elapsed = time.perf_counter() - started
+        routed = [result.command for result in results]
+        if reference is None:
+            reference = routed
+        same = "same routes" if routed == reference else "ROUTES DIFFER"
+        print(f"{label:>12}: {len(results) / elapsed:,.0f} utterances/s ({elapsed:.2f}s, {same})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+import argparse
+import math
+import random
+import time
+import tracemalloc
+from array import array
+from collections import deque
+
+from app.core.capture_ring import CaptureRing, mulaw_decode
+from app.core.stt import BLOCK_FRAMES
+
+
+def make_blocks(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [
+        memoryview(array("h", (int(rng.choice([300, 2000, 9000]) * math.sin(position * 0.04)) for position in range(BLOCK_FRAMES))))
+        for _ in range(count)
+    ]
+
+
+def fill(store, blocks: list, total: int) -> tuple:
+    started = time.perf_counter()
+    for index in range(total):
+        store(blocks[index % len(blocks)])
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    for index in range(total):
+        store(blocks[index % len(blocks)])
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return elapsed / total * 1e6, held
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-block cost and heap held by the capture ring")
+    parser.add_argument("--seconds", type=float, default=30.0, help="ring length")
+    parser.add_argument("--blocks", type=int, default=400, help="blocks written")
+    parser.add_argument("--rate", type=int, default=16000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    blocks = make_blocks(16, args.seed)
+    kept = max(1, int(args.seconds * args.rate / BLOCK_FRAMES))
+    print(f"{args.seconds:.0f} s ring, {args.blocks} blocks of {BLOCK_FRAMES} samples")
+
+    history: deque = deque(maxlen=kept)
+    micros, held = fill(lambda block: history.append(bytes(block)), blocks, args.blocks)
+    print(f"  {'PCM deque:':<14} {micros:7.1f} us/block, heap held {held / 1024:7.1f} KiB")
+
+    ring = CaptureRing(args.seconds, args.rate)
+    ring.write(blocks[0])
+    micros, held = fill(ring.write, blocks, args.blocks)
+    print(f"  {'mmap mu-law:':<14} {micros:7.1f} us/block, heap held {held / 1024:7.1f} KiB, mapped {ring.capacity / 1024:.1f} KiB")
+
+    original = array("h", blocks[(args.blocks - 1) % len(blocks)].tobytes())
+    decoded = mulaw_decode(ring.read(ring.position - BLOCK_FRAMES))
+    error = max(abs(left - right) for left, right in zip(original, decoded))
+    print(f"  round trip: max error {error} of {max(map(abs, original))} peak")
+    ring.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
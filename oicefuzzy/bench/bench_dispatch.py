@@ -0,0 +1,91 @@
+import argparse
+import time
+from typing import Any, Dict, List
+
+from PySide6.QtCore import QCoreApplication
+
+from app.core.actions import ActionDispatcher
+from app.core.config import ConfigStore
+from app.core.metrics import Histogram
+from app.core.notes import NotesStore
+from app.core.system import RecordingSystemBackend
+from app.core.timer_manager import TimerManager
+
+_SAMPLE_PARAMS = {
+    "timer_set": "\u043f\u044f\u0442\u044c \u043c\u0438\u043d\u0443\u0442",
+    "math_eval": "\u0434\u0432\u0430 \u043f\u043b\u044e\u0441 \u0434\u0432\u0430",
+    "open_site": "example.com",
+}
+
+
+def sample_params(action: Dict[str, Any], allowlist: List[Dict[str, Any]]) -> Dict[str, str]:
+    samples = dict(_SAMPLE_PARAMS)
+    if allowlist:
+        samples["run_allowlist"] = str(allowlist[0].get("name", ""))
+    params = {}
+    for key in ("param", "tag_param"):
+        name = action.get(key)
+        if name:
+            params[name] = samples.get(action.get("type", ""), "\u0442\u0435\u0441\u0442")
+    return params
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Dispatch every configured action through a recording system backend")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QCoreApplication([])
+    config = ConfigStore()
+    system = RecordingSystemBackend(battery=80, max_calls=None)
+    timers = TimerManager()
+    dispatcher = ActionDispatcher(config.targets, config.allowlist, timers, notes=NotesStore(":memory:"), system=system)
+    cases: List[tuple] = []
+    for command in config.commands:
+        action = command.get("action") or {}
+        if not action.get("type"):
+            continue
+        try:
+            prepared = dispatcher.prepare(action)
+        except ValueError as exc:
+            print(f"skipping {command.get('id')}: {exc}")
+            continue
+        cases.append((command.get("id", action["type"]), action, prepared, sample_params(action, config.allowlist)))
+
+    histograms: Dict[str, Histogram] = {}
+    lookup = Histogram()
+    bound = Histogram()
+    failures: Dict[str, str] = {}
+    for _ in range(max(1, args.rounds)):
+        for command_id, action, prepared, params in cases:
+            raw_text = " ".join(params.values())
+            started = time.perf_counter()
+            dispatcher.dispatch(action, params, raw_text)
+            lookup.add(time.perf_counter() - started)
+            started = time.perf_counter()
+            result = dispatcher.dispatch(action, params, raw_text, prepared)
+            elapsed = time.perf_counter() - started
+            bound.add(elapsed)
+            histograms.setdefault(command_id, Histogram()).add(elapsed)
+            if not result.ok:
+                failures[command_id] = result.log
+        for timer in timers.list_timers():
+            timers.cancel_timer(timer.id)
+
+    print(f"{len(cases)} actions x {args.rounds} rounds, {len(system.calls)} recorded system calls")
+    print(f"dispatch by type lookup: mean {lookup.mean * 1e6:.1f} us; prepared: mean {bound.mean * 1e6:.1f} us")
+    for command_id, histogram in sorted(histograms.items(), key=lambda item: -item[1].mean):
+        print(
+            f"{command_id:>24}: mean {histogram.mean * 1e6:8.1f} us, p95 {histogram.quantile(0.95) * 1e6:8.1f} us"
+            + (f"  (failed: {failures[command_id]})" if command_id in failures else "")
+        )
+    calls: Dict[str, int] = {}
+    for name in system.names():
+        calls[name] = calls.get(name, 0) + 1
+    print("system calls: " + ", ".join(f"{name}={count}" for name, count in sorted(calls.items())))
+    app.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+import argparse
+import queue
+import threading
+import time
+from typing import Optional
+
+from PySide6.QtCore import QCoreApplication
+
+import app.core.stt as stt
+from app.core.metrics import METRICS
+from app.core.stt import BLOCK_FRAMES, SpeechListener
+from app.core.tts import FakeSpeechBackend, TtsEngine
+from bench.fakes import FakeStream, NullRecognizer, context_switches
+
+
+def legacy(seconds: float) -> tuple:
+    audio: queue.Queue = queue.Queue()
+    cond = threading.Condition()
+    loops = {"stt": 0, "tts": 0}
+    running = True
+
+    def listener() -> None:
+        while running:
+            try:
+                audio.get(timeout=0.2)
+            except queue.Empty:
+                pass
+            loops["stt"] += 1
+
+    def speaker() -> None:
+        while running:
+            with cond:
+                cond.wait(0.2)
+            loops["tts"] += 1
+
+    threads = [threading.Thread(target=listener), threading.Thread(target=speaker)]
+    for thread in threads:
+        thread.start()
+    feeder = stt.sd.RawInputStream(lambda block, *args: audio.put(block))
+    switches = measure(seconds, feeder)
+    running = False
+    for thread in threads:
+        thread.join()
+    return loops["stt"], loops["tts"], switches
+
+
+def scheduled(seconds: float) -> tuple:
+    listener = SpeechListener("", "fuzzy", 16000)
+    listener._model = object()
+    listener._recognizer = NullRecognizer()
+    tts = TtsEngine(backend=FakeSpeechBackend(can_play=False))
+    listener.start()
+    time.sleep(0.1)
+    METRICS.collect()
+    METRICS.reset()
+    switches = measure(seconds)
+    METRICS.collect()
+    counters = METRICS.snapshot()["counters"]
+    listener.stop()
+    tts.stop()
+    return counters.get("stt.wakeup", 0), counters.get("tts.wakeup", 0), switches
+
+
+def measure(seconds: float, feeder: Optional[FakeStream] = None) -> Optional[int]:
+    before = context_switches()
+    if feeder is not None:
+        feeder.start()
+    time.sleep(seconds)
+    if feeder is not None:
+        feeder.stop()
+    after = context_switches()
+    return None if before is None or after is None else after - before
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Wakeups per second of the listener and speech threads while idle")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--block-ms", type=float, nargs="*", default=[0.0, BLOCK_FRAMES / 16000 * 1000],
+                        help="microphone block interval, 0 for no audio")
+    args = parser.parse_args()
+    app = QCoreApplication([])
+    for block_ms in args.block_ms:
+        stt.sd.RawInputStream = FakeStream.configured(block_ms=block_ms)
+        print("no audio" if block_ms <= 0 else f"audio block every {block_ms:.0f} ms")
+        for label, run in (("200 ms polling", legacy), ("deadline waits", scheduled)):
+            listener, speaker, switches = run(args.seconds)
+            rate = "n/a" if switches is None else f"{switches / args.seconds:6.1f}/s"
+            print(f"  {label + ':':<16} listener {listener / args.seconds:5.1f}/s, speech {speaker / args.seconds:5.1f}/s,"
+                  f" context switches {rate}")
+    app.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,143 @@
+import argparse
+import random
+import time
+from fractions import Fraction
+from typing import Tuple
+
+from app.core.math_eval import BACKENDS, MathEvaluator
+
+CORPUS = [
+    "15 \u043f\u043b\u044e\u0441 27",
+    "100 \u0440\u0430\u0437\u0434\u0435\u043b\u0438\u0442\u044c \u043d\u0430 5",
+    "\u0434\u0432\u0430\u0434\u0446\u0430\u0442\u044c \u043f\u044f\u0442\u044c \u0443\u043c\u043d\u043e\u0436\u0438\u0442\u044c \u043d\u0430 \u0447\u0435\u0442\u044b\u0440\u0435",
+    "(2 + 3) * (7 - 4) / 5",
+    "2 \u0432 \u0441\u0442\u0435\u043f\u0435\u043d\u0438 10",
+    "\u043a\u043e\u0440\u0435\u043d\u044c \u0438\u0437 144 \u043f\u043b\u044e\u0441 6",
+    "200 \u043f\u043b\u044e\u0441 15 \u043f\u0440\u043e\u0446\u0435\u043d\u0442\u043e\u0432",
+    "7 \u0432 \u043a\u0432\u0430\u0434\u0440\u0430\u0442\u0435 \u043c\u0438\u043d\u0443\u0441 3 \u0432 \u043a\u0443\u0431\u0435",
+    "1,5 * 4 - 0,25",
+    "((1 + 2) * (3 + 4)) / (5 - 6)",
+]
+
+_SPOKEN = {
+    "+": "\u043f\u043b\u044e\u0441",
+    "-": "\u043c\u0438\u043d\u0443\u0441",
+    "*": "\u0443\u043c\u043d\u043e\u0436\u0438\u0442\u044c \u043d\u0430",
+    "/": "\u0440\u0430\u0437\u0434\u0435\u043b\u0438\u0442\u044c \u043d\u0430",
+    "^": "\u0432 \u0441\u0442\u0435\u043f\u0435\u043d\u0438",
+    "%": "\u043f\u0440\u043e\u0446\u0435\u043d\u0442\u043e\u0432",
+    "root": "\u043a\u043e\u0440\u0435\u043d\u044c \u0438\u0437",
+}
+
+Sample = Tuple[str, str, Fraction | None, Fraction]
+
+
+def _random_expression(rng: random.Random, depth: int) -> Sample:
+    if depth <= 0 or rng.random() < 0.3:
+        if rng.random() < 0.15:
+            root = rng.randint(0, 30)
+            value = Fraction(root * root)
+            return "\u221a" + str(value), f"{_SPOKEN['root']} {value}", Fraction(root), value
+        value = Fraction(rng.randint(0, 99))
+        return str(value), str(value), value, value
+    op = rng.choice("+-*/^%~")
+    if op == "~":
+        text, spoken, value, scale = _random_expression(rng, depth - 1)
+        return f"(-{text})", f"({_SPOKEN['-']} {spoken})", None if value is None else -value, scale
+    if op == "^":
+        base_text, base_spoken, base, scale = _random_expression(rng, min(depth - 1, 1))
+        exponent = rng.randint(0 if base == 0 else -2, 3)
+        text = f"({base_text} ^ {exponent})"
+        spoken = f"({base_spoken} {_SPOKEN['^']} {exponent})"
+        if base is None:
+            return text, spoken, None, scale
+        value = base**exponent
+        return text, spoken, value, max(scale, abs(value))
+    left_text, left_spoken, left, left_scale = _random_expression(rng, depth - 1)
+    if op == "%":
+        right = Fraction(rng.randint(0, 99))
+        right_text = right_spoken = str(right)
+        right_scale = right
+    else:
+        right_text, right_spoken, right, right_scale = _random_expression(rng, depth - 1)
+    if op == "%":
+        sign = rng.choice("+-")
+        text = f"({left_text} {sign} {right_text}%)"
+        spoken = f"({left_spoken} {_SPOKEN[sign]} {right_spoken} {_SPOKEN['%']})"
+    else:
+        text = f"({left_text} {op} {right_text})"
+        spoken = f"({left_spoken} {_SPOKEN[op]} {right_spoken})"
+    if left is None or right is None:
+        return text, spoken, None, max(left_scale, right_scale)
+    if op == "%":
+        change = left * right / 100
+        value = left + change if sign == "+" else left - change
+    elif op == "+":
+        value = left + right
+    elif op == "-":
+        value = left - right
+    elif op == "*":
+        value = left * right
+    elif right == 0:
+        return text, spoken, None, max(left_scale, right_scale)
+    else:
+        value = left / right
+    return text, spoken, value, max(left_scale, right_scale, abs(value), abs(left * right))
+
+
+def fuzz(iterations: int, seed: int) -> int:
+    rng = random.Random(seed)
+    evaluator = MathEvaluator(max_length=10_000, max_depth=64)
+    failures = 0
+    for _ in range(iterations):
+        text, spoken, expected, scale = _random_expression(rng, rng.randint(1, 5))
+        for candidate in (text, spoken):
+            for mode in BACKENDS:
+                result = evaluator.evaluate(candidate, mode)
+                if expected is None:
+                    ok = not result.ok and result.error == "divide_by_zero"
+                elif mode == "fraction":
+                    ok = result.ok and result.value == expected
+                else:
+                    target = float(expected)
+                    ok = result.ok and abs(float(result.value) - target) <= 1e-9 * max(1.0, float(scale))
+                if not ok:
+                    failures += 1
+                    print(f"MISMATCH [{mode}] {candidate!r}: expected {expected}, got {result}")
+    print(f"fuzz: {iterations * 2 * len(BACKENDS)} evaluations, {failures} mismatches")
+    return failures
+
+
+def bench(rounds: int) -> None:
+    total = rounds * len(CORPUS)
+    for mode in BACKENDS:
+        evaluator = MathEvaluator(mode=mode)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in CORPUS:
+                evaluator.clear_cache()
+                evaluator.evaluate(text)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for text in CORPUS:
+                evaluator.evaluate(text)
+        warm = time.perf_counter() - start
+        print(
+            f"{mode:<8} cold {total / cold:>9,.0f} expr/s ({cold / total * 1e6:6.1f} us)"
+            f"  warm {total / warm:>9,.0f} expr/s ({warm / total * 1e6:6.1f} us)"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="MathEvaluator throughput per backend and fuzz check")
+    parser.add_argument("--rounds", type=int, default=2000)
+    parser.add_argument("--fuzz", type=int, default=2000, help="random expressions checked against fractions")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    bench(args.rounds)
+    return 1 if fuzz(args.fuzz, args.seed) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,115 @@
+import argparse
+import json
+import random
+import re
+import time
+from pathlib import Path
+
+from PySide6.QtCore import QCoreApplication
+
+from app.core.actions import ActionDispatcher
+from app.core.commands import MATH_FALLBACK, TIMER_FALLBACK, CommandMatcher, CommandProcessor
+from app.core.config import ConfigStore
+from app.core.languages import result_hypotheses
+from app.core.notes import NotesStore
+from app.core.system import RecordingSystemBackend
+from app.core.timer_manager import TimerManager
+
+_VOWELS = "аеиоуыэюяё"
+_FILLERS = {"site": "гитхаб", "query": "рецепт блинов", "topic": "квазар", "text": "купить хлеб", "name": "блокнот",
+            "payload": "пять минут", "expr": "два плюс два", "city": "казани", "tag": "работа"}
+
+
+def fill(pattern: str) -> str:
+    return re.sub(r"\{(\w+)\}", lambda match: _FILLERS.get(match.group(1), "тест"), pattern)
+
+
+def corrupt(text: str, rng: random.Random) -> str:
+    words = text.split()
+    index = rng.randrange(len(words))
+    word = words[index]
+    positions = [position for position, char in enumerate(word) if char in _VOWELS]
+    if positions and rng.random() < 0.7:
+        position = rng.choice(positions)
+        word = word[:position] + rng.choice(_VOWELS.replace(word[position], "")) + word[position + 1 :]
+    elif len(word) > 2:
+        word = word[:-1]
+    else:
+        word = word + rng.choice(_VOWELS)
+    words[index] = word
+    return " ".join(words)
+
+
+def synthetic_corpus(commands: list, size: int, alternatives: int, seed: int) -> list:
+    rng = random.Random(seed)
+    phrases = [(command["id"], fill(pattern)) for command in commands for pattern in command.get("patterns", [])
+               if not pattern.startswith("regex:")]
+    corpus = []
+    for _ in range(size):
+        command_id, phrase = rng.choice(phrases)
+        rank = rng.choices(range(alternatives), weights=[4] + [2] * (alternatives - 1))[0]
+        texts = []
+        while len(texts) < alternatives:
+            candidate = phrase if len(texts) == rank else corrupt(phrase, rng)
+            if candidate not in texts and (candidate != phrase or len(texts) == rank):
+                texts.append(candidate)
+        scores = sorted((rng.uniform(-15.0, 0.0) for _ in texts), reverse=True)
+        scores[0] = 0.0
+        corpus.append({"expected": command_id,
+                       "alternatives": [{"text": text, "confidence": 200.0 + score} for text, score in zip(texts, scores)]})
+    return corpus
+
+
+def route_id(processor: CommandProcessor, matcher: CommandMatcher, hypotheses: list, nbest: bool) -> str:
+    if nbest:
+        routes = processor.resolve_chain(hypotheses[0].text, matcher, hypotheses)
+    else:
+        routes = processor.resolve_chain(hypotheses[0].text, matcher)
+    return "+".join(route.command_id for route in routes)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Command accuracy with the top hypothesis only vs N-best rescoring")
+    parser.add_argument("--corpus", help="JSONL of recognizer results with an 'expected' command id per line")
+    parser.add_argument("--size", type=int, default=2000)
+    parser.add_argument("--alternatives", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    app = QCoreApplication([])
+    config = ConfigStore()
+    dispatcher = ActionDispatcher(config.targets, config.allowlist, TimerManager(), notes=NotesStore(":memory:"),
+                                  system=RecordingSystemBackend())
+    matcher = CommandMatcher(config.commands, dispatcher)
+    processor = CommandProcessor(dispatcher, config.get_setting("stt", "wake_word", default=""))
+    if args.corpus:
+        with Path(args.corpus).open("r", encoding="utf-8") as handle:
+            corpus = [json.loads(line) for line in handle if line.strip()]
+    else:
+        corpus = synthetic_corpus(config.commands, args.size, max(2, args.alternatives), args.seed)
+    samples = [(item["expected"], result_hypotheses(item)) for item in corpus]
+    samples = [(expected, hypotheses) for expected, hypotheses in samples if hypotheses]
+
+    for label, nbest in (("top-1", False), ("n-best", True)):
+        correct = wrong = failed = fallback = 0
+        started = time.perf_counter()
+        for expected, hypotheses in samples:
+            command_id = route_id(processor, matcher, hypotheses, nbest)
+            if command_id == expected:
+                correct += 1
+            elif not command_id:
+                failed += 1
+            elif command_id in (MATH_FALLBACK, TIMER_FALLBACK):
+                fallback += 1
+            else:
+                wrong += 1
+        elapsed = time.perf_counter() - started
+        total = max(1, len(samples))
+        print(f"{label:>7}: correct {correct / total:6.1%}  wrong {wrong / total:6.1%}  fallback {fallback / total:6.1%}"
+              f"  not recognized {failed / total:6.1%}  ({elapsed / total * 1e6:6.1f} us/utterance)")
+    print(f"{len(samples)} utterances, {'recorded' if args.corpus else 'synthetic'} corpus")
+    app.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,159 @@
+import argparse
+import random
+import time
+from fractions import Fraction
+from typing import List, Tuple
+
+from app.core.commands import MATH_FALLBACK, CommandProcessor
+from app.core.math_eval import MathEvaluator
+from app.core.numerals import format_value, replace_number_words
+
+_UNITS = ["", "\u043e\u0434\u0438\u043d", "\u0434\u0432\u0430", "\u0442\u0440\u0438", "\u0447\u0435\u0442\u044b\u0440\u0435", "\u043f\u044f\u0442\u044c", "\u0448\u0435\u0441\u0442\u044c", "\u0441\u0435\u043c\u044c", "\u0432\u043e\u0441\u0435\u043c\u044c", "\u0434\u0435\u0432\u044f\u0442\u044c"]
+_UNITS_FEMININE = ["", "\u043e\u0434\u043d\u0430", "\u0434\u0432\u0435", "\u0442\u0440\u0438", "\u0447\u0435\u0442\u044b\u0440\u0435", "\u043f\u044f\u0442\u044c", "\u0448\u0435\u0441\u0442\u044c", "\u0441\u0435\u043c\u044c", "\u0432\u043e\u0441\u0435\u043c\u044c", "\u0434\u0435\u0432\u044f\u0442\u044c"]
+_TEENS = [
+    "\u0434\u0435\u0441\u044f\u0442\u044c", "\u043e\u0434\u0438\u043d\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0434\u0432\u0435\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0442\u0440\u0438\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0447\u0435\u0442\u044b\u0440\u043d\u0430\u0434\u0446\u0430\u0442\u044c",
+    "\u043f\u044f\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0448\u0435\u0441\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0441\u0435\u043c\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0432\u043e\u0441\u0435\u043c\u043d\u0430\u0434\u0446\u0430\u0442\u044c", "\u0434\u0435\u0432\u044f\u0442\u043d\u0430\u0434\u0446\u0430\u0442\u044c",
+]
+_TENS = ["", "", "\u0434\u0432\u0430\u0434\u0446\u0430\u0442\u044c", "\u0442\u0440\u0438\u0434\u0446\u0430\u0442\u044c", "\u0441\u043e\u0440\u043e\u043a", "\u043f\u044f\u0442\u044c\u0434\u0435\u0441\u044f\u0442", "\u0448\u0435\u0441\u0442\u044c\u0434\u0435\u0441\u044f\u0442", "\u0441\u0435\u043c\u044c\u0434\u0435\u0441\u044f\u0442", "\u0432\u043e\u0441\u0435\u043c\u044c\u0434\u0435\u0441\u044f\u0442", "\u0434\u0435\u0432\u044f\u043d\u043e\u0441\u0442\u043e"]
+_HUNDREDS = ["", "\u0441\u0442\u043e", "\u0434\u0432\u0435\u0441\u0442\u0438", "\u0442\u0440\u0438\u0441\u0442\u0430", "\u0447\u0435\u0442\u044b\u0440\u0435\u0441\u0442\u0430", "\u043f\u044f\u0442\u044c\u0441\u043e\u0442", "\u0448\u0435\u0441\u0442\u044c\u0441\u043e\u0442", "\u0441\u0435\u043c\u044c\u0441\u043e\u0442", "\u0432\u043e\u0441\u0435\u043c\u044c\u0441\u043e\u0442", "\u0434\u0435\u0432\u044f\u0442\u044c\u0441\u043e\u0442"]
+_ORDINAL_UNITS = ["", "\u043f\u0435\u0440\u0432\u044b\u0439", "\u0432\u0442\u043e\u0440\u043e\u0439", "\u0442\u0440\u0435\u0442\u0438\u0439", "\u0447\u0435\u0442\u0432\u0435\u0440\u0442\u044b\u0439", "\u043f\u044f\u0442\u044b\u0439", "\u0448\u0435\u0441\u0442\u043e\u0439", "\u0441\u0435\u0434\u044c\u043c\u043e\u0439", "\u0432\u043e\u0441\u044c\u043c\u043e\u0439", "\u0434\u0435\u0432\u044f\u0442\u044b\u0439"]
+_FRACTIONS = [
+    ("\u043f\u043e\u043b\u043e\u0432\u0438\u043d\u0430", Fraction(1, 2)),
+    ("\u0434\u0432\u0435 \u0442\u0440\u0435\u0442\u044c\u0438\u0445", Fraction(2, 3)),
+    ("\u0442\u0440\u0438 \u0447\u0435\u0442\u0432\u0435\u0440\u0442\u0438", Fraction(3, 4)),
+    ("\u043f\u043e\u043b\u0442\u043e\u0440\u0430", Fraction(3, 2)),
+    ("\u0442\u0440\u0438 \u0446\u0435\u043b\u044b\u0445 \u043f\u044f\u0442\u044c \u0434\u0435\u0441\u044f\u0442\u044b\u0445", Fraction(7, 2)),
+    ("\u0434\u0432\u0430 \u0441 \u043f\u043e\u043b\u043e\u0432\u0438\u043d\u043e\u0439", Fraction(5, 2)),
+    ("\u043e\u0434\u043d\u0430 \u0441\u043e\u0442\u0430\u044f", Fraction(1, 100)),
+]
+
+
+def _triad(value: int, feminine: bool = False) -> List[str]:
+    words = []
+    hundreds, rest = divmod(value, 100)
+    if hundreds:
+        words.append(_HUNDREDS[hundreds])
+    if 10 <= rest < 20:
+        words.append(_TEENS[rest - 10])
+        return words
+    tens, units = divmod(rest, 10)
+    if tens:
+        words.append(_TENS[tens])
+    if units:
+        words.append((_UNITS_FEMININE if feminine else _UNITS)[units])
+    return words
+
+
+def _thousands_word(value: int) -> str:
+    if 10 <= value % 100 < 20:
+        return "\u0442\u044b\u0441\u044f\u0447"
+    last = value % 10
+    if last == 1:
+        return "\u0442\u044b\u0441\u044f\u0447\u0430"
+    if 2 <= last <= 4:
+        return "\u0442\u044b\u0441\u044f\u0447\u0438"
+    return "\u0442\u044b\u0441\u044f\u0447"
+
+
+def spell(value: int) -> str:
+    if value == 0:
+        return "\u043d\u043e\u043b\u044c"
+    thousands, rest = divmod(value, 1000)
+    words = []
+    if thousands:
+        words.extend(_triad(thousands, feminine=True))
+        words.append(_thousands_word(thousands))
+    words.extend(_triad(rest))
+    return " ".join(words)
+
+
+def spell_ordinal(value: int) -> str:
+    tens, units = divmod(value, 10)
+    if not units or tens == 1:
+        return ""
+    prefix = spell(tens * 10) + " " if tens else ""
+    return prefix + _ORDINAL_UNITS[units]
+_SCALED = [
+    ("\u043f\u043e\u043b\u0442\u043e\u0440\u044b \u0442\u044b\u0441\u044f\u0447\u0438", "1500"),
+    ("\u043f\u043e\u043b\u0442\u043e\u0440\u0430 \u043c\u0438\u043b\u043b\u0438\u043e\u043d\u0430", "1500000"),
+    ("\u0434\u0432\u0435 \u0441 \u043f\u043e\u043b\u043e\u0432\u0438\u043d\u043e\u0439 \u0442\u044b\u0441\u044f\u0447\u0438", "2500"),
+    ("\u043f\u043e\u043b\u0442\u043e\u0440\u044b \u0442\u044b\u0441\u044f\u0447\u0438 \u0434\u0432\u0435\u0441\u0442\u0438 \u0440\u0443\u0431\u043b\u0435\u0439", "1700 \u0440\u0443\u0431\u043b\u0435\u0439"),
+]
+_SPOKEN_MATH = [
+    ("\u0442\u0440\u0438\u0441\u0442\u0430 \u043f\u043b\u044e\u0441 \u0441\u043e\u0440\u043e\u043a", "340"),
+    ("\u043f\u043e\u043b\u0442\u043e\u0440\u044b \u0442\u044b\u0441\u044f\u0447\u0438 \u0440\u0430\u0437\u0434\u0435\u043b\u0438\u0442\u044c \u043d\u0430 \u0442\u0440\u0438", "500"),
+]
+_NOT_MATH = [
+    "\u043e\u0442\u043a\u0440\u043e\u0439 \u0434\u0432\u0430 \u043e\u043a\u043d\u0430",
+    "\u043e\u0442\u043a\u0440\u043e\u0439 2 \u043e\u043a\u043d\u0430",
+]
+
+
+def spoken_math_errors() -> int:
+    processor = CommandProcessor(None, "")
+    math = MathEvaluator()
+    errors = 0
+    for text, expected in _SPOKEN_MATH:
+        route = processor._fallback(text)
+        result = math.evaluate(text)
+        actual = math.format_value(result.value) if result.ok else result.error
+        if route is None or route.command_id != MATH_FALLBACK or actual != expected:
+            errors += 1
+            print(f"SPOKEN MATH {text!r}: expected {expected!r}, got route {route and route.command_id!r}, value {actual!r}")
+    for text in _NOT_MATH:
+        route = processor._fallback(text)
+        if route is not None:
+            errors += 1
+            print(f"NOT MATH {text!r}: routed to {route.command_id!r}")
+    return errors
+
+
+def build_corpus(size: int, seed: int) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.7:
+            value = rng.randint(0, 999_999)
+            corpus.append((f"\u0442\u0430\u0439\u043c\u0435\u0440 \u043d\u0430 {spell(value)} \u043c\u0438\u043d\u0443\u0442", f"\u0442\u0430\u0439\u043c\u0435\u0440 \u043d\u0430 {value} \u043c\u0438\u043d\u0443\u0442"))
+        elif roll < 0.85:
+            value = rng.randint(1, 99)
+            ordinal = spell_ordinal(value)
+            if ordinal:
+                corpus.append((f"{ordinal} \u0442\u0440\u0435\u043a", f"{value} \u0442\u0440\u0435\u043a"))
+        else:
+            words, value = rng.choice(_FRACTIONS)
+            left = rng.randint(1, 999)
+            corpus.append((f"{spell(left)} \u043f\u043b\u044e\u0441 {words}", f"{left} \u043f\u043b\u044e\u0441 {format_value(value)}"))
+    return corpus + _SCALED
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Russian numeral parser throughput over a generated corpus")
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    corpus = build_corpus(args.size, args.seed)
+    errors = 0
+    for text, expected in corpus:
+        actual = replace_number_words(text)
+        if actual != expected:
+            errors += 1
+            if errors <= 10:
+                print(f"MISMATCH {text!r}: expected {expected!r}, got {actual!r}")
+    words = sum(len(text.split()) for text, _ in corpus)
+    best = float("inf")
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        for text, _ in corpus:
+            replace_number_words(text)
+        best = min(best, time.perf_counter() - start)
+    errors += spoken_math_errors()
+    print(f"corpus: {len(corpus)} phrases, {words} words, {errors} mismatches")
+    print(f"throughput: {len(corpus) / best:,.0f} phrases/s, {words / best:,.0f} words/s")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+import argparse
+import random
+import time
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QApplication, QLabel, QVBoxLayout, QWidget
+
+from app.core.metrics import METRICS
+from app.ui.overlay import OverlayWindow
+
+_WORDS = ["открой", "браузер", "поставь", "таймер", "на", "пять", "минут", "сколько", "будет", "два", "плюс"]
+
+
+class LegacyOverlay(QWidget):
+    def __init__(self) -> None:
+        super().__init__()
+        self.setWindowFlags(Qt.Tool | Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.WindowDoesNotAcceptFocus)
+        self.setAttribute(Qt.WA_TranslucentBackground, True)
+        self._label = QLabel("")
+        self._label.setStyleSheet(
+            "QLabel { background: rgba(10, 10, 10, 180); color: white; padding: 8px 12px; border-radius: 8px; }"
+        )
+        layout = QVBoxLayout()
+        layout.addWidget(self._label)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+        self._hide_timer = QTimer(self)
+        self._hide_timer.setInterval(2500)
+        self._hide_timer.setSingleShot(True)
+        self._hide_timer.timeout.connect(self.hide)
+        self.resizes = 0
+
+    def show_text(self, text: str, opacity: float = 0.9) -> None:
+        self.setWindowOpacity(opacity)
+        self._label.setText(text)
+        before = self.size()
+        self.adjustSize()
+        if self.size() != before:
+            self.resizes += 1
+        screen = self.screen().availableGeometry()
+        self.move(screen.right() - self.width() - 20, screen.top() + 40)
+        self.show()
+        self._hide_timer.start()
+
+
+def build_stream(utterances: int, seed: int) -> list:
+    rng = random.Random(seed)
+    stream = []
+    for _ in range(utterances):
+        words = [rng.choice(_WORDS) for _ in range(rng.randint(3, 8))]
+        for count in range(1, len(words) + 1):
+            stream.append(" ".join(words[:count]))
+    return stream
+
+
+def replay(app: QApplication, overlay, stream: list, burst: int, frame_ms: float) -> tuple:
+    METRICS.reset()
+    cpu = 0.0
+    for index in range(0, len(stream), burst):
+        started = time.process_time()
+        for text in stream[index : index + burst]:
+            overlay.show_text(text)
+        app.processEvents()
+        cpu += time.process_time() - started
+        time.sleep(frame_ms / 1000.0)
+        started = time.process_time()
+        app.processEvents()
+        cpu += time.process_time() - started
+    overlay.hide()
+    return cpu, METRICS.snapshot()["counters"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="GUI-thread cost of showing partial results in the overlay")
+    parser.add_argument("--utterances", type=int, default=150)
+    parser.add_argument("--burst", type=int, default=4, help="partials arriving within one frame")
+    parser.add_argument("--frame-ms", type=float, default=17.0)
+    parser.add_argument("--seed", type=int, default=9)
+    args = parser.parse_args()
+    app = QApplication([])
+    stream = build_stream(args.utterances, args.seed)
+    print(f"{len(stream)} partial updates, {args.burst} per frame")
+
+    legacy = LegacyOverlay()
+    cpu, _ = replay(app, legacy, stream, args.burst, args.frame_ms)
+    print(f"  {'legacy label:':<16} {cpu * 1000 / len(stream):6.3f} ms/update, {len(stream)} relayouts, {legacy.resizes} resizes")
+    for label, painted in (("coalesced label", False), ("painted", True)):
+        overlay = OverlayWindow(painted=painted)
+        cpu, counters = replay(app, overlay, stream, args.burst, args.frame_ms)
+        print(f"  {label + ':':<16} {cpu * 1000 / len(stream):6.3f} ms/update, {counters.get('overlay.update', 0)} updates,"
+              f" {METRICS.snapshot()['histograms'].get('overlay.flush', {}).get('count', 0)} flushes,"
+              f" {counters.get('overlay.resize', 0)} resizes")
+    app.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
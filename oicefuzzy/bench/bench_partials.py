@@ -0,0 +1,102 @@
+import argparse
+import json
+import random
+import time
+
+from PySide6.QtCore import QCoreApplication
+
+from app.core.stt import BLOCK_FRAMES, SpeechListener
+from app.core.stt_results import JSON_BACKEND, EmitLimiter, ResultDecoder
+from app.core.utils import normalize_text
+from bench.fakes import ScriptedRecognizer
+
+_WORDS = ["открой", "браузер", "поставь", "таймер", "на", "пять", "минут"]
+
+
+def build_script(utterances: int, silence: int, seed: int) -> list:
+    rng = random.Random(seed)
+    script = []
+    for _ in range(utterances):
+        script.extend([(False, json.dumps({"partial": ""}, ensure_ascii=False, indent=2))] * rng.randint(1, silence))
+        words = rng.sample(_WORDS, rng.randint(2, 4))
+        for count in range(1, len(words) + 1):
+            partial = json.dumps({"partial": " ".join(words[:count])}, ensure_ascii=False, indent=2)
+            script.extend([(False, partial)] * rng.randint(1, 4))
+        script.append((True, json.dumps({"text": " ".join(words)}, ensure_ascii=False, indent=2)))
+    return script
+
+
+def legacy(script: list) -> tuple:
+    emitted = 0
+    started = time.perf_counter()
+    for final, raw in script:
+        text = json.loads(raw).get("text" if final else "partial", "")
+        if normalize_text(text) and not final:
+            emitted += 1
+    return time.perf_counter() - started, len(script), emitted
+
+
+def layered(script: list) -> tuple:
+    decoder = ResultDecoder()
+    decoded = 0
+    started = time.perf_counter()
+    for final, raw in script:
+        if final:
+            decoder.result(raw)
+            decoded += 1
+        elif decoder.partial(raw) is not None:
+            decoded += 1
+    return time.perf_counter() - started, decoded
+
+
+def listener_emits(script: list) -> int:
+    listener = SpeechListener("", "", 16000)
+    listener.configure(8, 1200, None, debug_console=False, partial_interval_ms=0)
+    listener._recognizer = ScriptedRecognizer(script)
+    emits = []
+    listener.partial_text.connect(emits.append)
+    block = bytes(320)
+    for _ in script:
+        listener._mode = "command"
+        listener._process_audio(block)
+    return len(emits)
+
+
+def limited_emits(script: list, interval_ms: int, block_ms: float) -> int:
+    limiter = EmitLimiter(interval_ms)
+    emitted = 0
+    for index, (final, raw) in enumerate(script):
+        now = index * block_ms / 1000.0
+        text = normalize_text(json.loads(raw).get("partial", "")) if not final else ""
+        if text and limiter.offer(text, now) is not None:
+            emitted += 1
+        if limiter.flush(now) is not None:
+            emitted += 1
+    return emitted
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recognizer result decoding and partial emission per audio block")
+    parser.add_argument("--utterances", type=int, default=2000)
+    parser.add_argument("--silence", type=int, default=20, help="max silent blocks between utterances")
+    parser.add_argument("--interval-ms", type=int, default=150)
+    parser.add_argument("--block-ms", type=float, default=BLOCK_FRAMES / 16000 * 1000)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    app = QCoreApplication([])
+    script = build_script(args.utterances, args.silence, args.seed)
+    print(f"blocks: {len(script)}, json backend: {JSON_BACKEND}")
+
+    elapsed, decoded, emitted = legacy(script)
+    print(f"  decode every block: {elapsed / len(script) * 1e6:5.2f} us/block, {decoded} decodes, {emitted} emits")
+    elapsed, decoded = layered(script)
+    emitted = listener_emits(script)
+    print(f"  skip unchanged:     {elapsed / len(script) * 1e6:5.2f} us/block, {decoded} decodes, {emitted} emits")
+    emitted = limited_emits(script, args.interval_ms, args.block_ms)
+    print(f"  emit limit {args.interval_ms} ms at {args.block_ms:.0f} ms blocks: {emitted} emits")
+    app.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from PySide6.QtCore import QCoreApplication
+
+from app.core.actions import ActionDispatcher
+from app.core.commands import CommandMatcher
+from app.core.notes import NotesStore
+from app.core.plugins import discover_plugins, import_plugin
+from app.core.system import RecordingSystemBackend
+from app.core.timer_manager import TimerManager
+from app.core.utils import resident_memory_bytes
+
+_HANDLER_TEMPLATE = """from app.core.actions import ActionResult
+
+TABLE = {{index: str(index) * 8 for index in range({table})}}
+
+
+def handle_plugin_{index}_action(action, params, raw_text, dispatcher):
+    return ActionResult(True, TABLE[{index} % len(TABLE)])
+"""
+
+_MANIFEST_TEMPLATE = """name: plugin_{index}
+actions:
+  - plugin_{index}_action
+commands:
+  - id: plugin_{index}
+    patterns:
+      - "plugin {index} go"
+    action:
+      type: plugin_{index}_action
+"""
+
+
+def write_plugins(root: Path, count: int, table: int) -> None:
+    for index in range(count):
+        folder = root / f"plugin_{index}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / "plugin.yaml").write_text(_MANIFEST_TEMPLATE.format(index=index), encoding="utf-8")
+        (folder / "handlers.py").write_text(_HANDLER_TEMPLATE.format(index=index, table=table), encoding="utf-8")
+
+
+def measure(count: int, table: int) -> None:
+    with tempfile.TemporaryDirectory() as temp:
+        root = Path(temp)
+        write_plugins(root, count, table)
+        rss_before = resident_memory_bytes()
+        started = time.perf_counter()
+        registry = discover_plugins([root], entry_points=False)
+        dispatcher = ActionDispatcher(
+            {}, [], TimerManager(), notes=NotesStore(":memory:"), system=RecordingSystemBackend(), plugins=registry
+        )
+        matcher = CommandMatcher(registry.commands(), dispatcher)
+        startup = time.perf_counter() - started
+        rss_lazy = resident_memory_bytes() - rss_before
+
+        first = None
+        if count:
+            match = matcher.match("plugin 0 go")
+            tick = time.perf_counter()
+            dispatcher.dispatch(match.action, match.params, "plugin 0 go", match.prepared)
+            first = time.perf_counter() - tick
+            tick = time.perf_counter()
+            dispatcher.dispatch(match.action, match.params, "plugin 0 go", match.prepared)
+            warm = time.perf_counter() - tick
+
+        started = time.perf_counter()
+        for spec in registry.specs[1:]:
+            import_plugin(spec)
+        eager = time.perf_counter() - started
+        rss_eager = resident_memory_bytes() - rss_before
+        line = f"{count:>5} plugins: lazy startup {startup * 1000:7.1f} ms, +{rss_lazy / 1048576:5.1f} MiB"
+        if first is not None:
+            line += f"; first dispatch {first * 1000:6.2f} ms, then {warm * 1e6:5.1f} us"
+        line += f"; importing all {eager * 1000:7.1f} ms, +{rss_eager / 1048576:5.1f} MiB"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Startup cost of plugin discovery with lazy vs eager handler imports")
+    parser.add_argument("--counts", default="0,50,200")
+    parser.add_argument("--table", type=int, default=2000, help="size of the dict each synthetic plugin builds on import")
+    args = parser.parse_args()
+    app = QCoreApplication([])
+    for count in [int(value) for value in args.counts.split(",") if value.strip()]:
+        measure(count, args.table)
+    app.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+import argparse
+import threading
+import time
+
+from PySide6.QtCore import QCoreApplication
+
+import app.core.stt as stt
+from app.core.metrics import METRICS
+from app.core.stt import SpeechListener
+from bench.fakes import BlockSource, FakeStream, NullRecognizer
+
+
+def run(source: BlockSource, changes: int, interval: float, apply) -> tuple:
+    listener = SpeechListener("", "fuzzy", 16000)
+    listener._model = object()
+    listener._recognizer = NullRecognizer()
+    listener.start()
+    time.sleep(interval)
+    source.produced = source.delivered = 0
+    threads = threading.active_count()
+    for index in range(changes):
+        apply(listener, index)
+        time.sleep(interval)
+    lost = source.produced - source.delivered
+    leaked = threading.active_count() - threads
+    listener.stop()
+    return lost, source.produced, leaked
+
+
+def legacy(listener: SpeechListener, index: int) -> None:
+    listener._running = False
+    with listener._stream_lock:
+        listener._close_stream()
+    listener._recognizer = NullRecognizer()
+    listener._worker = None
+    listener.start()
+
+
+def restart(listener: SpeechListener, index: int) -> None:
+    listener.stop()
+    listener.start()
+
+
+def reconfigure(listener: SpeechListener, index: int) -> None:
+    listener.reconfigure(
+        command_timeout_sec=8 + index % 2,
+        silence_timeout_ms=1200 + index % 2 * 100,
+        wake_word="fuzzy" if index % 2 else "fuzzy, assistant",
+        direct_mode=bool(index % 2),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Audio lost and threads left behind when settings change while listening")
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--block-ms", type=float, default=5.0)
+    parser.add_argument("--interval-ms", type=float, default=50.0, help="pause between settings changes")
+    parser.add_argument("--open-ms", type=float, default=30.0, help="simulated cost of opening an input stream")
+    args = parser.parse_args()
+    app = QCoreApplication([])
+    print(f"{args.changes} settings changes, {args.block_ms:.0f} ms blocks, {args.open_ms:.0f} ms stream open")
+    for label, apply in (("stop/start, no join", legacy), ("stop/start, joined", restart), ("reconfigure", reconfigure)):
+        source = BlockSource(args.block_ms)
+        stt.sd.RawInputStream = FakeStream.configured(open_cost_ms=args.open_ms, source=source)
+        METRICS.reset()
+        lost, produced, leaked = run(source, args.changes, args.interval_ms / 1000.0, apply)
+        source.stop()
+        print(f"  {label + ':':<22} {lost:4d}/{produced} blocks lost, {leaked:3d} threads left behind")
+    app.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
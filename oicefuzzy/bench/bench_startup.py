@@ -0,0 +1,61 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from app.core.utils import app_root
+
+_PROBE_LINE = re.compile(r"startup_sec=(?P<startup>[\d.]+) rss_bytes=(?P<rss>\d+)")
+
+TARGETS = {
+    "headless": ["-m", "app.cli", "--startup-probe", "--no-tts"],
+    "gui": ["-m", "app.main", "--startup-probe"],
+}
+
+
+def probe(args: List[str]) -> Dict[str, float]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *args],
+        cwd=app_root(),
+        env=dict(os.environ),
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        timeout=120,
+    )
+    wall = time.perf_counter() - started
+    match = _PROBE_LINE.search(completed.stdout)
+    if completed.returncode != 0 or not match:
+        raise RuntimeError(f"probe {' '.join(args)} failed: {completed.stderr.strip()[-400:]}")
+    return {"wall": wall, "startup": float(match.group("startup")), "rss": int(match.group("rss"))}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Startup time and resident memory: headless entry point vs GUI")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--targets", default=",".join(TARGETS))
+    args = parser.parse_args()
+    results = {}
+    for name in [name.strip() for name in args.targets.split(",") if name.strip() in TARGETS]:
+        samples = [probe(TARGETS[name]) for _ in range(max(1, args.runs))]
+        results[name] = {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+        row = results[name]
+        print(
+            f"{name:>8}: process wall {row['wall'] * 1000:.0f} ms, in-process startup {row['startup'] * 1000:.0f} ms, "
+            f"RSS {row['rss'] / 1_048_576:.1f} MiB (median of {len(samples)})"
+        )
+    if "headless" in results and "gui" in results:
+        saved = results["gui"]["rss"] - results["headless"]["rss"]
+        faster = results["gui"]["wall"] - results["headless"]["wall"]
+        print(f"headless saves {saved / 1_048_576:.1f} MiB RSS and {faster * 1000:.0f} ms of process startup")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
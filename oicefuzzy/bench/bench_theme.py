@@ -0,0 +1,104 @@
+import argparse
+import time
+
+from PySide6.QtWidgets import (
+    QApplication,
+    QFrame,
+    QHBoxLayout,
+    QLabel,
+    QListWidget,
+    QMainWindow,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+
+from app.ui.status_dot import StatusDot
+from app.ui.styles import theme_styles
+from app.ui.theme import ThemeManager
+
+_LEGACY_DOT = """
+QLabel#StatusDot { background: #64748B; border-radius: 6px; min-width: 12px; min-height: 12px; max-width: 12px; max-height: 12px; }
+QLabel#StatusDot[status="listening"] { background: #2DD4BF; }
+QLabel#StatusDot[status="executing"] { background: #F97316; }
+"""
+
+
+def build_window(cards: int) -> tuple:
+    window = QMainWindow()
+    root = QWidget()
+    layout = QVBoxLayout(root)
+    legacy_dot = QLabel()
+    legacy_dot.setObjectName("StatusDot")
+    legacy_dot.setProperty("status", "idle")
+    dot = StatusDot()
+    header = QHBoxLayout()
+    header.addWidget(legacy_dot)
+    header.addWidget(dot)
+    layout.addLayout(header)
+    for index in range(cards):
+        card = QFrame()
+        card.setObjectName("Card")
+        inner = QVBoxLayout(card)
+        inner.addWidget(QLabel(f"card {index}"))
+        inner.addWidget(QPushButton("start"))
+        inner.addWidget(QListWidget())
+        layout.addWidget(card)
+    window.setCentralWidget(root)
+    window.show()
+    return window, legacy_dot, dot
+
+
+def timed(app: QApplication, action, repeat: int) -> float:
+    started = time.perf_counter()
+    for index in range(repeat):
+        action(index)
+        app.processEvents()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def report(label: str, micros: float) -> None:
+    print(f"{label + ':':<32}{micros:10.1f} us")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cost of status-dot flips and theme switches")
+    parser.add_argument("--cards", type=int, default=40, help="widget groups in the synthetic window")
+    parser.add_argument("--flips", type=int, default=2000)
+    parser.add_argument("--switches", type=int, default=20)
+    args = parser.parse_args()
+    app = QApplication([])
+    statuses = ("idle", "listening", "executing")
+
+    app.setStyleSheet(theme_styles("dark") + _LEGACY_DOT)
+    window, legacy_dot, dot = build_window(args.cards)
+    app.processEvents()
+
+    def legacy_flip(index: int) -> None:
+        legacy_dot.setProperty("status", statuses[index % 3])
+        legacy_dot.style().unpolish(legacy_dot)
+        legacy_dot.style().polish(legacy_dot)
+
+    report("status flip, unpolish/polish", timed(app, legacy_flip, args.flips))
+    report("status flip, painted dot", timed(app, lambda index: dot.set_status(statuses[index % 3]), args.flips))
+    names = ("light", "dark")
+    report("theme switch, app stylesheet", timed(app, lambda index: app.setStyleSheet(theme_styles(names[index % 2])), args.switches))
+    report("theme re-apply, app stylesheet", timed(app, lambda index: app.setStyleSheet(theme_styles("dark")), args.switches))
+    window.close()
+
+    app.setStyleSheet("")
+    themes = ThemeManager()
+    themes.apply("dark", app)
+    window, legacy_dot, dot = build_window(args.cards)
+    themes.attach(window)
+    themes.theme_changed.connect(lambda theme: dot.set_colors(theme.status_colors))
+    app.processEvents()
+    report("theme switch, palette + scoped", timed(app, lambda index: themes.apply(names[index % 2], app), args.switches))
+    report("theme re-apply, theme manager", timed(app, lambda index: themes.apply("dark", app), args.switches))
+    window.close()
+    app.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
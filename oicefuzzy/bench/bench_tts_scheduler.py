@@ -0,0 +1,124 @@
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+from app.core.tts import PRIORITY_ALERT, PRIORITY_INFO, PRIORITY_REPLY, FakeSpeechBackend, TtsEngine
+from app.core.tts_cache import PHRASE_NOT_RECOGNIZED, PHRASE_TIME_UP
+
+_REPLIES = [
+    "\u041e\u0442\u043a\u0440\u044b\u0432\u0430\u044e \u0431\u0440\u0430\u0443\u0437\u0435\u0440",
+    "\u0422\u0430\u0439\u043c\u0435\u0440 \u0437\u0430\u043f\u0443\u0449\u0435\u043d",
+    "\u041e\u0442\u0432\u0435\u0442: 42",
+    "\u0417\u0430\u043c\u0435\u0442\u043a\u0430 \u0441\u043e\u0445\u0440\u0430\u043d\u0435\u043d\u0430",
+    "\u0413\u0440\u043e\u043c\u043a\u043e\u0441\u0442\u044c \u0443\u0432\u0435\u043b\u0438\u0447\u0435\u043d\u0430",
+]
+
+
+def build_burst(size: int, seed: int) -> List[Tuple[str, int]]:
+    rng = random.Random(seed)
+    burst = []
+    for _ in range(size):
+        roll = rng.random()
+        if roll < 0.3:
+            burst.append((PHRASE_TIME_UP, PRIORITY_ALERT))
+        elif roll < 0.5:
+            burst.append((PHRASE_NOT_RECOGNIZED, PRIORITY_INFO))
+        else:
+            burst.append((rng.choice(_REPLIES), PRIORITY_REPLY))
+    return burst
+
+
+def _blocked(engine: TtsEngine, priority: int = PRIORITY_ALERT) -> None:
+    engine.speak("." * 100, priority)
+    deadline = time.monotonic() + 2.0
+    while not engine.is_speaking() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def _drain(engine: TtsEngine) -> None:
+    deadline = time.monotonic() + 5.0
+    while (engine.pending() or engine.is_speaking()) and time.monotonic() < deadline:
+        time.sleep(0.001)
+    engine.stop()
+
+
+def scheduler_errors() -> int:
+    checks = []
+    backend = FakeSpeechBackend(seconds_per_char=0.001)
+    engine = TtsEngine(backend=backend, max_age_sec=0)
+    _blocked(engine)
+    engine.speak("info", PRIORITY_INFO)
+    engine.speak("reply", PRIORITY_REPLY)
+    engine.speak("reply", PRIORITY_REPLY)
+    engine.speak("alert", PRIORITY_ALERT)
+    _drain(engine)
+    checks.append(("priority order and coalescing", backend.spoken[1:], ["alert", "reply", "info"]))
+
+    backend = FakeSpeechBackend(seconds_per_char=0.001)
+    engine = TtsEngine(backend=backend, max_age_sec=0)
+    _blocked(engine)
+    engine.speak("stale", PRIORITY_REPLY, max_age=0.01)
+    engine.speak("fresh", PRIORITY_REPLY)
+    _drain(engine)
+    checks.append(("max_age drops stale replies", backend.spoken[1:], ["fresh"]))
+
+    backend = FakeSpeechBackend(seconds_per_char=0.001)
+    engine = TtsEngine(backend=backend, max_age_sec=0)
+    _blocked(engine, PRIORITY_REPLY)
+    engine.speak("reply", PRIORITY_REPLY)
+    engine.speak("alert", PRIORITY_ALERT)
+    engine.interrupt()
+    _drain(engine)
+    checks.append(("interrupt keeps alerts", (backend.spoken, backend.cancelled), (["alert"], ["." * 100])))
+
+    errors = 0
+    for name, actual, expected in checks:
+        if actual != expected:
+            errors += 1
+            print(f"MISMATCH {name}: expected {expected!r}, got {actual!r}")
+    return errors
+
+
+def run(burst: List[Tuple[str, int]], seconds_per_char: float, wake_at: float | None) -> Tuple[FakeSpeechBackend, float, float]:
+    backend = FakeSpeechBackend(seconds_per_char=seconds_per_char)
+    engine = TtsEngine(backend=backend, max_age_sec=0)
+    time.sleep(0.05)
+    start = time.perf_counter()
+    for text, priority in burst:
+        engine.speak(text, priority)
+    first_alert = 0.0
+    interrupted = wake_at is None
+    while engine.pending() or engine.is_speaking():
+        elapsed = time.perf_counter() - start
+        if not first_alert and PHRASE_TIME_UP in backend.spoken:
+            first_alert = elapsed
+        if not interrupted and elapsed >= wake_at:
+            engine.interrupt()
+            interrupted = True
+        time.sleep(0.001)
+    total = time.perf_counter() - start
+    engine.stop()
+    return backend, total, first_alert
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="TTS scheduler: coalescing, priorities and wake interruption on a fake backend")
+    parser.add_argument("--size", type=int, default=40)
+    parser.add_argument("--seconds-per-char", type=float, default=0.002)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    burst = build_burst(args.size, args.seed)
+    naive = sum(len(text) for text, _ in burst) * args.seconds_per_char
+    backend, total, first_alert = run(burst, args.seconds_per_char, None)
+    print(f"burst: {len(burst)} requests, naive FIFO speech time {naive * 1000:.0f} ms")
+    print(f"scheduler: {len(backend.spoken)} utterances in {total * 1000:.0f} ms, first alert after {first_alert * 1000:.0f} ms")
+    backend, total, _ = run(burst, args.seconds_per_char, total / 4)
+    print(f"wake interrupt: {len(backend.spoken)} spoken, {len(backend.cancelled)} cancelled, done in {total * 1000:.0f} ms")
+    errors = scheduler_errors()
+    print(f"scheduler checks: {errors} mismatches")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+from app.core.stt import BLOCK_FRAMES
+
+
+class NullRecognizer:
+    def __init__(self) -> None:
+        self.samples = 0
+
+    def AcceptWaveform(self, data) -> bool:
+        self.samples += len(data) // 2
+        return False
+
+    def PartialResult(self) -> str:
+        return '{"partial": ""}'
+
+    def Result(self) -> str:
+        return '{"text": ""}'
+
+    def FinalResult(self) -> str:
+        return '{"text": ""}'
+
+    def Reset(self) -> None:
+        self.samples = 0
+
+
+class ScriptedRecognizer:
+    def __init__(self, script: List[Tuple[bool, str]]) -> None:
+        self._script = script
+        self._index = -1
+
+    def AcceptWaveform(self, data) -> bool:
+        self._index += 1
+        return self._script[self._index % len(self._script)][0]
+
+    def Result(self) -> str:
+        return self._script[self._index % len(self._script)][1]
+
+    def PartialResult(self) -> str:
+        return self._script[self._index % len(self._script)][1]
+
+    def FinalResult(self) -> str:
+        return self._script[self._index % len(self._script)][1]
+
+    def Reset(self) -> None:
+        pass
+
+
+class BlockSource:
+    def __init__(self, block_ms: float) -> None:
+        self.block_ms = block_ms
+        self.produced = 0
+        self.delivered = 0
+        self.stream: Optional["FakeStream"] = None
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        block = bytes(BLOCK_FRAMES * 2)
+        while self._running:
+            time.sleep(self.block_ms / 1000.0)
+            self.produced += 1
+            stream = self.stream
+            if stream is not None:
+                self.delivered += 1
+                stream.callback(block, BLOCK_FRAMES, None, None)
+
+    def stop(self) -> None:
+        self._running = False
+        self._thread.join()
+
+
+class FakeStream:
+    block_ms = 0.0
+    open_cost_ms = 0.0
+    source: Optional[BlockSource] = None
+
+    def __init__(self, callback, finished_callback=None, **kwargs: Any) -> None:
+        self.callback = callback
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def configured(cls, **attrs: Any) -> type:
+        return type("FakeStream", (cls,), attrs)
+
+    def start(self) -> None:
+        if self.open_cost_ms > 0:
+            time.sleep(self.open_cost_ms / 1000.0)
+        self._running = True
+        if self.source is not None:
+            self.source.stream = self
+        elif self.block_ms > 0:
+            self._thread = threading.Thread(target=self._feed, daemon=True)
+            self._thread.start()
+
+    def _feed(self) -> None:
+        block = bytes(BLOCK_FRAMES * 2)
+        while self._running:
+            time.sleep(self.block_ms / 1000.0)
+            if self._running:
+                self.callback(block, BLOCK_FRAMES, None, None)
+
+    def stop(self) -> None:
+        self._running = False
+        if self.source is not None and self.source.stream is self:
+            self.source.stream = None
+
+    def close(self) -> None:
+        pass
+
+
+def context_switches() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_nvcsw
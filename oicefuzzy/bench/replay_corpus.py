@@ -0,0 +1,215 @@
+import argparse
+import json
+import random
+import re
+import sys
+import time
+import wave
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Tuple
+
+from app.core.config import ConfigStore
+from app.core.echo import ECHO_MODES, EchoGate
+from app.core.utils import app_root, normalize_text
+
+BLOCK_SAMPLES = 8000
+
+
+@dataclass
+class Scene:
+    name: str
+    samples: array
+    speaking: List[Tuple[int, int, str]] = field(default_factory=list)
+
+
+@dataclass
+class ReplayStats:
+    mode: str
+    wakes: int = 0
+    false_wakes: int = 0
+    blocks_fed: int = 0
+    blocks_skipped: int = 0
+    cpu_sec: float = 0.0
+    audio_sec: float = 0.0
+
+
+def read_wav(path: Path, rate: int) -> array:
+    with wave.open(str(path), "rb") as handle:
+        if handle.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        channels = handle.getnchannels()
+        source_rate = handle.getframerate()
+        raw = array("h", handle.readframes(handle.getnframes()))
+    if sys.byteorder != "little":
+        raw.byteswap()
+    if channels > 1:
+        raw = array("h", [sum(raw[i : i + channels]) // channels for i in range(0, len(raw), channels)])
+    if source_rate == rate or not raw:
+        return raw
+    step = source_rate / rate
+    count = int(len(raw) / step)
+    last = len(raw) - 1
+    resampled = array("h")
+    for index in range(count):
+        position = index * step
+        left = int(position)
+        right = min(left + 1, last)
+        frac = position - left
+        resampled.append(int(raw[left] * (1.0 - frac) + raw[right] * frac))
+    return resampled
+
+
+def build_scenes(corpus: List[Path], clips: List[Tuple[str, array]], rate: int, gain: float, seed: int) -> List[Scene]:
+    rng = random.Random(seed)
+    scenes = []
+    for path in corpus:
+        base = read_wav(path, rate)
+        text, clip = rng.choice(clips)
+        if len(base) < len(clip) + rate:
+            base.extend([0] * (len(clip) + rate - len(base)))
+        offset = rng.randint(0, len(base) - len(clip))
+        mixed = array("h", base)
+        for index, sample in enumerate(clip):
+            value = mixed[offset + index] + int(sample * gain)
+            mixed[offset + index] = max(-32768, min(32767, value))
+        scenes.append(Scene(path.name, mixed, [(offset, offset + len(clip), text)]))
+    return scenes
+
+
+def replay(scene: Scene, model, rate: int, mode: str, wake_words: List[str], tail_ms: int) -> ReplayStats:
+    from vosk import KaldiRecognizer
+
+    recognizer = KaldiRecognizer(model, rate)
+    gate = EchoGate(mode=mode, tail_ms=tail_ms, sample_rate=rate)
+    stats = ReplayStats(mode, audio_sec=len(scene.samples) / rate)
+    tail = tail_ms / 1000.0
+    events = sorted(scene.speaking)
+    started = set()
+    for block_start in range(0, len(scene.samples), BLOCK_SAMPLES):
+        block = scene.samples[block_start : block_start + BLOCK_SAMPLES]
+        captured = (block_start + len(block)) / rate
+        for index, (start, end, text) in enumerate(events):
+            if index not in started and start / rate <= captured:
+                gate.begin(text, at=start / rate)
+                gate.end(at=end / rate)
+                started.add(index)
+        data = block.tobytes() if sys.byteorder == "little" else _swapped(block)
+        data = gate.process(data, captured)
+        if data is None:
+            stats.blocks_skipped += 1
+            continue
+        stats.blocks_fed += 1
+        tick = time.process_time()
+        if recognizer.AcceptWaveform(data):
+            text = json.loads(recognizer.Result()).get("text", "")
+        else:
+            text = json.loads(recognizer.PartialResult()).get("partial", "")
+        stats.cpu_sec += time.process_time() - tick
+        cleaned = normalize_text(text)
+        if cleaned and any(word in cleaned for word in wake_words):
+            stats.wakes += 1
+            if any(start / rate <= captured and captured - len(block) / rate <= end / rate + tail for start, end, _ in events):
+                stats.false_wakes += 1
+            recognizer.Reset()
+    return stats
+
+
+def replay_capture(path: Path, model, rate: int, wake_words: List[str]) -> Tuple[str, str]:
+    from vosk import KaldiRecognizer
+
+    sidecar_path = path.with_suffix(".json")
+    sidecar = json.loads(sidecar_path.read_text(encoding="utf-8")) if sidecar_path.exists() else {}
+    samples = read_wav(path, rate)
+    recognizer = KaldiRecognizer(model, rate)
+    parts = []
+    for block_start in range(0, len(samples), BLOCK_SAMPLES):
+        block = samples[block_start : block_start + BLOCK_SAMPLES]
+        if recognizer.AcceptWaveform(block.tobytes() if sys.byteorder == "little" else _swapped(block)):
+            parts.append(json.loads(recognizer.Result()).get("text", ""))
+    parts.append(json.loads(recognizer.FinalResult()).get("text", ""))
+    heard = " ".join(word for word in normalize_text(" ".join(parts)).split() if word not in wake_words)
+    return heard, normalize_text(sidecar.get("expected") or sidecar.get("final") or "")
+
+
+def replay_captures(paths: List[Path], model, rate: int, wake_words: List[str]) -> int:
+    matched = 0
+    for path in paths:
+        heard, reference = replay_capture(path, model, rate, wake_words)
+        matched += heard == reference
+        print(f"{'=' if heard == reference else '!'} {path.name}: {heard or '-'} | {reference or '-'}")
+    print(f"{matched}/{len(paths)} captures decode to their recorded or expected transcript")
+    return 0
+
+
+def _swapped(block: array) -> bytes:
+    copy = array("h", block)
+    copy.byteswap()
+    return copy.tobytes()
+
+
+def _wake_words(value: str) -> List[str]:
+    return [word for word in (normalize_text(part) for part in re.split(r"[|,;]+", value or "")) if word]
+
+
+def main() -> int:
+    config = ConfigStore()
+    parser = argparse.ArgumentParser(description="Replay a WAV corpus with TTS output mixed in and compare echo modes")
+    parser.add_argument("corpus", type=Path, help="directory of 16-bit WAV recordings (room noise, user speech)")
+    parser.add_argument("--tts", type=Path, default=app_root() / "cache" / "tts", help="directory of rendered TTS clips")
+    parser.add_argument("--model", default=str(app_root() / config.get_setting("stt", "model_path", default="")))
+    parser.add_argument("--wake", default=config.get_setting("stt", "wake_word", default=""))
+    parser.add_argument("--rate", type=int, default=int(config.get_setting("stt", "sample_rate", default=16000)))
+    parser.add_argument("--gain", type=float, default=0.6, help="speaker-to-microphone coupling of the TTS clip")
+    parser.add_argument("--tail-ms", type=int, default=int(config.get_setting("stt", "echo_tail_ms", default=300)))
+    parser.add_argument("--modes", default=",".join(ECHO_MODES))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--captures", action="store_true", help="re-decode capture dumps and compare with their sidecar JSON")
+    args = parser.parse_args()
+
+    corpus = sorted(args.corpus.glob("*.wav"))
+    wake_words = _wake_words(args.wake)
+    if args.captures:
+        if not corpus:
+            print("capture directory is empty")
+            return 1
+        from vosk import Model, SetLogLevel
+
+        SetLogLevel(-1)
+        return replay_captures(corpus, Model(args.model), args.rate, wake_words)
+    clip_paths = sorted(args.tts.glob("**/*.wav"))
+    if not corpus or not clip_paths:
+        print("corpus or TTS clip directory is empty")
+        return 1
+    clips = [(path.stem, read_wav(path, args.rate)) for path in clip_paths]
+    scenes = build_scenes(corpus, clips, args.rate, args.gain, args.seed)
+
+    from vosk import Model, SetLogLevel
+
+    SetLogLevel(-1)
+    model = Model(args.model)
+    baseline = None
+    for mode in [mode.strip() for mode in args.modes.split(",") if mode.strip()]:
+        total = ReplayStats(mode)
+        for scene in scenes:
+            stats = replay(scene, model, args.rate, mode, wake_words, args.tail_ms)
+            total.wakes += stats.wakes
+            total.false_wakes += stats.false_wakes
+            total.blocks_fed += stats.blocks_fed
+            total.blocks_skipped += stats.blocks_skipped
+            total.cpu_sec += stats.cpu_sec
+            total.audio_sec += stats.audio_sec
+        if baseline is None:
+            baseline = total
+        saved = 1.0 - total.cpu_sec / baseline.cpu_sec if baseline.cpu_sec else 0.0
+        print(
+            f"{mode:>9}: wakes {total.wakes} (during TTS {total.false_wakes}, avoided {baseline.false_wakes - total.false_wakes}), "
+            f"blocks fed {total.blocks_fed}, skipped {total.blocks_skipped}, "
+            f"recognizer CPU {total.cpu_sec:.2f}s (RTF {total.cpu_sec / max(total.audio_sec, 1e-9):.3f}, saved {saved:.0%})"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
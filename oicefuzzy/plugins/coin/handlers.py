@@ -0,0 +1,21 @@
+import random
+
+from app.core.actions import ActionResult
+from app.core.numerals import parse_number
+
+
+def handle_coin_flip(action, params, raw_text, dispatcher) -> ActionResult:
+    text = random.choice(["\u041e\u0440\u0451\u043b", "\u0420\u0435\u0448\u043a\u0430"])
+    return ActionResult(True, text, text)
+
+
+def handle_dice_roll(action, params, raw_text, dispatcher) -> ActionResult:
+    value = params.get(action.get("param", ""), "").strip()
+    count = int(value) if value.isdigit() else parse_number(value) or 1
+    count = max(1, min(10, int(count)))
+    rolls = [random.randint(1, 6) for _ in range(count)]
+    if count == 1:
+        text = f"\u0412\u044b\u043f\u0430\u043b\u043e {rolls[0]}"
+    else:
+        text = f"\u0412\u044b\u043f\u0430\u043b\u043e {', '.join(str(roll) for roll in rolls)}, \u0441\u0443\u043c\u043c\u0430 {sum(rolls)}"
+    return ActionResult(True, text, text)